@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+'''
+    on-disk crawl frontier, so that an interrupted run can resume where it stopped
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+
+
+class CheckpointStore:
+    '''
+        one json file per job (keyword, center, radius and target table) holding
+            places    - the search results of the run, in order
+            completed - urls of places that are finished (flushed to mongodb or dropped)
+            cursors   - per place review progress: layout, pages done and the
+                        keys of the reviews collected so far
+            saved     - when the checkpoint was last written
+
+        every update rewrites the file through a temporary file and an atomic
+        rename, so a crash never leaves a half written checkpoint behind. the
+        reviews themselves are appended page by page to a journal per place
+        (one json line per page), so a page costs a write of its own reviews
+        only. journal lines past the cursor, or torn by a crash, are ignored,
+        and a place whose journal lost reviews is collected again.
+
+        a checkpoint not written for more than maxAge seconds is not resumed.
+        without a directory the checkpoint is only kept in memory.
+    '''
+    def __init__(self, directory, job, logging, maxAge=None):
+        self.logging = logging
+        self.maxAge = maxAge
+        self.lock = threading.Lock()
+        self.directory = directory
+        self.path = None
+        self.key = hashlib.sha1(json.dumps(job, sort_keys=True).encode('utf-8')).hexdigest()
+
+        if directory is not None:
+            self.path = os.path.join(directory, f"{self.key}.json")
+
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except:
+                self.logging.warning("could not create checkpoint directory.", exc_info=True)
+
+        self.state = self.__empty()
+        # journals of the in memory checkpoint, url -> [(page, reviews)]
+        self.journals = dict()
+
+    def __empty(self):
+        return {
+            'places': None,
+            'completed': [],
+            'cursors': dict(),
+            'saved': None
+        }
+
+    def load(self):
+        # loads the checkpoint of a previous interrupted run, returns True if there was one
+        with self.lock:
+            if self.path is None or not os.path.isfile(self.path):
+                return False
+
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except:
+                self.logging.warning("could not read checkpoint. starting over.", exc_info=True)
+                return False
+
+            saved = state.get('saved')
+            if self.maxAge is not None and (saved is None or time.time() - saved > self.maxAge):
+                self.logging.info("checkpoint is too old to resume. starting over.")
+                return False
+
+            self.state = self.__empty()
+            self.state.update(state)
+            return self.state['places'] is not None
+
+    def places(self):
+        return self.state['places']
+
+    def save_places(self, places):
+        with self.lock:
+            self.state['places'] = places
+            self.__write()
+
+    def is_completed(self, url):
+        with self.lock:
+            return url in self.state['completed']
+
+    def completed_count(self):
+        with self.lock:
+            return len(self.state['completed'])
+
+    def mark_completed(self, url):
+        with self.lock:
+            if url not in self.state['completed']:
+                self.state['completed'].append(url)
+            self.state['cursors'].pop(url, None)
+            self.__write()
+            self.__drop_journal(url)
+
+    def cursor(self, url):
+        '''
+            review progress of a place: layout, pages done, keys of the reviews
+            collected so far and the reviews themselves, read back from the
+            journal. None if there is none, or if the journal does not hold
+            every review of the cursor.
+        '''
+        with self.lock:
+            cursor = self.state['cursors'].get(url)
+            if cursor is None:
+                return None
+
+            # a page fetched again after a crash replaces its earlier line
+            pages = dict(self.__read_journal(url))
+            reviews = [review for page in sorted(pages) if page <= cursor['pages'] for review in pages[page]]
+
+        if len(reviews) != len(cursor['keys']):
+            self.logging.warning(f"review journal of {url} is incomplete. its reviews are collected again.")
+            return None
+
+        return dict(cursor, reviews=reviews)
+
+    def save_cursor(self, url, mode, reviews, keys, pages):
+        # journals the reviews (with their keys) of one more page and moves the cursor to it
+        with self.lock:
+            self.__append_journal(url, pages, reviews)
+
+            cursor = self.state['cursors'].setdefault(url, {'mode': mode, 'pages': 0, 'keys': []})
+            cursor['mode'] = mode
+            cursor['pages'] = pages
+            cursor['keys'] = cursor['keys'] + list(keys)
+            self.__write()
+
+    def clear(self):
+        with self.lock:
+            self.state = self.__empty()
+            self.journals = dict()
+            try:
+                if self.path is not None:
+                    prefix = f"{self.key}."
+                    for name in os.listdir(self.directory):
+                        if name.startswith(prefix):
+                            os.remove(os.path.join(self.directory, name))
+            except:
+                self.logging.warning("could not remove checkpoint.", exc_info=True)
+
+    def __journal_path(self, url):
+        return os.path.join(self.directory, f"{self.key}.{hashlib.sha1(url.encode('utf-8')).hexdigest()}.jsonl")
+
+    def __append_journal(self, url, page, reviews):
+        if self.path is None:
+            self.journals.setdefault(url, []).append((page, reviews))
+            return
+
+        try:
+            with open(self.__journal_path(url), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'page': page, 'reviews': reviews}, default=self.__encode) + '\n')
+        except:
+            self.logging.warning("could not write review journal.", exc_info=True)
+
+    def __read_journal(self, url):
+        if self.path is None:
+            return self.journals.get(url, [])
+
+        entries = []
+        try:
+            with open(self.__journal_path(url), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # torn by a crash mid write
+                        continue
+                    entries.append((entry['page'], entry['reviews']))
+        except FileNotFoundError:
+            pass
+        except:
+            self.logging.warning("could not read review journal.", exc_info=True)
+
+        return entries
+
+    def __drop_journal(self, url):
+        if self.path is None:
+            self.journals.pop(url, None)
+            return
+
+        try:
+            os.remove(self.__journal_path(url))
+        except FileNotFoundError:
+            pass
+        except:
+            self.logging.warning("could not remove review journal.", exc_info=True)
+
+    @staticmethod
+    def __encode(value):
+        # places are stamped with a datetime once scraped
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"{type(value).__name__} is not json serializable")
+
+    def __write(self):
+        self.state['saved'] = time.time()
+
+        if self.path is None:
+            return
+
+        tmpPath = self.path + '.tmp'
+        try:
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, default=self.__encode)
+            os.replace(tmpPath, self.path)
+        except:
+            self.logging.warning("could not write checkpoint.", exc_info=True)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+'''
+    headless entry point: runs the scraper without qgis, with parameters from
+    flags and/or a json config file
+
+        python -m ta_scraper --config darjeeling.json
+        python -m ta_scraper --keyword Darjeeling --lat 27.04 --lng 88.26 --radius 5000 ...
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import os
+import sys
+import json
+import argparse
+import logging
+
+
+REQUIRED = ['keyword', 'lat', 'lng', 'radius', 'apiKey', 'dbName', 'tableName', 'maxPlaces', 'maxReviews', 'csvFilePath']
+
+# places api key can be kept out of config files and shell history
+API_KEY_ENV = 'TA_MAPS_API_KEY'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ta_scraper', description='scrape tripadvisor reviews around a location into mongodb and csv.')
+
+    parser.add_argument('--config', help='json file with any of the options below, keyed by their long name (e.g. "maxPlaces"). flags override it.')
+
+    parser.add_argument('--keyword', help='location to search for')
+    parser.add_argument('--lat', type=float, help='latitude of the center')
+    parser.add_argument('--lng', type=float, help='longitude of the center')
+    parser.add_argument('--radius', type=int, help='radius around the center, in meters')
+    parser.add_argument('--api-key', dest='apiKey', help=f'google places api key (or set {API_KEY_ENV})')
+    parser.add_argument('--db', dest='dbName', help='mongodb database')
+    parser.add_argument('--db-host', dest='dbHost', help='mongodb host (default localhost)')
+    parser.add_argument('--table', dest='tableName', help='mongodb collection')
+    parser.add_argument('--max-places', dest='maxPlaces', type=int, help='maximum number of places')
+    parser.add_argument('--max-reviews', dest='maxReviews', type=int, help='maximum number of reviews per place')
+    parser.add_argument('--csv', dest='csvFilePath', help='csv file to write')
+
+    parser.add_argument('--pool-size', dest='poolSize', type=int, help='number of chrome sessions')
+    parser.add_argument('--engine', choices=['threaded', 'async'], help='scraping engine (default threaded)')
+    parser.add_argument('--refresh', action='store_const', const=True, help='refresh the stalest stored places instead of searching')
+    parser.add_argument('--refresh-budget', dest='refreshBudget', type=int, help='places re-scraped by --refresh')
+    parser.add_argument('--enqueue', action='store_const', const=True, help='search and add the places to the work queue of the table without scraping them')
+    parser.add_argument('--worker', action='store_const', const=True, help='scrape places from the work queue of the table until it is empty')
+    parser.add_argument('--quota-policy', dest='quotaPolicy', choices=['defer', 'stop'], help='once the places api allowance is spent, store places without coordinates for a later run (defer, default) or halt (stop)')
+    parser.add_argument('--gazetteer', help='geonames dump (indexed on first use) or index used when the places api cannot locate a place')
+    parser.add_argument('--no-resume', dest='resume', action='store_const', const=False, help='ignore the checkpoint of an interrupted run')
+    parser.add_argument('--incremental', action='store_const', const=True, help='fetch the new reviews of cached places instead of serving them from the cache (always on with --refresh)')
+    parser.add_argument('--record', help='record every fetched page into this fixture directory')
+    parser.add_argument('--replay', help='serve the pages recorded in this fixture directory instead of the live site')
+    parser.add_argument('--quiet', action='store_true', help='only print errors and the summary')
+
+    return parser.parse_args(argv)
+
+
+def load_config(args):
+    '''
+        merges the config file and the flags. a config file may also hold a
+        "jobs" list of {location, lat, lng, radius, maxPlaces, maxReviews},
+        which is run as one batch.
+    '''
+    config = dict()
+
+    if args.config is not None:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config.update(json.load(f))
+
+    config.update({key: value for key, value in vars(args).items() if value is not None and key != 'config'})
+
+    if 'apiKey' not in config and API_KEY_ENV in os.environ:
+        config['apiKey'] = os.environ[API_KEY_ENV]
+
+    # a batch takes its keywords from the jobs
+    if 'keyword' not in config and len(config.get('jobs') or []) > 0:
+        config['keyword'] = config['jobs'][0]['location']
+
+    missing = [key for key in REQUIRED if key not in config]
+    if len(missing) > 0:
+        raise ValueError(f"missing parameters: {', '.join(missing)}")
+
+    return config
+
+
+def build_worker(config, recorder=None, baseUrl=None, mapsUrl=None):
+    # the worker the qgis dialog would build, from a merged config
+    from ta_scraper import TAapi
+
+    options = {key: config[key] for key in ['poolSize', 'resume', 'incremental', 'jobs', 'refreshBudget', 'dbHost', 'quotaPolicy', 'gazetteer'] if key in config}
+
+    return TAapi(
+        config['keyword'], config['lat'], config['lng'], config['radius'], config['apiKey'],
+        config['dbName'], config['tableName'], config['maxPlaces'], config['maxReviews'], config['csvFilePath'],
+        recorder=recorder, baseUrl=baseUrl, mapsUrl=mapsUrl, **options
+    )
+
+
+def run(config, onMessage=None, onError=None, onProgress=None):
+    '''
+        runs one scrape described by config with plain callbacks instead of qt
+        slots, and returns the places written to mongodb and the csv.
+    '''
+    from fixtures import FixtureRecorder, ReplayServer
+
+    logger = logging.getLogger('tripadvisor.cli')
+
+    server = ReplayServer(config['replay'], logging=logger).start() if config.get('replay') else None
+    recorder = FixtureRecorder(config['record'], logging=logger) if config.get('record') else None
+
+    try:
+        worker = build_worker(
+            config,
+            recorder=recorder,
+            baseUrl=server.url if server is not None else None,
+            mapsUrl=server.maps_url if server is not None else None
+        )
+
+        if onMessage is not None:
+            worker.addMessage.connect(onMessage)
+        if onError is not None:
+            worker.addError.connect(onError)
+        if onProgress is not None:
+            total = [0]
+            worker.total.connect(lambda n: total.__setitem__(0, n))
+            worker.progress.connect(lambda n: onProgress(n, total[0]))
+
+        # a halt emits finished before run returns, the first emission is the outcome
+        results = []
+        worker.finished.connect(lambda data: results.append(data))
+
+        if config.get('enqueue'):
+            worker.run_enqueue()
+        elif config.get('worker'):
+            worker.run_worker()
+        elif config.get('refresh'):
+            worker.run_refresh()
+        elif len(config.get('jobs') or []) > 0:
+            worker.run_batch()
+        elif config.get('engine') == 'async':
+            worker.run_async()
+        else:
+            worker.run()
+    finally:
+        if server is not None:
+            server.stop()
+
+    return results[0] if len(results) > 0 else []
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        config = load_config(args)
+    except (ValueError, OSError, json.JSONDecodeError) as ex:
+        print(f"error: {ex}", file=sys.stderr)
+        return 2
+
+    def message(msg):
+        if not args.quiet:
+            print(msg, flush=True)
+
+    def error(msg):
+        print(f"error: {msg}", file=sys.stderr, flush=True)
+
+    def progress(done, total):
+        if not args.quiet:
+            print(f"[{done}/{total}] places done", flush=True)
+
+    results = run(config, onMessage=message, onError=error, onProgress=progress)
+
+    print(f"{len(results)} places with reviews collected.")
+
+    return 0 if len(results) > 0 else 1
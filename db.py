@@ -14,7 +14,15 @@ __email__ = "arkaprava.mail@gmail.com"
 __status__ = "Development"
 
 import sys
+import uuid
+from datetime import datetime, timedelta, timezone
 import pymongo
+from pymongo import ReturnDocument
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:
+    AsyncIOMotorClient = None
 
 class DBManager:
     __PORT__ = 27017
@@ -87,20 +95,38 @@ class DBManager:
         }
     }
 
-    def __init__(self, dbName, tableName, logging):
+    # places a worker gives up on after this many leases
+    __MAX_ATTEMPTS__ = 3
+
+    def __init__(self, dbName, tableName, logging, host="localhost"):
         self.dbName = dbName
         self.tableName = tableName
         self.logging = logging
+        self.host = host
         
         try:
-            client = pymongo.MongoClient("localhost", self.__PORT__)
+            client = pymongo.MongoClient(self.host, self.__PORT__)
             self.db = client[self.dbName]
             self.__create_collection__(collection_name=self.tableName)
             self.collection = self.db[self.tableName]
             self.collection.create_index('url', unique=True)
+            self.collection.create_index('last_scraped')
+
+            # work queue of place urls shared by crawl workers on any machine
+            self.queue = self.db[f"{self.tableName}_queue"]
+            self.queue.create_index('url', unique=True)
+            self.queue.create_index([('status', pymongo.ASCENDING), ('leaseUntil', pymongo.ASCENDING)])
+
+            # places api answers shared by every table of the database, mongodb drops them once expired
+            self.geocodes = self.db['geocode_cache']
+            self.geocodes.create_index('key', unique=True)
+            self.geocodes.create_index('expires', expireAfterSeconds=0)
         except:
             sys.exit()
 
+        self.asyncClient = None
+        self.asyncCollection = None
+
     def __create_collection__(self, collection_name='reviews'):
         if collection_name not in self.db.list_collection_names():
             self.db.create_collection(
@@ -110,44 +136,25 @@ class DBManager:
                 }
             )
 
-    def insert(self, docs):
+    def upsert(self, docs):
+        '''
+            replaces the stored document of each url, or inserts it if the url
+            is new, so places refreshed with their new reviews overwrite their
+            old document instead of duplicating it.
+        '''
         if len(docs) == 0:
             return
-        
-        if len(docs) == 1:
-            try:
-                self.collection.insert_one(docs[0])
-            except:
-                self.logging.warning("error inserting document.", exc_info=True)
-        else:
-            '''
-                insert_many with ordered=false tries to insert each of the documents
-                individually, preferably in parallel. unlike ordered=true, it does not 
-                insert in order. hence, if one insertion fails, the subsequent ones don't.
-
-                11000 - duplicate error code
-            '''
-            try:
-                self.collection.insert_many(docs, ordered=False)
-            except pymongo.errors.BulkWriteError as ex:
-                errors = ex.details['writeErrors']
-                duplicateErrors = list(filter(lambda x: x['code'] == 11000, errors))
-                errors = list(filter(lambda x: x['code'] != 11000, errors))
-
-                if len(errors) > 0:
-                    self.logging.error("error inserting document(/s).", exc_info=True)
-                else:
-                    self.logging.info(f"{len(duplicateErrors)} duplicates found. successfully inserted {len(docs) - len(errors) - len(duplicateErrors)} documents.")
-            except Exception as ex:
-                self.logging.error("error inserting documents.", exc_info=True)
-        
+
+        try:
+            self.collection.bulk_write([pymongo.ReplaceOne({'url': doc['url']}, doc, upsert=True) for doc in docs], ordered=False)
+        except:
+            self.logging.error("error upserting document(/s).", exc_info=True)
 
     def query(self, val, col="url"):
         try:
             cursor = self.collection.find({col: val})
             docs = list(cursor)
-
-            print(docs)
+            self.logging.debug(f"{len(docs)} document(/s) found for {col} {val}.")
 
             if len(docs) > 0:
                 return docs[0]
@@ -156,3 +163,227 @@ class DBManager:
         except:
             self.logging.error("error querying for document(/s).", exc_info=True)
             return None
+
+    def stale_places(self, fields=None, staleBefore=None, bounds=None, limit=0):
+        '''
+            stored documents reduced to the given fields, least recently scraped
+            first (never stamped ones before all), through the last_scraped
+            index. staleBefore keeps those last scraped before it, bounds
+            (south, west, north, east) those inside it or not located yet.
+        '''
+        conditions = []
+
+        if staleBefore is not None:
+            conditions.append({'$or': [{'last_scraped': {'$lt': staleBefore}}, {'last_scraped': None}]})
+
+        if bounds is not None:
+            south, west, north, east = bounds
+            conditions.append({'$or': [
+                {'coords.lat': {'$gte': south, '$lte': north}, 'coords.lng': {'$gte': west, '$lte': east}},
+                {'coords': None}
+            ]})
+
+        try:
+            projection = {field: 1 for field in fields} if fields is not None else None
+            cursor = self.collection.find({'$and': conditions} if len(conditions) > 0 else {}, projection)
+            return list(cursor.sort('last_scraped', pymongo.ASCENDING).limit(limit))
+        except:
+            self.logging.error("error querying for document(/s).", exc_info=True)
+            return []
+
+    def enqueue(self, place_results):
+        '''
+            adds search results to the work queue. urls already queued (pending,
+            leased or done) are left alone, so overlapping searches can enqueue
+            freely. returns the number of new entries.
+        '''
+        if len(place_results) == 0:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        requests = [
+            pymongo.UpdateOne(
+                {'url': place['url']},
+                {'$setOnInsert': {
+                    'url': place['url'],
+                    'name': place['name'],
+                    'page': place.get('page'),
+                    'status': 'pending',
+                    'attempts': 0,
+                    'leaseUntil': None,
+                    'lease': None,
+                    'worker': None,
+                    'queued': now
+                }},
+                upsert=True
+            ) for place in place_results
+        ]
+
+        try:
+            result = self.queue.bulk_write(requests, ordered=False)
+            return result.upserted_count
+        except:
+            self.logging.error("error enqueuing places.", exc_info=True)
+            return 0
+
+    def lease(self, worker, leaseSeconds):
+        '''
+            atomically hands the oldest pending place, or one whose lease ran
+            out, to worker for leaseSeconds. returns the queue entry or None
+            when there is nothing left to do.
+
+            every lease carries a token of its own, so the threads of one worker
+            process never act on each other's leases. complete, fail and renew
+            take that token.
+
+            lease deadlines are utc, workers on other machines compare against
+            them.
+        '''
+        now = datetime.now(timezone.utc)
+        self.__fail_expired(now)
+
+        try:
+            return self.queue.find_one_and_update(
+                {
+                    '$or': [
+                        {'status': 'pending'},
+                        {'status': 'leased', 'leaseUntil': {'$lt': now}}
+                    ],
+                    'attempts': {'$lt': self.__MAX_ATTEMPTS__}
+                },
+                {
+                    '$set': {'status': 'leased', 'worker': worker, 'lease': uuid.uuid4().hex, 'leaseUntil': now + timedelta(seconds=leaseSeconds)},
+                    '$inc': {'attempts': 1}
+                },
+                sort=[('queued', pymongo.ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+        except:
+            self.logging.error("error leasing from work queue.", exc_info=True)
+            return None
+
+    def renew(self, url, lease, leaseSeconds):
+        # pushes the deadline of a lease back, False if it had already passed to another worker
+        try:
+            result = self.queue.update_one(
+                {'url': url, 'lease': lease, 'status': 'leased'},
+                {'$set': {'leaseUntil': datetime.now(timezone.utc) + timedelta(seconds=leaseSeconds)}}
+            )
+            return result.matched_count == 1
+        except:
+            self.logging.error("error updating work queue.", exc_info=True)
+            return False
+
+    def complete(self, url, lease):
+        # marks a leased place done, False if the lease had already passed to another worker
+        try:
+            result = self.queue.update_one(
+                {'url': url, 'lease': lease, 'status': 'leased'},
+                {'$set': {'status': 'done', 'leaseUntil': None, 'lease': None, 'finished': datetime.now(timezone.utc)}}
+            )
+            return result.modified_count == 1
+        except:
+            self.logging.error("error updating work queue.", exc_info=True)
+            return False
+
+    def fail(self, url, lease, error=None):
+        # hands a leased place back for a retry, or parks it once it ran out of attempts
+        try:
+            entry = self.queue.find_one({'url': url, 'lease': lease, 'status': 'leased'})
+            if entry is None:
+                return
+
+            status = 'pending' if entry['attempts'] < self.__MAX_ATTEMPTS__ else 'failed'
+            self.queue.update_one(
+                {'url': url, 'lease': lease, 'status': 'leased'},
+                {'$set': {'status': status, 'leaseUntil': None, 'lease': None, 'lastError': error}}
+            )
+        except:
+            self.logging.error("error updating work queue.", exc_info=True)
+
+    def __fail_expired(self, now):
+        # a worker that died on the last attempt of a place leaves a lease nobody may take over
+        try:
+            self.queue.update_many(
+                {'status': 'leased', 'leaseUntil': {'$lt': now}, 'attempts': {'$gte': self.__MAX_ATTEMPTS__}},
+                {'$set': {'status': 'failed', 'leaseUntil': None, 'lease': None, 'lastError': 'lease expired on the last attempt'}}
+            )
+        except:
+            self.logging.error("error updating work queue.", exc_info=True)
+
+    def queue_counts(self):
+        # number of queue entries per status
+        self.__fail_expired(datetime.now(timezone.utc))
+
+        try:
+            return {row['_id']: row['count'] for row in self.queue.aggregate([{'$group': {'_id': '$status', 'count': {'$sum': 1}}}])}
+        except:
+            self.logging.error("error reading work queue.", exc_info=True)
+            return dict()
+
+    def geocode_lookup(self, key):
+        '''
+            cached places api answer for key, None on a miss. a hit with found
+            False is a cached "no such place". expiry is checked here as well,
+            since mongodb only purges expired documents once a minute.
+        '''
+        try:
+            return self.geocodes.find_one({'key': key, 'expires': {'$gt': datetime.now(timezone.utc)}}, {'_id': 0})
+        except:
+            self.logging.warning("error reading geocode cache.", exc_info=True)
+            return None
+
+    def geocode_store(self, key, geometry, place_id, ttlSeconds):
+        # geometry None records that the places api found nothing for key. the ttl index expires in utc
+        now = datetime.now(timezone.utc)
+        try:
+            self.geocodes.replace_one(
+                {'key': key},
+                {
+                    'key': key,
+                    'found': geometry is not None,
+                    'geometry': geometry,
+                    'place_id': place_id,
+                    'cached': now,
+                    'expires': now + timedelta(seconds=ttlSeconds)
+                },
+                upsert=True
+            )
+        except:
+            self.logging.warning("error writing geocode cache.", exc_info=True)
+
+    def open_async(self):
+        '''
+            motor clients bind to the event loop they are first used on, so this
+            has to be called from inside the running loop. returns False if motor
+            is not installed, in which case callers stay on the blocking methods.
+        '''
+        if AsyncIOMotorClient is None:
+            return False
+
+        self.asyncClient = AsyncIOMotorClient(self.host, self.__PORT__)
+        self.asyncCollection = self.asyncClient[self.dbName][self.tableName]
+        return True
+
+    def close_async(self):
+        if self.asyncClient is not None:
+            self.asyncClient.close()
+
+        self.asyncClient = None
+        self.asyncCollection = None
+
+    async def query_async(self, val, col="url"):
+        try:
+            return await self.asyncCollection.find_one({col: val})
+        except:
+            self.logging.error("error querying for document(/s).", exc_info=True)
+            return None
+
+    async def upsert_async(self, docs):
+        if len(docs) == 0:
+            return
+
+        try:
+            await self.asyncCollection.bulk_write([pymongo.ReplaceOne({'url': doc['url']}, doc, upsert=True) for doc in docs], ordered=False)
+        except:
+            self.logging.error("error upserting document(/s).", exc_info=True)
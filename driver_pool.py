@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+'''
+    bounded pool of chromedriver sessions shared between scraping threads
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import queue
+import threading
+import time
+
+
+class DriverPool:
+    '''
+        drivers are created through the factory only when no idle driver is
+        available and the pool has not reached its size yet. a thread that
+        asks for a driver when all of them are leased blocks until one is
+        released.
+
+        with an idle timeout, a background thread quits drivers that have sat
+        unused in the pool for longer than the timeout. they are relaunched
+        lazily on the next acquire.
+
+        close quits every driver, leased ones included, and acquire raises
+        from then on, so no session outlives the pool.
+    '''
+    __ACQUIRE_POLL__ = 1
+    __REAP_INTERVAL__ = 5
+
+    def __init__(self, factory, size, logging, idleTimeout=None):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.logging = logging
+        self.idleTimeout = idleTimeout
+
+        self.idle = queue.LifoQueue()
+        self.drivers = []
+        self.releasedAt = dict()
+        self.lock = threading.Lock()
+
+        self.stopped = threading.Event()
+        self.reaper = None
+
+    def acquire(self):
+        while True:
+            if self.stopped.is_set():
+                raise RuntimeError("driver pool is closed")
+
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self.lock:
+                spawn = len(self.drivers) < self.size
+                if spawn:
+                    # reserve the slot before the (slow) launch
+                    self.drivers.append(None)
+
+            if spawn:
+                try:
+                    driver = self.factory()
+                except:
+                    with self.lock:
+                        self.drivers.remove(None)
+                    raise
+                else:
+                    with self.lock:
+                        closed = self.stopped.is_set()
+                        if not closed:
+                            self.drivers[self.drivers.index(None)] = driver
+
+                    # closed while the driver was launching
+                    if closed:
+                        self.__quit(driver)
+                        raise RuntimeError("driver pool is closed")
+
+                    self.__start_reaper()
+                    return driver
+
+            # wake up periodically in case a discarded driver freed a slot
+            try:
+                return self.idle.get(timeout=self.__ACQUIRE_POLL__)
+            except queue.Empty:
+                continue
+
+    def release(self, driver):
+        # close has quit every driver of the pool, leased ones included
+        if self.stopped.is_set():
+            return
+
+        with self.lock:
+            self.releasedAt[id(driver)] = time.monotonic()
+        self.idle.put(driver)
+
+    def reap(self):
+        # quit drivers that have been idle for longer than the idle timeout
+        if self.idleTimeout is None:
+            return
+
+        now = time.monotonic()
+        keep, expired = [], []
+
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+
+            with self.lock:
+                releasedAt = self.releasedAt.get(id(driver), now)
+
+            if now - releasedAt > self.idleTimeout:
+                expired.append(driver)
+            else:
+                keep.append(driver)
+
+        # put back in reverse so that the most recently used driver stays on top
+        for driver in reversed(keep):
+            self.idle.put(driver)
+
+        for driver in expired:
+            self.logging.info("closing idle chromedriver session.")
+            self.discard(driver)
+
+    def discard(self, driver):
+        # drop a driver that crashed or got into an unusable state
+        with self.lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+            self.releasedAt.pop(id(driver), None)
+        self.__quit(driver)
+
+    def close(self):
+        self.stopped.set()
+
+        with self.lock:
+            drivers = [driver for driver in self.drivers if driver is not None]
+            self.drivers = []
+            self.releasedAt = dict()
+
+        while not self.idle.empty():
+            try:
+                self.idle.get_nowait()
+            except queue.Empty:
+                break
+
+        for driver in drivers:
+            self.__quit(driver)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.drivers)
+
+    def __start_reaper(self):
+        with self.lock:
+            if self.idleTimeout is None or self.reaper is not None:
+                return
+            self.reaper = threading.Thread(target=self.__reap_loop, daemon=True)
+
+        self.reaper.start()
+
+    def __reap_loop(self):
+        while not self.stopped.wait(self.__REAP_INTERVAL__):
+            self.reap()
+
+    def __quit(self, driver):
+        try:
+            driver.close()
+            driver.quit()
+        except:
+            self.logging.warning("error closing chromedriver session.", exc_info=True)
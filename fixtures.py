@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+'''
+    records the pages and places api answers of a live run into a fixture
+    directory, and serves them back from a local http server so that the
+    whole pipeline can run (and be timed) offline
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import os
+import re
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+
+# query parameters that must never end up in a fixture
+SECRET_PARAMS = ['key']
+
+REPLAY_PARAM = 'replay'
+
+
+def fixture_key(url):
+    '''
+        path and sorted query of url without the host, so that a recording made
+        against the live site matches the requests made against the replay
+        server. api keys are dropped.
+    '''
+    parts = urlsplit(url)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name not in SECRET_PARAMS)
+    return parts.path + ('?' + urlencode(query) if len(query) > 0 else '')
+
+
+def replay_step(key):
+    # how many client side page changes led to the page recorded as key
+    query = dict(parse_qsl(urlsplit(key).query))
+    return int(query.get(REPLAY_PARAM, 0))
+
+
+def replay_base(key):
+    # key of the url the browser was actually on when key was recorded
+    parts = urlsplit(key)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != REPLAY_PARAM]
+    return parts.path + ('?' + urlencode(query) if len(query) > 0 else '')
+
+
+class FixtureRecorder:
+    '''
+        every page is written to its own file as soon as it is recorded, and
+        index.json maps request keys to those files. navigations the scraper
+        triggers through page scripts (search, search filter, next page) are
+        recorded as well, since scripts are not replayed.
+    '''
+    def __init__(self, directory, logging):
+        self.directory = directory
+        self.logging = logging
+        self.lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.indexPath = os.path.join(directory, 'index.json')
+        self.index = {'pages': dict(), 'navigation': dict()}
+
+        if os.path.isfile(self.indexPath):
+            with open(self.indexPath, 'r', encoding='utf-8') as f:
+                self.index.update(json.load(f))
+
+    def record(self, url, body, contentType='text/html'):
+        # stores body as the answer to url, returns its key
+        return self.__store(fixture_key(url), body, contentType)
+
+    def record_navigation(self, fromKey, action, toUrl, body):
+        '''
+            stores the page a script action on the page recorded as fromKey led
+            to, returns its key. a page whose url did not change (client side
+            paging) is kept apart from the page it replaced under an extra
+            query parameter.
+        '''
+        toKey = fixture_key(toUrl)
+
+        if replay_base(fromKey) == toKey:
+            step = replay_step(fromKey) + 1
+            toKey = fixture_key(toUrl + ('&' if '?' in toUrl else '?') + f"{REPLAY_PARAM}={step}")
+
+        self.__store(toKey, body, 'text/html')
+
+        with self.lock:
+            self.index['navigation'].setdefault(fromKey, dict())[action] = toKey
+            self.__write_index()
+
+        return toKey
+
+    def __store(self, key, body, contentType):
+        with self.lock:
+            page = self.index['pages'].get(key)
+            fileName = page['file'] if page is not None else f"{len(self.index['pages']):05d}" + ('.json' if 'json' in contentType else '.html')
+
+            try:
+                with open(os.path.join(self.directory, fileName), 'w', encoding='utf-8') as f:
+                    f.write(body)
+            except:
+                self.logging.warning(f"could not record {key}", exc_info=True)
+                return key
+
+            self.index['pages'][key] = {'file': fileName, 'type': contentType}
+            self.__write_index()
+
+        return key
+
+    def __write_index(self):
+        tmpPath = self.indexPath + '.tmp'
+        try:
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, indent=2)
+            os.replace(tmpPath, self.indexPath)
+        except:
+            self.logging.warning("could not write fixture index.", exc_info=True)
+
+
+class ReplayServer:
+    '''
+        serves a fixture directory on localhost. html pages are served without
+        their scripts and with a content security policy that keeps the
+        browser off the network, plus a small script that replays the recorded
+        navigations: enter in an input is the search, a click in the search
+        filters or the pagination goes to the recorded filter or next page.
+
+        point TAapi at it with baseUrl=server.url and mapsUrl=server.maps_url.
+    '''
+    __MAPS_PATH__ = '/maps/api/place/findplacefromtext/json'
+
+    __CSP__ = "<meta http-equiv=\"Content-Security-Policy\" content=\"default-src 'self' 'unsafe-inline' data:\">"
+
+    __NAVIGATION_SCRIPT__ = '''<script>
+        (function () {
+            var navigation = %s;
+            function go(action) {
+                if (navigation[action] !== undefined) {
+                    window.location.href = navigation[action];
+                }
+            }
+            document.addEventListener('keydown', function (e) {
+                if (e.key === 'Enter' && e.target.tagName === 'INPUT') { e.preventDefault(); go('search'); }
+            }, true);
+            document.addEventListener('click', function (e) {
+                if (e.target.closest('#search-filters')) { e.preventDefault(); go('filter'); }
+                else if (e.target.closest('.ui_pagination')) { e.preventDefault(); go('next'); }
+            }, true);
+        })();
+    </script>'''
+
+    def __init__(self, directory, logging, host='127.0.0.1', port=0):
+        self.directory = directory
+        self.logging = logging
+
+        with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+
+        self.server = ThreadingHTTPServer((host, port), self.__handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def maps_url(self):
+        return self.url + self.__MAPS_PATH__
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.logging.info(f"replaying {len(self.index['pages'])} recorded pages at {self.url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def render(self, key):
+        # body and content type served for a request key, None if it was not recorded
+        page = self.index['pages'].get(key)
+        if page is None:
+            return None
+
+        with open(os.path.join(self.directory, page['file']), 'r', encoding='utf-8') as f:
+            body = f.read()
+
+        if 'html' in page['type']:
+            # json-ld blocks are data, not scripts, and carry the coordinates of the place
+            body = re.sub(r'<script\b(?![^>]*application/ld\+json).*?</script>', '', body, flags=re.S | re.I)
+            script = self.__NAVIGATION_SCRIPT__ % json.dumps(self.index['navigation'].get(key, dict()))
+            body = re.sub(r'<head[^>]*>', lambda m: m.group(0) + self.__CSP__, body, count=1, flags=re.I)
+            body = re.sub(r'</body>', lambda m: script + m.group(0), body, count=1, flags=re.I)
+
+        return body.encode('utf-8'), page['type']
+
+    def __handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                rendered = replay.render(fixture_key(self.path))
+
+                if rendered is None:
+                    replay.logging.warning(f"no fixture recorded for {self.path}")
+                    self.send_error(404)
+                    return
+
+                body, contentType = rendered
+                self.send_response(200)
+                self.send_header('Content-Type', contentType)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+'''
+    offline geocoder over a geonames dump, for when the places api is
+    unavailable or its budget is spent. the dump is compiled once into a
+    binary index that is memory-mapped, so opening it costs next to nothing
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import os
+import re
+import math
+import mmap
+import struct
+import hashlib
+import unicodedata
+
+
+INDEX_SUFFIX = '.gaz'
+
+EARTH_RADIUS = 6_371_000
+
+# magic, version, cell size in degrees, records, name hashes
+HEADER = struct.Struct('<4sIdII')
+# lat, lng, offset and length of the name in the string section
+RECORD = struct.Struct('<ffII')
+# name hash, record
+NAME = struct.Struct('<QI')
+CELL = struct.Struct('<I')
+
+MAGIC = b'TAGZ'
+VERSION = 1
+
+
+def normalize(name):
+    # same folding as the geocode cache keys, punctuation dropped
+    name = unicodedata.normalize('NFKC', name).casefold()
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', name)).strip()
+
+
+def name_hash(name):
+    # stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def distance(lat1, lng1, lat2, lng2):
+    # haversine, in meters
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def grid_size(cellSize):
+    return math.ceil(180 / cellSize), math.ceil(360 / cellSize)
+
+
+def grid_cell(lat, lng, cellSize):
+    rows, cols = grid_size(cellSize)
+    row = min(max(int((lat + 90) / cellSize), 0), rows - 1)
+    col = min(max(int((lng + 180) / cellSize), 0), cols - 1)
+    return row, col
+
+
+def build_index(dumpPath, indexPath, cellSize=0.25):
+    '''
+        compiles a geonames dump (allCountries.txt or a country file, tab
+        separated) into the binary index read by Gazetteer:
+
+            header
+            records - every place, ordered by grid cell
+            cells   - index of the first record of every grid cell, plus an end marker
+            names   - (hash, record) for every name and alternate name, ordered by hash
+            strings - utf-8 names the records point into
+
+        the whole dump is held in memory while it is compiled, country dumps
+        compile in seconds. returns the number of places indexed.
+    '''
+    rows, cols = grid_size(cellSize)
+
+    places = []
+    with open(dumpPath, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 6:
+                continue
+
+            try:
+                lat, lng = float(fields[4]), float(fields[5])
+            except ValueError:
+                continue
+
+            row, col = grid_cell(lat, lng, cellSize)
+            names = {normalize(name) for name in [fields[1], fields[2], *fields[3].split(',')]} - {''}
+
+            places.append((row * cols + col, lat, lng, fields[1], names))
+
+    places.sort(key=lambda place: place[0])
+
+    records, strings, names = bytearray(), bytearray(), []
+    counts = [0] * (rows * cols)
+
+    for index, (cell, lat, lng, name, aliases) in enumerate(places):
+        encoded = name.encode('utf-8')
+        records += RECORD.pack(lat, lng, len(strings), len(encoded))
+        strings += encoded
+
+        counts[cell] += 1
+        names += [(name_hash(alias), index) for alias in aliases]
+
+    names.sort()
+
+    cells, start = bytearray(), 0
+    for count in counts:
+        cells += CELL.pack(start)
+        start += count
+    cells += CELL.pack(start)
+
+    tmpPath = indexPath + '.tmp'
+    with open(tmpPath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, cellSize, len(places), len(names)))
+        f.write(records)
+        f.write(cells)
+        f.write(b''.join(NAME.pack(*entry) for entry in names))
+        f.write(strings)
+    os.replace(tmpPath, indexPath)
+
+    return len(places)
+
+
+class Gazetteer:
+    '''
+        resolves a place name near a center from a memory-mapped index built
+        by build_index. an exact match of the folded name (or one of its
+        alternate names) is looked up by binary search over the name hashes;
+        failing that, the places in the grid cells around the center are
+        scored by the words they share with the name. either way only places
+        within the radius are considered, the nearest best match wins.
+    '''
+    # share of the words of the name and the place that must be common to both
+    __MIN_OVERLAP__ = 0.6
+
+    def __init__(self, indexPath, logging):
+        self.logging = logging
+
+        self.file = open(indexPath, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.cellSize, self.recordCount, self.nameCount = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{indexPath} is not a gazetteer index")
+
+        self.rows, self.cols = grid_size(self.cellSize)
+
+        self.recordsAt = HEADER.size
+        self.cellsAt = self.recordsAt + self.recordCount * RECORD.size
+        self.namesAt = self.cellsAt + (self.rows * self.cols + 1) * CELL.size
+        self.stringsAt = self.namesAt + self.nameCount * NAME.size
+
+    @classmethod
+    def open(cls, path, logging):
+        '''
+            opens an index, or the index of a geonames dump, which is built next
+            to the dump the first time and rebuilt when the dump is newer.
+        '''
+        if path.endswith(INDEX_SUFFIX):
+            return cls(path, logging)
+
+        indexPath = path + INDEX_SUFFIX
+        if not os.path.isfile(indexPath) or os.path.getmtime(indexPath) < os.path.getmtime(path):
+            logging.info(f"building gazetteer index of {path}")
+            count = build_index(path, indexPath)
+            logging.info(f"{count} places indexed into {indexPath}")
+
+        return cls(indexPath, logging)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def resolve(self, name, lat, lng, radius):
+        # {'lat', 'lng'} of the place called name within radius meters of the center, None if there is none
+        folded = normalize(name)
+        if len(folded) == 0:
+            return None
+
+        exact = [self.__record(index) for index in self.__named(name_hash(folded))]
+        found = self.__nearest(exact, lat, lng, radius)
+
+        if found is None:
+            found = self.__nearest(self.__similar(folded, lat, lng, radius), lat, lng, radius)
+
+        if found is None:
+            return None
+
+        # stored as float32, good to about a meter
+        return {'lat': round(found[0], 5), 'lng': round(found[1], 5)}
+
+    def __nearest(self, places, lat, lng, radius):
+        within = [(distance(lat, lng, place[0], place[1]), place) for place in places]
+        within = [(meters, place) for meters, place in within if meters <= radius]
+
+        if len(within) == 0:
+            return None
+
+        return min(within, key=lambda item: item[0])[1]
+
+    def __named(self, target):
+        # records indexed under a name hash: lower bound by binary search, then the run of equal hashes
+        lo, hi = 0, self.nameCount
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if NAME.unpack_from(self.map, self.namesAt + mid * NAME.size)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        while lo < self.nameCount:
+            value, index = NAME.unpack_from(self.map, self.namesAt + lo * NAME.size)
+            if value != target:
+                break
+            yield index
+            lo += 1
+
+    def __similar(self, folded, lat, lng, radius):
+        # places around the center sharing most of their words with the name
+        words = set(folded.split())
+        scored = []
+
+        for index in self.__around(lat, lng, radius):
+            place = self.__record(index)
+            placeWords = set(normalize(place[2]).split())
+            if len(placeWords) == 0:
+                continue
+
+            overlap = len(words & placeWords) / len(words | placeWords)
+            if overlap >= self.__MIN_OVERLAP__:
+                scored.append((overlap, place))
+
+        if len(scored) == 0:
+            return []
+
+        best = max(overlap for overlap, _ in scored)
+        return [place for overlap, place in scored if overlap == best]
+
+    def __around(self, lat, lng, radius):
+        # records in the grid cells covering the bounding box of the circle
+        dlat = math.degrees(radius / EARTH_RADIUS)
+        dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+
+        top, left = grid_cell(lat - dlat, lng - dlng, self.cellSize)
+        bottom, right = grid_cell(lat + dlat, lng + dlng, self.cellSize)
+
+        for row in range(top, bottom + 1):
+            # cells of a row are contiguous, so are their records
+            first = CELL.unpack_from(self.map, self.cellsAt + (row * self.cols + left) * CELL.size)[0]
+            last = CELL.unpack_from(self.map, self.cellsAt + (row * self.cols + right + 1) * CELL.size)[0]
+            yield from range(first, last)
+
+    def __record(self, index):
+        lat, lng, offset, length = RECORD.unpack_from(self.map, self.recordsAt + index * RECORD.size)
+        start = self.stringsAt + offset
+        return lat, lng, self.map[start:start + length].decode('utf-8')
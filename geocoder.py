@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+'''
+    pooled google places api client, so that place names can be geocoded in
+    the background while their reviews are being scraped, and the extraction
+    of coordinates embedded in tripadvisor pages, which makes most lookups
+    unnecessary
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import re
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+LD_JSON = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I)
+META_LAT = re.compile(r'<meta[^>]+property=["\']place:location:latitude["\'][^>]+content=["\'](-?[0-9.]+)', re.I)
+META_LNG = re.compile(r'<meta[^>]+property=["\']place:location:longitude["\'][^>]+content=["\'](-?[0-9.]+)', re.I)
+# location id of a tripadvisor url, the d3705683 in -g304557-d3705683-Reviews-
+LOCATION_ID = re.compile(r'-d([0-9]+)-')
+STATE_KEYS = [('latitude', 'longitude'), ('lat', 'lng'), ('lat', 'lon')]
+
+
+def location_id(url):
+    match = LOCATION_ID.search(url)
+    return match.group(1) if match is not None else None
+
+
+def coords_from_page(text, locationId=None):
+    '''
+        coordinates a tripadvisor page carries for its own location, looked up
+        in the json-ld geo block, the place meta tags and, given the location
+        id of the page, the object of the embedded page state that carries that
+        id, in that order. the page state also holds the parent city and
+        nearby listings, so without the id it is not used. returns {'lat',
+        'lng'} or None.
+    '''
+    for block in LD_JSON.findall(text):
+        try:
+            found = _find_geo(json.loads(block))
+        except ValueError:
+            continue
+        if found is not None:
+            return found
+
+    lat, lng = META_LAT.search(text), META_LNG.search(text)
+    if lat is not None and lng is not None:
+        found = _valid_coords(lat.group(1), lng.group(1))
+        if found is not None:
+            return found
+
+    if locationId is not None:
+        return _state_coords(text, locationId)
+
+    return None
+
+
+def _state_coords(text, locationId):
+    # every object of the page state keyed by the location id, read for its own coordinates
+    pattern = re.compile(r'"(?:locationId|location_id|locationID)"\s*:\s*"?' + re.escape(str(locationId)) + r'"?[,}\s]')
+
+    for match in pattern.finditer(text):
+        try:
+            node = json.loads(_enclosing_object(text, match.start()))
+        except (TypeError, ValueError):
+            continue
+
+        for candidate in [node] + [node.get(key) for key in ('geo', 'coords', 'coordinates', 'location')]:
+            if not isinstance(candidate, dict):
+                continue
+
+            for latKey, lngKey in STATE_KEYS:
+                if latKey in candidate and lngKey in candidate:
+                    found = _valid_coords(candidate[latKey], candidate[lngKey])
+                    if found is not None:
+                        return found
+
+    return None
+
+
+def _enclosing_object(text, pos):
+    # source of the innermost json object around pos, None if it is not closed
+    depth, start = 0, None
+    for index in range(pos, -1, -1):
+        if text[index] == '}':
+            depth += 1
+        elif text[index] == '{':
+            if depth == 0:
+                start = index
+                break
+            depth -= 1
+
+    if start is None:
+        return None
+
+    depth, quoted, escaped = 0, False, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if quoted:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                quoted = False
+        elif char == '"':
+            quoted = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+
+    return None
+
+
+def _find_geo(node):
+    if isinstance(node, dict):
+        geo = node.get('geo')
+        if isinstance(geo, dict) and 'latitude' in geo and 'longitude' in geo:
+            found = _valid_coords(geo['latitude'], geo['longitude'])
+            if found is not None:
+                return found
+
+        nodes = node.values()
+    elif isinstance(node, list):
+        nodes = node
+    else:
+        return None
+
+    for child in nodes:
+        found = _find_geo(child)
+        if found is not None:
+            return found
+
+    return None
+
+
+def _valid_coords(lat, lng):
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+
+    # 0,0 is what a missing location is often serialized as
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or lat == lng == 0:
+        return None
+
+    return {'lat': lat, 'lng': lng}
+
+
+class PlacesClient:
+    '''
+        one keep-alive session to the places api, shared by a bounded pool of
+        workers. transient failures (connection errors, 429 and 5xx) are
+        retried by urllib3 with exponential backoff, honouring Retry-After.
+
+        lookups are deduplicated by key: prefetch schedules a lookup on the
+        pool, and get returns its result, waiting for it if it is still
+        running, or runs the lookup in the calling thread if it was never
+        prefetched.
+    '''
+    __FIELDS__ = ['geometry', 'place_id']
+
+    def __init__(self, url, apiKey, logging, workers=4, timeout=10, retries=3, rateLimiter=None, recorder=None):
+        self.url = url
+        self.apiKey = apiKey
+        self.logging = logging
+        self.timeout = timeout
+        self.rateLimiter = rateLimiter
+        self.recorder = recorder
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.futures = dict()
+        self.lock = threading.Lock()
+
+    def query_url(self, name, bias):
+        pathParams = {
+            'input': name,
+            'inputtype': 'textquery',
+            'fields': ','.join(self.__FIELDS__),
+            'locationbias': bias,
+            'key': self.apiKey
+        }
+
+        return self.url + '?' + urlencode(pathParams)
+
+    def find_place(self, name, bias, cancelled=None):
+        # the json answer of findplacefromtext for name, None if cancelled while waiting for the limiter
+        url = self.query_url(name, bias)
+
+        if self.rateLimiter is not None and not self.rateLimiter.acquire(url, cancelled=cancelled):
+            return None
+
+        start = time.perf_counter()
+        try:
+            res = self.session.get(url, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            if self.rateLimiter is not None:
+                self.rateLimiter.feedback(url, error=True)
+            raise
+
+        if self.rateLimiter is not None:
+            self.rateLimiter.feedback(url, status=res.status_code, elapsed=time.perf_counter() - start)
+
+        res.raise_for_status()
+
+        if self.recorder is not None:
+            self.recorder.record(url, res.text, res.headers.get('Content-Type', 'application/json'))
+
+        return res.json()
+
+    def prefetch(self, key, resolve, *args):
+        # schedules resolve(*args) on the pool unless key is already scheduled
+        with self.lock:
+            if key not in self.futures:
+                self.futures[key] = self.executor.submit(resolve, *args)
+            return self.futures[key]
+
+    def pending(self, key):
+        with self.lock:
+            return self.futures.get(key)
+
+    def get(self, key, resolve, *args):
+        future = self.pending(key)
+
+        if future is None or future.cancelled():
+            return resolve(*args)
+
+        return future.result()
+
+    def close(self):
+        with self.lock:
+            futures = list(self.futures.values())
+
+        for future in futures:
+            future.cancel()
+
+        self.executor.shutdown(wait=False)
+        self.session.close()
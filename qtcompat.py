@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+'''
+    QObject and pyqtSignal from qgis (or PyQt5) when a qt application is
+    running, as inside the plugin, or plain python stand-ins when headless
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+
+class BoundSignal:
+    # per instance signal: slots are called synchronously, in the emitting thread
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot=None):
+        if slot is None:
+            self.slots = []
+        elif slot in self.slots:
+            self.slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self.slots):
+            slot(*args)
+
+
+class Signal:
+    # class level declaration, mirrors pyqtSignal(types...)
+    def __init__(self, *types):
+        self.types = types
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        signal = instance.__dict__.get(self.name)
+        if signal is None:
+            signal = instance.__dict__[self.name] = BoundSignal()
+        return signal
+
+
+class PlainObject:
+    # the parts of QObject the worker relies on
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def moveToThread(self, thread):
+        pass
+
+    def deleteLater(self):
+        pass
+
+
+try:
+    from qgis.PyQt.QtCore import QObject as QtObject, pyqtSignal as QtSignal, QCoreApplication
+except ImportError:
+    try:
+        from PyQt5.QtCore import QObject as QtObject, pyqtSignal as QtSignal, QCoreApplication
+    except ImportError:
+        QtObject, QtSignal, QCoreApplication = None, None, None
+
+# signals emitted from pool threads are queued to the thread that connected
+# them, and only a running qt application delivers them. the cli runs none,
+# so without one the plain stand-ins are used even when qt is installed
+if QCoreApplication is not None and QCoreApplication.instance() is not None:
+    QObject, pyqtSignal = QtObject, QtSignal
+else:
+    QObject, pyqtSignal = PlainObject, Signal
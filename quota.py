@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+'''
+    monthly places api budget: per day usage on disk, reservations for the
+    runs in progress, and refusal of lookups once the allowance is spent
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# kept next to the plugin, like scraper.dat
+USAGE_FILE = 'places_api_usage.json'
+
+
+class QuotaExceeded(Exception):
+    # a places api lookup was refused, the monthly allowance is spent
+    pass
+
+
+class QuotaManager:
+    '''
+        one json file shared by every run on this machine, holding
+            days         - places api calls made, by day (yyyy-mm-dd)
+            reservations - calls held back by the runs in progress, by run id
+
+        the limit is the number of calls the monthly allowance (in dollars)
+        pays for at the billing rate (dollars per 1000 calls). a run reserves
+        the calls it may need before it starts, and every call either draws on
+        that reservation or on what no other run has reserved. once neither is
+        left, consume refuses the call.
+
+        updates are made under a lock file and written through a temporary
+        file and an atomic rename, so concurrent runs never lose a count and a
+        crash never leaves a half written file. reservations of runs that died
+        expire after __RESERVATION_TTL__.
+    '''
+    __LOCK_TIMEOUT__ = 10
+    __RESERVATION_TTL__ = 12 * 3600
+
+    # how long a day is kept after its month is over
+    __HISTORY_DAYS__ = 400
+
+    def __init__(self, path, logging, allowance=200, billingRate=17):
+        self.path = path
+        self.logging = logging
+        self.allowance = allowance
+        self.billingRate = billingRate
+
+        self.runId = uuid.uuid4().hex
+        self.lock = threading.Lock()
+
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        except:
+            self.logging.warning("could not create quota directory.", exc_info=True)
+
+    @property
+    def limit(self):
+        return int(self.allowance * 1000 / self.billingRate)
+
+    def bill(self, usage):
+        return self.billingRate * usage / 1000
+
+    def usage(self, now=None):
+        # calls made this month
+        return self.__month_usage(self.__read(), now or datetime.now())
+
+    def available(self, now=None):
+        # calls this run may still make: its reservation plus what nobody reserved
+        now = now or datetime.now()
+        state = self.__read()
+        return max(self.limit - self.__month_usage(state, now) - self.__reserved(state, now, others=True), 0)
+
+    def reserve(self, count, now=None):
+        '''
+            holds up to count calls for this run, replacing its previous
+            reservation. returns the number of calls granted, fewer than count
+            when the budget is short.
+        '''
+        now = now or datetime.now()
+
+        with self.__locked() as state:
+            free = self.limit - self.__month_usage(state, now) - self.__reserved(state, now, others=True)
+            granted = max(min(count, free), 0)
+
+            state['reservations'][self.runId] = {'count': granted, 'expires': now.timestamp() + self.__RESERVATION_TTL__}
+
+        return granted
+
+    def consume(self, now=None):
+        # counts one call, returns its running monthly total, raises QuotaExceeded if no budget is left
+        now = now or datetime.now()
+
+        with self.__locked() as state:
+            usage = self.__month_usage(state, now)
+            reservation = state['reservations'].get(self.runId)
+
+            if reservation is not None and reservation['count'] > 0:
+                reservation['count'] -= 1
+            elif usage + self.__reserved(state, now, others=True) >= self.limit:
+                raise QuotaExceeded(f"places api allowance of {self.limit} calls this month is spent")
+
+            day = now.strftime('%Y-%m-%d')
+            state['days'][day] = state['days'].get(day, 0) + 1
+
+        return usage + 1
+
+    def release(self):
+        # gives the unused part of this run's reservation back
+        with self.__locked() as state:
+            state['reservations'].pop(self.runId, None)
+
+    def seed(self, count, day):
+        # carries a usage count kept elsewhere over, unless this month already has usage on record
+        with self.__locked() as state:
+            if self.__month_usage(state, day) == 0 and count > 0:
+                state['days'][day.strftime('%Y-%m-%d')] = count
+
+    def __month_usage(self, state, now):
+        month = now.strftime('%Y-%m')
+        return sum(count for day, count in state['days'].items() if day.startswith(month))
+
+    def __reserved(self, state, now, others=False):
+        return sum(
+            reservation['count'] for runId, reservation in state['reservations'].items()
+            if reservation['expires'] > now.timestamp() and not (others and runId == self.runId)
+        )
+
+    def __empty(self):
+        return {
+            'days': dict(),
+            'reservations': dict()
+        }
+
+    def __read(self):
+        if not os.path.isfile(self.path):
+            return self.__empty()
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = self.__empty()
+                state.update(json.load(f))
+                return state
+        except:
+            self.logging.warning("could not read places api usage.", exc_info=True)
+            return self.__empty()
+
+    def __write(self, state):
+        now = time.time()
+
+        # expired reservations and days long past are dropped on the way out
+        state['reservations'] = {runId: reservation for runId, reservation in state['reservations'].items() if reservation['expires'] > now}
+        oldest = datetime.fromtimestamp(now - self.__HISTORY_DAYS__ * 24 * 3600).strftime('%Y-%m-%d')
+        state['days'] = {day: count for day, count in state['days'].items() if day >= oldest}
+
+        tmpPath = self.path + '.tmp'
+        try:
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+            os.replace(tmpPath, self.path)
+        except:
+            self.logging.warning("could not write places api usage.", exc_info=True)
+
+    @contextmanager
+    def __locked(self):
+        '''
+            read-modify-write of the usage file, exclusive across threads and
+            processes. a lock file older than __LOCK_TIMEOUT__ is left over by a
+            crashed run and broken.
+        '''
+        lockPath = self.path + '.lock'
+
+        with self.lock:
+            deadline = time.monotonic() + self.__LOCK_TIMEOUT__
+            while True:
+                try:
+                    fd = os.open(lockPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                    os.close(fd)
+                    break
+                except FileExistsError:
+                    try:
+                        if time.time() - os.path.getmtime(lockPath) > self.__LOCK_TIMEOUT__:
+                            os.remove(lockPath)
+                            continue
+                    except OSError:
+                        continue
+
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"places api usage is locked by {lockPath}")
+                    time.sleep(0.05)
+
+            try:
+                state = self.__read()
+                yield state
+                self.__write(state)
+            finally:
+                try:
+                    os.remove(lockPath)
+                except OSError:
+                    pass
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+'''
+    per-host request pacing shared by the browser, the http fetches and the
+    places api calls
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    '''
+        rate tokens per second, up to capacity of them saved up for bursts.
+        tokens go negative when requests are reserved ahead of time, so that
+        concurrent callers queue up instead of all waking at once.
+    '''
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.maxRate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+        self.blockedUntil = 0
+        self.failures = 0
+
+    def reserve(self, now):
+        # returns how long the caller has to wait for its token
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        return max(wait, self.blockedUntil - now)
+
+
+class RateLimiter:
+    '''
+        token bucket per host with additive increase / multiplicative decrease:
+        every fast, successful request raises the rate of its host by
+        __INCREASE__ up to the host budget, a slow one cuts it by __SLOW_FACTOR__,
+        and a 429, a 5xx or a timeout halves it and blocks the host for an
+        exponentially growing cooldown (or the server's Retry-After).
+
+        budgets maps host names to their maximum requests per second, other
+        hosts get defaultRate. a key with a path ("host/path") gives the urls
+        under that path a bucket of their own, for endpoints that share a host.
+    '''
+    __INCREASE__ = 0.1
+    __SLOW_FACTOR__ = 0.75
+    __BACKOFF_FACTOR__ = 0.5
+    __MIN_RATE__ = 0.05
+
+    __COOLDOWN_BASE__ = 2
+    __COOLDOWN_MAX__ = 60
+
+    __WAIT_SLICE__ = 0.5
+
+    def __init__(self, logging, budgets=None, defaultRate=2.0, burst=2, slowThreshold=10):
+        self.logging = logging
+        self.budgets = budgets if budgets is not None else dict()
+        self.defaultRate = defaultRate
+        self.burst = burst
+        self.slowThreshold = slowThreshold
+
+        self.buckets = dict()
+        self.lock = threading.Lock()
+
+    def rate(self, url):
+        with self.lock:
+            return self.__bucket(self.__host(url)).rate
+
+    def acquire(self, url, cancelled=None):
+        '''
+            blocks until a request to the host of url may go out. waits in short
+            slices so that a stopped run is not held up by a long cooldown.
+            returns False if cancelled() turned true while waiting.
+        '''
+        deadline = time.monotonic() + self.__reserve(url)
+
+        while True:
+            if cancelled is not None and cancelled():
+                return False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+
+            time.sleep(min(remaining, self.__WAIT_SLICE__))
+
+    async def acquire_async(self, url, cancelled=None):
+        deadline = time.monotonic() + self.__reserve(url)
+
+        while True:
+            if cancelled is not None and cancelled():
+                return False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+
+            await asyncio.sleep(min(remaining, self.__WAIT_SLICE__))
+
+    def feedback(self, url, status=None, elapsed=None, error=False, retryAfter=None):
+        '''
+            adapts the rate of the host of url to how the request went. returns
+            True if the request was throttled or failed on the server side and
+            is worth retrying.
+        '''
+        throttled = error or status == 429 or (status is not None and status >= 500)
+        host = self.__host(url)
+
+        with self.lock:
+            bucket = self.__bucket(host)
+
+            if throttled:
+                bucket.failures += 1
+                bucket.rate = max(self.__MIN_RATE__, bucket.rate * self.__BACKOFF_FACTOR__)
+                bucket.tokens = min(bucket.tokens, 0)
+
+                cooldown = self.__cooldown(bucket.failures, retryAfter)
+                bucket.blockedUntil = max(bucket.blockedUntil, time.monotonic() + cooldown)
+            elif elapsed is not None and elapsed > self.slowThreshold:
+                bucket.rate = max(self.__MIN_RATE__, bucket.rate * self.__SLOW_FACTOR__)
+            else:
+                bucket.failures = 0
+                bucket.rate = min(bucket.maxRate, bucket.rate + self.__INCREASE__)
+
+            rate = bucket.rate
+
+        if throttled:
+            self.logging.warning(f"{host} throttled (status {status}), backing off to {rate:.2f} requests/s for {cooldown:.0f} s")
+
+        return throttled
+
+    def __reserve(self, url):
+        with self.lock:
+            return self.__bucket(self.__host(url)).reserve(time.monotonic())
+
+    def __bucket(self, host):
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.budgets.get(host, self.defaultRate), self.burst)
+        return self.buckets[host]
+
+    def __cooldown(self, failures, retryAfter):
+        try:
+            return min(float(retryAfter), self.__COOLDOWN_MAX__)
+        except (TypeError, ValueError):
+            return min(self.__COOLDOWN_BASE__ ** failures, self.__COOLDOWN_MAX__)
+
+    def __host(self, url):
+        # bucket key of url: its longest budgeted host/path prefix, else its host
+        parts = urlsplit(url)
+        endpoint = parts.netloc + parts.path
+
+        prefixes = [key for key in self.budgets if '/' in key and endpoint.startswith(key)]
+        if len(prefixes) > 0:
+            return max(prefixes, key=len)
+
+        return parts.netloc
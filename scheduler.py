@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+'''
+    picks the stored places that most need a refresh, so that periodic runs
+    keep the cache fresh without re-scraping everything
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import math
+from datetime import datetime, timedelta, timezone
+
+
+def review_date(review):
+    # reviews of things to do only carry a month, they are taken as the 1st
+    metadata = review['metadata']
+    try:
+        return datetime(int(metadata['year']), int(metadata['month']), int(metadata.get('day') or 1))
+    except:
+        return None
+
+
+def as_utc(moment):
+    # pymongo hands back stored datetimes as naive utc
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def review_velocity(reviews, minSpanDays=30):
+    '''
+        reviews per day over the time spanned by the given reviews. the stored
+        reviews are the newest ones, so this tracks the recent rate of a place.
+        spans shorter than minSpanDays are stretched to it, a handful of reviews
+        from the same week does not make a place busy.
+    '''
+    dates = [date for date in map(review_date, reviews) if date is not None]
+
+    if len(dates) == 0:
+        return 0.0
+
+    span = (max(dates) - min(dates)).days
+    return len(dates) / max(span, minSpanDays)
+
+
+class RefreshScheduler:
+    '''
+        the priority of a stored place is its staleness (days since it was last
+        scraped) times its review velocity (reviews per day), i.e. roughly the
+        number of reviews it is missing. a quiet place still ages through
+        __MIN_VELOCITY__, and places stored before timestamps were recorded
+        are taken as __UNSTAMPED_STALENESS__ days old.
+
+        mongodb narrows the stored places down to those of the area scraped
+        more than __MIN_STALENESS__ days ago, and hands over the
+        __CANDIDATES_PER_SLOT__ * budget least recently scraped of them, which
+        are then ranked by priority.
+    '''
+    __MIN_VELOCITY__ = 0.01
+    __UNSTAMPED_STALENESS__ = 365
+
+    __MIN_STALENESS__ = 1
+    __CANDIDATES_PER_SLOT__ = 20
+
+    __FIELDS__ = ['name', 'url', 'page', 'coords', 'last_scraped', 'review_velocity']
+
+    def __init__(self, dbm, logging):
+        self.dbm = dbm
+        self.logging = logging
+
+    @staticmethod
+    def bounds(lat, lng, radius):
+        # (south, west, north, east) of the box around a circle of radius meters
+        dlat = math.degrees(radius / 6_371_000)
+        dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+        return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+    def priority(self, doc, now=None):
+        now = as_utc(now) if now is not None else datetime.now(timezone.utc)
+
+        lastScraped = doc.get('last_scraped')
+        if lastScraped is not None:
+            staleness = (now - as_utc(lastScraped)).total_seconds() / 86400
+        else:
+            staleness = self.__UNSTAMPED_STALENESS__
+
+        velocity = max(doc.get('review_velocity') or 0.0, self.__MIN_VELOCITY__)
+
+        return max(staleness, 0) * velocity
+
+    def plan(self, budget, area=None, keep=None, now=None):
+        '''
+            returns up to budget stored places, most stale first, as place
+            results ready to be scraped again. area (lat, lng, radius in
+            meters) restricts the candidates to its bounding box in the query,
+            keep optionally filters them further, e.g. to the exact circle.
+        '''
+        now = as_utc(now) if now is not None else datetime.now(timezone.utc)
+        budget = max(0, int(budget))
+
+        if budget == 0:
+            return []
+
+        docs = self.dbm.stale_places(
+            self.__FIELDS__,
+            staleBefore=now - timedelta(days=self.__MIN_STALENESS__),
+            bounds=self.bounds(*area) if area is not None else None,
+            limit=budget * self.__CANDIDATES_PER_SLOT__
+        )
+
+        if keep is not None:
+            docs = list(filter(keep, docs))
+
+        ranked = sorted(docs, key=lambda doc: self.priority(doc, now), reverse=True)
+        planned = ranked[:budget]
+
+        self.logging.info(f"refresh planned for {len(planned)} of {len(docs)} candidate places")
+
+        return [{'name': doc['name'], 'url': doc['url'], 'page': doc.get('page')} for doc in planned]
@@ -26,6 +26,7 @@ __status__ = "Development"
 
 import json
 import os
+import logging
 import sys
 from operator import itemgetter
 import re
@@ -33,6 +34,7 @@ import re
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from ta_scraper import TAapi
+from quota import QuotaManager, USAGE_FILE
 
 from qgis.PyQt import uic
 from qgis.PyQt import QtWidgets
@@ -188,19 +190,11 @@ class TripAdvisorDialog(QtWidgets.QDialog, FORM_CLASS):
 
             f.close()
 
-        localFilePath = os.path.join(os.path.dirname(__file__), "scraper.dat")
-
-        if os.path.exists(localFilePath) and os.path.isfile(localFilePath):
-            with open(localFilePath, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                d = {key: val for key, val in [line.strip('\n').split('=') for line in lines]}
-
-                if 'MAPS_API_USAGE' in d:
-                    usage =  int(d['MAPS_API_USAGE'])
-                    bill = self.__PLACES_API_BILLING_RATE__ * usage / 1000
-                    self._api_usage_from_worker(usage, bill)
-        else:
-            pass
+        # places api usage of this month, kept per day by the scraper
+        quota = QuotaManager(os.path.join(os.path.dirname(__file__), USAGE_FILE), logging=logging, billingRate=self.__PLACES_API_BILLING_RATE__)
+        usage = quota.usage()
+        if usage > 0:
+            self._api_usage_from_worker(usage, quota.bill(usage))
 
     def _start_download_thread(self):
         # start download thread
@@ -242,7 +236,7 @@ class TripAdvisorDialog(QtWidgets.QDialog, FORM_CLASS):
                 self.apiKey.setFocus()
                 return
 
-            if len(keyword) == 0:
+            if len(keyword.replace(';', '').strip()) == 0:
                 QMessageBox.warning(self, "Error", "keyword is empty")
                 self.keyword.setFocus()
                 return
@@ -320,7 +314,11 @@ class TripAdvisorDialog(QtWidgets.QDialog, FORM_CLASS):
                 self.thread = QThread()
 
                 # create worker
-                self.worker = TAapi(keyword, lat, lng, radius, apiKey, dbName, tableName, maxPlaces, maxReviews, csvFilePath)
+                # several keywords separated by ';' run as one batch around the same center
+                keywords = [k.strip() for k in keyword.split(';') if len(k.strip()) > 0]
+                jobs = [{'location': k} for k in keywords] if len(keywords) > 1 else None
+
+                self.worker = TAapi(keywords[0], lat, lng, radius, apiKey, dbName, tableName, maxPlaces, maxReviews, csvFilePath, jobs=jobs)
                 self.worker.moveToThread(self.thread)
 
                 self.worker.addMessage.connect(self._message_from_worker)
@@ -328,8 +326,12 @@ class TripAdvisorDialog(QtWidgets.QDialog, FORM_CLASS):
                 self.worker.progress.connect(self._progress_from_worker)
                 self.worker.total.connect(self._total_from_worker)
                 self.worker.apiUsage.connect(self._api_usage_from_worker)
+                self.worker.jobStarted.connect(self._job_started_from_worker)
 
-                self.thread.started.connect(self.worker.run)
+                if jobs is not None:
+                    self.thread.started.connect(self.worker.run_batch)
+                else:
+                    self.thread.started.connect(self.worker.run)
                 self.worker.finished.connect(self.thread.quit)
                 self.worker.finished.connect(self.worker.deleteLater)
                 self.thread.finished.connect(self.thread.deleteLater)
@@ -483,6 +485,10 @@ class TripAdvisorDialog(QtWidgets.QDialog, FORM_CLASS):
     def _total_from_worker(self, total):
         self.progressBar.setMaximum(int(total))
 
+    def _job_started_from_worker(self, index, keyword):
+        self.logBox.append(f"job {index + 1}: {keyword}")
+        self.progressBar.setValue(0)
+
     def _api_usage_from_worker(self, usage, bill):
         self.apiUsage.setText(f"{usage} times - $ {'{0:,.2f}'.format(bill)}")
         self.apiUsage.repaint()
@@ -19,7 +19,8 @@ __maintainer__ = "Arkaprava Ghosh"
 __email__ = "arkaprava.mail@gmail.com"
 __status__ = "Development"
 
-from datetime import datetime
+from datetime import datetime, timezone
+import asyncio
 import os
 import sys
 import time
@@ -30,6 +31,15 @@ import requests
 import json
 import csv
 import math
+import hashlib
+import unicodedata
+import shutil
+import subprocess
+import threading
+import socket
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from collections import deque
 from operator import itemgetter
 
 
@@ -41,36 +51,88 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.keys import Keys
-from subprocess import CREATE_NO_WINDOW
 
 from webdriver_manager.chrome import ChromeDriverManager
 
 from pyjsparser import parse 
 
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 from db import DBManager
+from driver_pool import DriverPool
+from checkpoint import CheckpointStore
+from scheduler import RefreshScheduler, review_velocity
+from ratelimit import RateLimiter
+from timing import Timings, timed
+from geocoder import PlacesClient, coords_from_page, location_id
+from quota import QuotaManager, QuotaExceeded, USAGE_FILE
+from gazetteer import Gazetteer
 
-from qgis.PyQt.QtCore import QObject, pyqtSignal
+from qtcompat import QObject, pyqtSignal
 
 from vector import Vector3d
 
 
 DRIVER_VERSION = 107
 
+# only windows has console windows to hide
+CREATE_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+EXE_SUFFIX = '.exe' if sys.platform == 'win32' else ''
+
+
+# content settings that keep chrome from downloading assets we never read.
+# image urls are still taken from the src attributes of the img tags.
+LEAN_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.managed_default_content_settings.media_stream': 2,
+    'profile.default_content_setting_values.notifications': 2,
+    'profile.default_content_setting_values.geolocation': 2
+}
+
+# fonts, media and ad/analytics hosts, blocked through devtools
+LEAN_BLOCKED_URLS = [
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*doubleclick.net*', '*googlesyndication.com*', '*googletagmanager.com*', '*googletagservices.com*',
+    '*google-analytics.com*', '*adservice.google.*', '*amazon-adsystem.com*', '*facebook.net*',
+    '*scorecardresearch.com*', '*criteo.com*', '*criteo.net*', '*taboola.com*', '*outbrain.com*',
+    '*adsrvr.org*', '*pubmatic.com*', '*rubiconproject.com*', '*casalemedia.com*', '*quantserve.com*',
+    '*hotjar.com*', '*branch.io*', '*demdex.net*', '*omtrdc.net*', '*krxd.net*', '*bing.com/bat*'
+]
+
+
+def chrome_options(lean=False):
+    op = webdriver.ChromeOptions()
 
-op = webdriver.ChromeOptions()
+    op.add_argument('--headless')
+    op.add_argument('--ignore-certificate-errors-spki-list')
+    op.add_argument('--ignore-ssl-errors')
+    op.add_argument('--log-level=3')
+    op.add_experimental_option("excludeSwitches", ["enable-logging"])
+    op.add_argument('--disable-gpu')
+    op.add_argument('--no-sandbox')
+    op.add_argument("--disable-extensions")
+    op.add_experimental_option("useAutomationExtension", False)
+    op.add_argument("--proxy-server='direct://'")
+    op.add_argument("--proxy-bypass-list=*")
+    op.add_argument("--start-maximized")
 
-op.add_argument('--headless')
-op.add_argument('--ignore-certificate-errors-spki-list')
-op.add_argument('--ignore-ssl-errors')
-op.add_argument('--log-level=3')
-op.add_experimental_option("excludeSwitches", ["enable-logging"])
-op.add_argument('--disable-gpu')
-op.add_argument('--no-sandbox')
-op.add_argument("--disable-extensions")
-op.add_experimental_option("useAutomationExtension", False)
-op.add_argument("--proxy-server='direct://'")
-op.add_argument("--proxy-bypass-list=*")
-op.add_argument("--start-maximized")
+    if lean:
+        op.add_experimental_option("prefs", LEAN_PREFS)
+        op.add_argument('--blink-settings=imagesEnabled=false')
+        op.add_argument('--disable-remote-fonts')
+        op.add_argument('--autoplay-policy=user-gesture-required')
+
+    return op
 
 
 
@@ -82,6 +144,9 @@ class TAapi(QObject):
     addError = pyqtSignal(str)
     total = pyqtSignal(int)
     apiUsage = pyqtSignal(int, float)
+    jobStarted = pyqtSignal(int, str)
+    jobFinished = pyqtSignal(int, list)
+    timings = pyqtSignal(dict)
 
     __BASE_URL__ = 'https://www.tripadvisor.in'
     __MAPS_BASE_URL__ = 'https://maps.googleapis.com/maps/api/place/findplacefromtext/json'
@@ -91,12 +156,242 @@ class TAapi(QObject):
     __SEARCH_FILTER_APPEAR_WAIT__ = 10
     __REVIEW_TAB_APPEAR_WAIT__ = 10
     __SCROLL_PAUSE_TIME__ = 5
+    __SCROLL_SETTLE_TIME__ = 0.75
+    __SCROLL_MAX_TIME__ = 20
     __CLICKABLE_WAIT_TIME__ = 5
     __IMAGE_LOAD_WAIT__ = 5
 
+    # where chrome is looked up to read its version without launching a session
+    __CHROME_BINARIES__ = {
+        'win32': [
+            r'%PROGRAMFILES%\Google\Chrome\Application\chrome.exe',
+            r'%PROGRAMFILES(X86)%\Google\Chrome\Application\chrome.exe',
+            r'%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe'
+        ],
+        'darwin': [
+            '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+        ],
+        'linux': [
+            'google-chrome',
+            'google-chrome-stable',
+            'chromium',
+            'chromium-browser'
+        ]
+    }
+
+    __DRIVER_POOL_SIZE__ = 3
+    __DRIVER_IDLE_TIMEOUT__ = 30
+
+    # stored places re-scraped per refresh run
+    __REFRESH_BUDGET__ = 50
+
+    # a queued place not finished within this many seconds goes back to the queue
+    __LEASE_TIMEOUT__ = 900
+
+    # a checkpoint not written to for this many seconds is stale, its job starts over
+    __CHECKPOINT_MAX_AGE__ = 24 * 3600
+
+    __REVIEWS_PAGE_SIZE__ = 10
+    __PAGE_FETCH_WORKERS__ = 4
+
+    # offset pages in flight while looking for the newest stored review
+    __DELTA_PAGE_WINDOW__ = 1
+
+    __HTTP_TIMEOUT__ = 15
+    __HTTP_RETRIES__ = 3
+
+    # maximum requests per second to the site and to the places api, the limiter backs off below these
+    __SITE_RATE__ = 2.0
+    __MAPS_RATE__ = 10.0
+    __SLOW_RESPONSE__ = 8
+
+    # concurrent places api lookups
+    __GEOCODE_WORKERS__ = 4
+    __HTTP_HEADERS__ = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9'
+    }
+
+    # per layout xpaths of a review container and its fields, relative to the review tab
+    # 'todo' is the things-to-do layout, 'place' the newer attraction layout
+    __REVIEW_XPATHS__ = {
+        'todo': {
+            'container': ".//div[contains(@class, 'lgfjP')]",
+            'rating': ".//span[contains(@class, 'ui_bubble_rating')]",
+            'text': ".//div[contains(@class, 'fIrGe')]/q/span",
+            'title': ".//div[contains(@class, 'KgQgP')]/a/span/span",
+            'date': ".//span[contains(@class, 'teHYY')]",
+            'images': ".//div[contains(@class, 'pDrIj')]",
+            'more': ".//span[contains(@class, 'Ignyf')]"
+        },
+        'place': {
+            'container': "./div",
+            'rating': ".//*[name()='svg'][contains(@class, 'UctUV')]",
+            'text': ".//div[contains(@class, 'biGQs _P pZUbB KxBGd')]/span",
+            'title': ".//div[contains(@class, 'biGQs _P fiohW qWPrE ncFvv fOtGX')]/a/span",
+            'date': ".//div[contains(@class, 'TreSq')]/div",
+            'images': ".//div[contains(@class, 'LblVz')]",
+            'more': ".//div[contains(@class, 'lszDU')]/button/span"
+        }
+    }
+
+    # review tab of each layout and its next page link, used by the http fetcher
+    __REVIEW_TAB_XPATHS__ = {
+        'todo': "//div[@class='FTCTN']",
+        'place': "//div[@class='LbPSX']"
+    }
+    __NEXT_PAGE_XPATHS__ = {
+        'todo': "//div[contains(@class, 'ui_pagination')]//a[contains(@class, 'ui_button nav next')]/@href",
+        'place': "//div[contains(@class, 'UCacc')]/a[@aria-label='Next page']/@href"
+    }
+
+    # keeps scrolling to the bottom while content is appended (observed through
+    # mutations and height polling) and calls back once the height is stable
+    __SCROLL_SETTLE_SCRIPT__ = '''
+        var settle = arguments[0], limit = arguments[1], done = arguments[arguments.length - 1];
+        var start = Date.now(), lastChange = start, lastHeight = document.body.scrollHeight;
+
+        function check() {
+            var height = document.body.scrollHeight;
+            if (height !== lastHeight) {
+                lastHeight = height;
+                lastChange = Date.now();
+                window.scrollTo(0, height);
+            }
+        }
+
+        var observer = new MutationObserver(check);
+        observer.observe(document.body, {childList: true, subtree: true});
+
+        window.scrollTo(0, lastHeight);
+
+        (function poll() {
+            check();
+            var now = Date.now();
+            if (now - lastChange >= settle || now - start >= limit) {
+                observer.disconnect();
+                done(lastHeight);
+            } else {
+                setTimeout(poll, 50);
+            }
+        })();
+    '''
+
+    # evaluates the xpaths above for every review container in one call
+    __XPATH_HELPERS_SCRIPT__ = '''
+        function nodes(xpath, context) {
+            var snapshot = document.evaluate(xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var out = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) {
+                out.push(snapshot.snapshotItem(i));
+            }
+            return out;
+        }
+
+        function node(xpath, context) {
+            return document.evaluate(xpath, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+    '''
+
+    # clicks every truncated review's read more button, then waits once for the
+    # review tab to stop mutating
+    __EXPAND_REVIEWS_SCRIPT__ = __XPATH_HELPERS_SCRIPT__ + '''
+        var root = arguments[0], xpaths = arguments[1], skipLast = arguments[2], settle = arguments[3], limit = arguments[4];
+        var done = arguments[arguments.length - 1];
+
+        var containers = nodes(xpaths.container, root);
+        if (skipLast) {
+            containers = containers.slice(0, -1);
+        }
+
+        var clicked = 0;
+        containers.forEach(function (container) {
+            var button = node(xpaths.more, container);
+            if (button && button.innerText.indexOf('more') !== -1 && !button.disabled) {
+                button.click();
+                clicked++;
+            }
+        });
+
+        if (clicked === 0) {
+            return done(0);
+        }
+
+        var start = Date.now(), lastChange = start;
+        var observer = new MutationObserver(function () { lastChange = Date.now(); });
+        observer.observe(root, {childList: true, subtree: true, characterData: true});
+
+        (function poll() {
+            var now = Date.now();
+            if (now - lastChange >= settle || now - start >= limit) {
+                observer.disconnect();
+                done(clicked);
+            } else {
+                setTimeout(poll, 50);
+            }
+        })();
+    '''
+
+    __EXTRACT_REVIEWS_SCRIPT__ = __XPATH_HELPERS_SCRIPT__ + '''
+        var root = arguments[0], xpaths = arguments[1], ratingAttr = arguments[2], skipLast = arguments[3];
+
+        function text(xpath, context) {
+            var elem = node(xpath, context);
+            return elem ? elem.innerText : null;
+        }
+
+        // images not scrolled into view yet still hold a placeholder in src,
+        // the real url waits in one of the lazy load attributes
+        function source(img) {
+            var src = img.getAttribute('src');
+            if (src && src.indexOf('data:') !== 0) {
+                return src;
+            }
+
+            var lazy = img.getAttribute('data-src') || img.getAttribute('data-lazyurl') || img.getAttribute('data-lazysrc');
+            if (lazy) {
+                return lazy;
+            }
+
+            var srcset = img.getAttribute('srcset') || img.getAttribute('data-srcset');
+            if (srcset) {
+                // the last candidate is the largest
+                var candidates = srcset.split(',');
+                return candidates[candidates.length - 1].trim().split(' ')[0];
+            }
+
+            return null;
+        }
+
+        var containers = nodes(xpaths.container, root);
+        if (skipLast) {
+            // the last child of the attraction review tab is the pagination bar
+            containers = containers.slice(0, -1);
+        }
+
+        return containers.map(function (container) {
+            var rating = node(xpaths.rating, container);
+            var imageContainer = node(xpaths.images, container);
+            var images = imageContainer ? Array.prototype.map.call(imageContainer.getElementsByTagName('img'), source) : [];
+
+            return {
+                rating: rating ? rating.getAttribute(ratingAttr) : null,
+                title: text(xpaths.title, container),
+                text: text(xpaths.text, container),
+                date: text(xpaths.date, container),
+                images: images.filter(function (src) { return src && src.indexOf('data:') !== 0; })
+            };
+        });
+    '''
+
     __PLACES_API_BILLING_RATE__ = 17
     __PLACES_API_MONTHLY_ALLOWANCE__ = 200
 
+    # lifetime of cached places api answers, "not found" answers are retried sooner
+    __GEOCODE_TTL__ = 90 * 24 * 3600
+    __GEOCODE_MISS_TTL__ = 7 * 24 * 3600
+
     __IMAGES_MAX_RES__ = 2400
 
     PLACES_MAX = 5
@@ -119,7 +414,7 @@ class TAapi(QObject):
         'december'  : 12
     }
 
-    def __init__(self, location, lat, lng, radius, apiKey, dbName, tableName, maxPlaces, maxReviews, csvFilePath):
+    def __init__(self, location, lat, lng, radius, apiKey, dbName, tableName, maxPlaces, maxReviews, csvFilePath, poolSize=None, scriptExtraction=True, httpFetch=True, leanBrowsing=True, offsetPaging=True, resume=True, incremental=False, jobs=None, refreshBudget=None, baseUrl=None, mapsUrl=None, recorder=None, dbHost="localhost", prefetchCoords=True, quotaPolicy='defer', gazetteer=None):
         QObject.__init__(self)
         
         self.location = location
@@ -136,11 +431,50 @@ class TAapi(QObject):
         self.REVIEWS_MAX = maxReviews
 
         self.PLACES_SO_FAR = 0
-        self.REVIEWS_SO_FAR = 0
 
         self.csvFilePath = csvFilePath
 
+        # site and places api endpoints, pointed at a fixtures.ReplayServer for offline runs
+        self.baseUrl = baseUrl.rstrip('/') if baseUrl is not None else self.__BASE_URL__
+        self.mapsUrl = mapsUrl if mapsUrl is not None else self.__MAPS_BASE_URL__
+
+        # fixtures.FixtureRecorder capturing every page and places api answer of the run
+        self.recorder = recorder
+        self.recordedKey = None
+
+        # number of chrome sessions scraping places concurrently
+        self.poolSize = poolSize if poolSize is not None else self.__DRIVER_POOL_SIZE__
+
+        # extract each review page with one script call instead of per-field lookups
+        self.scriptExtraction = scriptExtraction
+
+        # try plain http for server rendered review pages before driving chrome
+        self.httpFetch = httpFetch and lxml_html is not None
+
+        # fetch the review pages of a place concurrently through their offset urls
+        self.offsetPaging = offsetPaging
+        self.pageExecutor = ThreadPoolExecutor(max_workers=self.__PAGE_FETCH_WORKERS__)
+
+        # refresh cached places with only the reviews posted since they were stored.
+        # off by default, a fully cached run then fetches no page at all;
+        # run_refresh turns it on for the places the scheduler picks
+        self.incremental = incremental
+
+        # skip images, fonts, media and ad/analytics requests in chrome
+        self.leanBrowsing = leanBrowsing
+
+        # keep-alive session shared by the pool threads
+        self.session = requests.Session()
+        self.session.headers.update(self.__HTTP_HEADERS__)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.poolSize, pool_maxsize=self.poolSize + self.__PAGE_FETCH_WORKERS__)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
         self.running = None
+        self.halted = False
+
+        # guards state shared between the pool threads
+        self.lock = threading.Lock()
 
         # override logger to add signalling 
         class SignalLogger(logging.Logger):
@@ -172,68 +506,111 @@ class TAapi(QObject):
             level=logging.INFO
         )
 
-        try:
-            os.system(f"attrib +h {logFilePath}")
-        except:
-            pass
+        if sys.platform == 'win32':
+            try:
+                os.system(f"attrib +h {logFilePath}")
+            except:
+                pass
 
         self.logger = logging.getLogger('tripadvisor')
         self.logger._set_outer_instance(self)
 
+        # per-stage and per-place durations, reported at the end of each run
+        self.timer = Timings()
+
+        # paces browser loads, http fetches and places api calls per host
+        maps, site = urlsplit(self.mapsUrl), urlsplit(self.baseUrl)
+        # a replay server serves both from one host, the places endpoint then gets a bucket of its own
+        mapsKey = maps.netloc if maps.netloc != site.netloc else maps.netloc + maps.path
+        budgets = {
+            mapsKey: self.__MAPS_RATE__,
+            site.netloc: self.__SITE_RATE__
+        }
+        self.rateLimiter = RateLimiter(logging=self.logger, budgets=budgets, slowThreshold=self.__SLOW_RESPONSE__)
+
+        # places api lookups run on their own pool, overlapping the review scraping
+        self.prefetchCoords = prefetchCoords
+        self.geocoder = PlacesClient(
+            self.mapsUrl, self.apiKey, logging=self.logger,
+            workers=self.__GEOCODE_WORKERS__, timeout=self.__HTTP_TIMEOUT__, retries=self.__HTTP_RETRIES__,
+            rateLimiter=self.rateLimiter, recorder=self.recorder
+        )
+
+        # offline fallback for names the places api cannot resolve, from a
+        # geonames dump (indexed on first use) or its index
+        self.gazetteer = None
+        if gazetteer is not None:
+            try:
+                self.gazetteer = Gazetteer.open(gazetteer, logging=self.logger)
+            except:
+                self.logger.warning(f"could not open gazetteer {gazetteer}", exc_info=True)
+
+        # on-disk frontier of this job, an interrupted run picks up from it
+        self.resume = resume
+        self.checkpoint = self.__job_checkpoint()
+
+        # keyword/center/radius jobs for run_batch, the arguments above are the defaults of each job
+        self.jobs = jobs if jobs is not None else []
+
+        # shared by all jobs of a batch: places api results by geocode key and
+        # finished places by url, so overlapping jobs scrape a place only once
+        self.geocodeCache = dict()
+        self.scraped = dict()
+
+        # coordinates embedded in the review pages, by place url
+        self.pageCoords = dict()
+
+        # identifies this process in the leases of the work queue
+        self.workerId = f"{socket.gethostname()}:{os.getpid()}"
+        # queue entry leased by each pool thread
+        self.heldLease = threading.local()
+
+        # number of stale places run_refresh re-scrapes
+        self.refreshBudget = refreshBudget if refreshBudget is not None else self.__REFRESH_BUDGET__
+
         # create a db manager instance
         try:
-            self.dbm = DBManager(self.dbName, self.tableName, logging=self.logger)
+            self.dbm = DBManager(self.dbName, self.tableName, logging=self.logger, host=dbHost)
         except:
             self.logger.error("mongodb error", exc_info=True)
 
         # load local variables
         self.localVars = self.__read_local_vars()
 
-        if self.localVars is not None and 'MAPS_API_USAGE' in self.localVars:
-            self.mapsApiUsage = int(self.localVars['MAPS_API_USAGE'])
+        # places api calls per day, shared by every run on this machine.
+        # 'defer' stores places the budget has no lookup left for without
+        # coordinates, for a later run to finish; 'stop' halts the run
+        self.quota = QuotaManager(
+            os.path.join(os.path.dirname(__file__), USAGE_FILE), logging=self.logger,
+            allowance=self.__PLACES_API_MONTHLY_ALLOWANCE__, billingRate=self.__PLACES_API_BILLING_RATE__
+        )
+        self.quotaPolicy = quotaPolicy
+        self.quotaShort = False
+        self.quotaReported = False
+        self.awaitingCoords = []
 
-            # reset api usage to 0 every month
-            lastMonth = int(self.localVars['TIMESTAMP'].strip().split('-')[1])
-            currMonth = datetime.now().month
-            if lastMonth != currMonth:
-                self.mapsApiUsage = 0
-        else:
-            self.mapsApiUsage = 0
+        # usage counted in scraper.dat by earlier versions
+        if 'MAPS_API_USAGE' in self.localVars:
+            try:
+                day = datetime.strptime(self.localVars['TIMESTAMP'].strip(), "%d-%m-%Y")
+                self.quota.seed(int(self.localVars['MAPS_API_USAGE']), day)
+            except:
+                self.logger.warning("could not carry places api usage over from scraper.dat", exc_info=True)
+            else:
+                del self.localVars['MAPS_API_USAGE']
 
 
         # select best version for selenium webdriver
         # TODO: fix this in future updates
 
         self.selenium_version = self.__get_selenium_version()
-        self.driver_version =DRIVER_VERSION
+        self.driver_version = self.__resolve_driver_version()
 
-        try:
-            if self.selenium_version == 3:
-                self.driver = webdriver.Chrome(executable_path=os.path.join(os.path.dirname(__file__), 'exe', f"chromedriver_v{self.driver_version}.exe"), options=op)
-            elif self.selenium_version == 4:
-                chromeService = Service(os.path.join(os.path.dirname(__file__), 'exe', f"chromedriver_v{self.driver_version}.exe"))
-                chromeService.creationflags = CREATE_NO_WINDOW
-                self.driver = webdriver.Chrome(service=chromeService, options=op)
-            browser_version = self.__get_browser_version()
-
-            if browser_version > self.driver_version:
-                self.driver.close()
-                self.driver.quit()
-
-                self.driver_version = browser_version
-                # op.arguments.remove('--headless')
-                
-                if self.selenium_version == 3:
-                    self.driver = webdriver.Chrome(executable_path=os.path.join(os.path.dirname(__file__), 'exe', f"chromedriver_v{self.driver_version}.exe"), options=op)
-                elif self.selenium_version == 4:
-                    chromeService = Service(os.path.join(os.path.dirname(__file__), 'exe', f"chromedriver_v{self.driver_version}.exe"))
-                    chromeService.creationflags = CREATE_NO_WINDOW
-                    self.driver = webdriver.Chrome(service=chromeService, options=op)
-        except:
-            self.__cleanup()
-            self.logger.error("error loading chromedriver", exc_info=True)
-        else:
-            self.logger.info(f"loaded chromedriver version {self.driver_version}")
+        # chrome is only launched once a page actually needs the browser, and
+        # sessions idle for longer than __DRIVER_IDLE_TIMEOUT__ are shut down
+        self.driverVersionResolved = False
+        self.driverLock = threading.Lock()
+        self.driverPool = DriverPool(self.__launch_driver, self.poolSize, logging=self.logger, idleTimeout=self.__DRIVER_IDLE_TIMEOUT__)
 
         # self.selenium_version = self.__get_selenium_version()
 
@@ -260,13 +637,38 @@ class TAapi(QObject):
         # store local vars
         self.__store_local_vars()
 
-        # quit driver
+        # quit drivers
+        if hasattr(self, 'driverPool'):
+            self.driverPool.close()
+
         if hasattr(self, 'driver'):
-            self.driver.close()
-            self.driver.quit()
             del self.driver
 
+        # queued offset pages would otherwise still run, and fall back to the browser
+        if hasattr(self, 'pageExecutor'):
+            self.pageExecutor.shutdown(wait=False, cancel_futures=True)
+
+        if hasattr(self, 'session'):
+            self.session.close()
+
+        if hasattr(self, 'geocoder'):
+            self.geocoder.close()
+
+        if getattr(self, 'gazetteer', None) is not None:
+            self.gazetteer.close()
+            self.gazetteer = None
+
+        # hand the unused part of the reservation back to other runs
+        if hasattr(self, 'quota'):
+            try:
+                self.quota.release()
+            except:
+                self.logger.warning("could not release places api budget", exc_info=True)
+
         # kill any stray chromedriver instances forcefully
+        if sys.platform != 'win32':
+            return
+
         if hasattr(self, 'driver_version'):
             os.system(f"taskkill /IM chromedriver_v{self.driver_version}.exe /F")
         else:
@@ -291,52 +693,234 @@ class TAapi(QObject):
             does support hidden flag but c bindings for open() in python 
             don't provide us a way to send those flags as parameters
         '''
+        hidden = sys.platform == 'win32'
+
         # unhide file
-        try:
-            os.system(f"attrib -h {localFilePath}")
-        except:
-            pass
+        if hidden:
+            try:
+                os.system(f"attrib -h {localFilePath}")
+            except:
+                pass
 
         with open(localFilePath, 'w') as f:
             f.write("\n".join([f"{key}={val}" for key, val in self.localVars.items()]))
             # hide file
+            if hidden:
+                try:
+                    os.system(f"attrib +h {localFilePath}")
+                except:
+                    pass
+
+    def __launch_driver(self):
+        '''
+            driver pool factory. the first launch also checks the browser version
+            and relaunches if it calls for a different chromedriver than the one
+            picked up front.
+        '''
+        # the other pool threads wait here until the first launch has confirmed the version
+        with self.driverLock:
+            if not self.driverVersionResolved:
+                driver = self.__create_driver()
+
+                try:
+                    # the version was resolved up front, the capabilities only
+                    # catch a detection that went wrong
+                    browser_version = self.__get_browser_version(driver)
+                    self.localVars['BROWSER_VERSION'] = browser_version
+
+                    # relaunch only if a better matching driver is actually shipped
+                    driver_version = self.__select_driver_version(browser_version)
+                    if driver_version != self.driver_version:
+                        driver.close()
+                        driver.quit()
+
+                        self.driver_version = driver_version
+                        # op.arguments.remove('--headless')
+
+                        driver = self.__create_driver()
+                except:
+                    driver.quit()
+                    raise
+
+                self.driverVersionResolved = True
+                self.logger.info(f"loaded chromedriver version {self.driver_version}")
+
+                return driver
+
+        return self.__create_driver()
+
+    def __resolve_driver_version(self):
+        '''
+            picks the chromedriver matching the installed chrome without launching
+            it. the version is read from the registry or the chrome binary, and
+            the result of a binary probe is cached in scraper.dat keyed on the
+            binary path and modification time. falls back to the version seen on
+            the last launch, then to DRIVER_VERSION.
+        '''
+        browser_version = self.__detect_browser_version()
+
+        if browser_version is None and 'BROWSER_VERSION' in self.localVars:
             try:
-                os.system(f"attrib +h {localFilePath}")
+                browser_version = int(self.localVars['BROWSER_VERSION'])
             except:
-                pass
+                browser_version = None
+
+        if browser_version is None:
+            return DRIVER_VERSION
+
+        self.localVars['BROWSER_VERSION'] = browser_version
+        return self.__select_driver_version(browser_version)
+
+    def __select_driver_version(self, browser_version):
+        # use the exact match if shipped, else the newest driver that is not newer than the browser
+        exeDir = os.path.join(os.path.dirname(__file__), 'exe')
+
+        try:
+            available = [int(m.group(1)) for m in (re.match(r'chromedriver_v([0-9]+)', f) for f in os.listdir(exeDir)) if m is not None]
+        except:
+            available = []
+
+        candidates = [version for version in available if version <= browser_version]
+        if len(candidates) > 0:
+            return max(candidates)
+
+        return max(DRIVER_VERSION, browser_version)
+
+    def __detect_browser_version(self):
+        if sys.platform == 'win32':
+            version = self.__detect_browser_version_registry()
+            if version is not None:
+                return version
+
+        for binary in self.__CHROME_BINARIES__.get(sys.platform, self.__CHROME_BINARIES__['linux']):
+            path = os.path.expandvars(binary)
+            if not os.path.isabs(path):
+                path = shutil.which(path)
+
+            if path is None or not os.path.isfile(path):
+                continue
+
+            mtime = str(int(os.path.getmtime(path)))
+            if self.localVars.get('BROWSER_BINARY') == path and self.localVars.get('BROWSER_MTIME') == mtime and 'BROWSER_VERSION' in self.localVars:
+                try:
+                    return int(self.localVars['BROWSER_VERSION'])
+                except:
+                    pass
+
+            version = self.__probe_browser_binary(path)
+            if version is not None:
+                self.localVars['BROWSER_BINARY'] = path
+                self.localVars['BROWSER_MTIME'] = mtime
+                return version
+
+        return None
+
+    def __detect_browser_version_registry(self):
+        try:
+            import winreg
+        except ImportError:
+            return None
+
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                    version, _ = winreg.QueryValueEx(key, 'version')
+                    return int(version.split('.')[0])
+            except:
+                continue
+
+        return None
+
+    def __probe_browser_binary(self, path):
+        # chrome.exe does not print its version, but its install folder is named after it
+        if sys.platform == 'win32':
+            try:
+                versions = [int(f.split('.')[0]) for f in os.listdir(os.path.dirname(path)) if re.match(r'^[0-9]+\.[0-9.]+$', f)]
+                return max(versions) if len(versions) > 0 else None
+            except:
+                return None
+
+        try:
+            output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10).stdout
+            match = re.search(r'([0-9]+)\.[0-9.]+', output)
+            return int(match.group(1)) if match is not None else None
+        except:
+            return None
+
+    def __create_driver(self):
+        driverPath = os.path.join(os.path.dirname(__file__), 'exe', f"chromedriver_v{self.driver_version}{EXE_SUFFIX}")
+
+        op = chrome_options(lean=self.leanBrowsing)
+
+        if self.selenium_version == 3:
+            driver = webdriver.Chrome(executable_path=driverPath, options=op)
+        else:
+            chromeService = Service(driverPath)
+            chromeService.creationflags = CREATE_NO_WINDOW
+            driver = webdriver.Chrome(service=chromeService, options=op)
+
+        if self.leanBrowsing:
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+            except:
+                self.logger.warning("could not set up request blocking. continuing without it.", exc_info=True)
+
+        # leave headroom over the scroll settle upper bound
+        driver.set_script_timeout(self.__SCROLL_MAX_TIME__ + 5)
+
+        return driver
 
     def __get_selenium_version(self):
         version = selenium.__version__
         return int(version.split('.', maxsplit=1)[0])
 
-    def __get_browser_version(self):
-        if 'browserVersion' in self.driver.capabilities:
-            version = self.driver.capabilities['browserVersion']
+    def __get_browser_version(self, driver):
+        if 'browserVersion' in driver.capabilities:
+            version = driver.capabilities['browserVersion']
         else:
-            version = self.driver.capabilities['version']
+            version = driver.capabilities['version']
 
         return int(version.split('.')[0])
 
-    def __scroll_to_end(self):
+    @timed('scroll')
+    def __scroll_to_end(self, driver):
+        '''
+            scrolls to the bottom and lets the page report back once its height
+            has stopped growing for __SCROLL_SETTLE_TIME__, instead of sleeping a
+            fixed pause per step. falls back to the sleep loop if the async script
+            is not supported or times out.
+        '''
+        try:
+            driver.execute_async_script(
+                self.__SCROLL_SETTLE_SCRIPT__,
+                int(self.__SCROLL_SETTLE_TIME__ * 1000),
+                int(self.__SCROLL_MAX_TIME__ * 1000)
+            )
+        except:
+            self.logger.warning("scroll settle script failed. falling back to fixed pauses.", exc_info=True)
+            self.__scroll_to_end_paused(driver)
+
+    def __scroll_to_end_paused(self, driver):
         # Get scroll height
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
+        last_height = driver.execute_script("return document.body.scrollHeight")
 
         while True:
             # Scroll down to bottom
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
             # Wait to load page
             time.sleep(self.__SCROLL_PAUSE_TIME__)
 
             # Calculate new scroll height and compare with last scroll height
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
+            new_height = driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
                 break
             last_height = new_height
 
-    def __scroll_to_elem(self, elem):
+    def __scroll_to_elem(self, driver, elem):
         try:
-            self.driver.execute_script(
+            driver.execute_script(
                 "arguments[0].scrollIntoView(true);",
                 elem
             )
@@ -344,101 +928,123 @@ class TAapi(QObject):
             # self.logger.warning("error in scrolling to element", exc_info=True)
             pass
 
-    def __scrape_places_content(self, page=1):
-        if self.PLACES_SO_FAR > self.PLACES_MAX:
-            self.logger.warning('result search exceeded max pages limit. aborting search.')
-            return []
+    def __scrape_places_content(self):
+        '''
+            yields the place results of each search results page as soon as it
+            is parsed, then moves on to the next page.
+        '''
+        page = 1
+        action = 'filter'
 
-        self.__scroll_to_end()
+        while True:
+            if self.PLACES_SO_FAR > self.PLACES_MAX:
+                self.logger.warning('result search exceeded max pages limit. aborting search.')
+                return
 
-        # Checkpoint 4
-        if not self.running:
-            self.__halt_error()
-            return
+            self.__scroll_to_end(self.driver)
 
-        try:
-            WebDriverWait(self.driver, self.__SEARCH_RESULTS_APPEAR_WAIT__) \
-                .until(EC.presence_of_all_elements_located((By.XPATH, "//div[contains(@class, 'result-card')]")))
-        except:
-            self.logger.warning("Loading results took too much time. Aborting.", exc_info=True)
-            sys.exit()
-        else:
-            place_results_contents = self.driver.find_elements(by=By.XPATH, value="//div[contains(@class, 'result-content-columns')]") 
-            place_results_urls = [
-                {
-                    'name': place_results_content.find_element(by=By.XPATH, value=".//div[@class='result-title']/span[1]").text,
-                    'url': self.__BASE_URL__ + \
-                            parse(place_results_content.get_attribute('onclick'))['body'][0]['expression']['arguments'][3]['value'],
-                    'page': page
-                }for place_results_content in place_results_contents
-            ]
-            self.PLACES_SO_FAR += len(place_results_urls)
-
-        # Checkpoint 5
-        if not self.running:
-            self.__halt_error()
-            return
+            # Checkpoint 4
+            if not self.running:
+                self.__halt_error()
+                return
 
-        try:
-            pagination = self.driver.find_element(by=By.XPATH, value="//div[contains(@class, 'ui_pagination')]")
-            next_button = WebDriverWait(pagination, self.__CLICKABLE_WAIT_TIME__) \
-                .until(EC.element_to_be_clickable((By.XPATH, ".//a[contains(@class, 'ui_button nav next')]")))
+            try:
+                WebDriverWait(self.driver, self.__SEARCH_RESULTS_APPEAR_WAIT__) \
+                    .until(EC.presence_of_all_elements_located((By.XPATH, "//div[contains(@class, 'result-card')]")))
+            except:
+                self.logger.warning("Loading results took too much time. Aborting.", exc_info=True)
+                sys.exit()
+            else:
+                self.__record_search_page(self.driver, action=action)
+                place_results_contents = self.driver.find_elements(by=By.XPATH, value="//div[contains(@class, 'result-content-columns')]") 
+                place_results_urls = [
+                    {
+                        'name': place_results_content.find_element(by=By.XPATH, value=".//div[@class='result-title']/span[1]").text,
+                        'url': self.baseUrl + \
+                                parse(place_results_content.get_attribute('onclick'))['body'][0]['expression']['arguments'][3]['value'],
+                        'page': page
+                    }for place_results_content in place_results_contents
+                ]
+                self.PLACES_SO_FAR += len(place_results_urls)
+
+            # Checkpoint 5
+            if not self.running:
+                self.__halt_error()
+                return
+
+            yield place_results_urls
+
+            try:
+                pagination = self.driver.find_element(by=By.XPATH, value="//div[contains(@class, 'ui_pagination')]")
+                next_button = WebDriverWait(pagination, self.__CLICKABLE_WAIT_TIME__) \
+                    .until(EC.element_to_be_clickable((By.XPATH, ".//a[contains(@class, 'ui_button nav next')]")))
+
+                if not next_button.is_enabled():
+                    # self.logger.info("next page button not clickable")
+                    return
 
-            if next_button.is_enabled():
                 next_page = next_button.get_attribute('data-page')
-                if next_page is not None:
-                    self.logger.info(f"going to page {next_page} of results")
-                    self.driver.execute_script(
-                        "arguments[0].click();",
-                        next_button
-                    )
-                    return place_results_urls + self.__scrape_places_content(page=page+1)
-                else:
-                    return place_results_urls
-            else:
-                # self.logger.info("next page button not clickable")
-                return place_results_urls
-        except:
-            # self.logger.info("no pagination available.", exc_info=True)
-            return place_results_urls
+                if next_page is None:
+                    return
+
+                self.logger.info(f"going to page {next_page} of results")
+                self.driver.execute_script(
+                    "arguments[0].click();",
+                    next_button
+                )
+            except:
+                # self.logger.info("no pagination available.", exc_info=True)
+                return
 
-    def __scrape_review_for_images_things(self, container):
+            page += 1
+            action = 'next'
+
+    def __scrape_review_for_images(self, driver, container, mode):
         # Checkpoint 11
         if not self.running:
             self.__halt_error()
             return []
         try:
-            image_container = container.find_element(by=By.XPATH, value=".//div[contains(@class, 'pDrIj')]")
-            self.__scroll_to_elem(image_container)
+            image_container = container.find_element(by=By.XPATH, value=self.__REVIEW_XPATHS__[mode]['images'])
+            self.__scroll_to_elem(driver, image_container)
 
             image_elems = WebDriverWait(image_container, self.__IMAGE_LOAD_WAIT__) \
                 .until(EC.presence_of_all_elements_located((By.TAG_NAME, "img")))
 
-            sources = [self.__upgrade_image_url(image_elem.get_attribute('src')) for image_elem in image_elems]
+            sources = [self.__image_source(image_elem.get_attribute) for image_elem in image_elems]
+            sources = [self.__upgrade_image_url(src) for src in sources if src is not None]
         except:
             # self.logger.warning("image either not available or error loading image.")
             return []
         else:
             return sources
 
-    def __scrape_review_for_images_places(self, container):
-        # Checkpoint 11
-        if not self.running:
-            self.__halt_error()
-            return []
-        try:
-            image_container = container.find_element(by=By.XPATH, value=".//div[contains(@class, 'LblVz')]")
-            self.__scroll_to_elem(image_container)
+    def __scrape_review_for_images_things(self, driver, container):
+        return self.__scrape_review_for_images(driver, container, 'todo')
 
-            image_elems = WebDriverWait(image_container, self.__IMAGE_LOAD_WAIT__) \
-                .until(EC.presence_of_all_elements_located((By.TAG_NAME, "img")))
+    def __scrape_review_for_images_places(self, driver, container):
+        return self.__scrape_review_for_images(driver, container, 'place')
 
-            sources = [self.__upgrade_image_url(image_elem.get_attribute('src')) for image_elem in image_elems]
-        except:
-            # self.logger.warning("image either not available or error loading image.")
-            return []
+    def __parse_review_rating_things(self, class_list):
+        rating_class = re.findall('bubble_[0-9]+', class_list)
+
+        if len(rating_class) > 0:
+            return int(rating_class[0][len('bubble_'):])
         else:
-            return sources
+            return None
+
+    def __parse_review_rating_places(self, label):
+        return int(float(label[:3]) * 10)
+
+    def __parse_review_date_things(self, date):
+        month, year = date[len("Date of experience:"):].strip().split()
+
+        return self.MONTH_MAP[month.lower()], int(year.strip())
+
+    def __parse_review_date_places(self, date):
+        day, month, year = date[len("Written"):].strip().split()
+
+        return int(day.strip()), self.MONTH_MAP[month.lower()], int(year.strip())
 
     def __scrape_review_for_text_things(self, container):
         # Checkpoint 10
@@ -446,39 +1052,31 @@ class TAapi(QObject):
             self.__halt_error()
             return dict()
 
+        xpaths = self.__REVIEW_XPATHS__['todo']
+
         # find rating
         try:
-            rating_ui = container.find_element(by=By.XPATH, value=".//span[contains(@class, 'ui_bubble_rating')]")
-            class_list = rating_ui.get_attribute('class')
-            rating_class = re.findall('bubble_[0-9]+', class_list)
-
-            if len(rating_class) > 0:
-                rating = int(rating_class[0][len('bubble_'):])
-            else:
-                rating = None
+            rating_ui = container.find_element(by=By.XPATH, value=xpaths['rating'])
+            rating = self.__parse_review_rating_things(rating_ui.get_attribute('class'))
         except:
             rating = None
 
         # review text
         try:
-            text = container.find_element(by=By.XPATH, value=".//div[contains(@class, 'fIrGe')]/q/span").text
+            text = container.find_element(by=By.XPATH, value=xpaths['text']).text
             text = text.replace("\n", " ")
         except:
             text = None
 
         # review title
         try:
-            title = container.find_element(by=By.XPATH, value=".//div[contains(@class, 'KgQgP')]/a/span/span").text
+            title = container.find_element(by=By.XPATH, value=xpaths['title']).text
         except:
             title = None
 
         # review date
         try:
-            date = container.find_element(by=By.XPATH, value=".//span[contains(@class, 'teHYY')]").text[len("Date of experience:"):]
-            month, year = date.strip().split()
-
-            month = self.MONTH_MAP[month.lower()]
-            year = int(year.strip())
+            month, year = self.__parse_review_date_things(container.find_element(by=By.XPATH, value=xpaths['date']).text)
         except:
             month, year = None, None
 
@@ -495,36 +1093,32 @@ class TAapi(QObject):
         if not self.running:
             self.__halt_error()
             return dict()
-        
+
+        xpaths = self.__REVIEW_XPATHS__['place']
+
         # find rating
         try:
-            rating_ui = container.find_element(by=By.XPATH, value=".//*[name()='svg'][contains(@class, 'UctUV')]")
-            rating = rating_ui.get_attribute('aria-label')
-            rating = int(float(rating[:3]) * 10)
+            rating_ui = container.find_element(by=By.XPATH, value=xpaths['rating'])
+            rating = self.__parse_review_rating_places(rating_ui.get_attribute('aria-label'))
         except:
             rating = None
 
         # review text
         try:
-            text = container.find_element(by=By.XPATH, value=".//div[contains(@class, 'biGQs _P pZUbB KxBGd')]/span").text
+            text = container.find_element(by=By.XPATH, value=xpaths['text']).text
             text = text.replace("\n", " ")
         except:
             text = None
 
         # review title
         try:
-            title = container.find_element(by=By.XPATH, value=".//div[contains(@class, 'biGQs _P fiohW qWPrE ncFvv fOtGX')]/a/span").text
+            title = container.find_element(by=By.XPATH, value=xpaths['title']).text
         except:
             title = None
 
         # review date
         try:
-            date = container.find_element(by=By.XPATH, value=".//div[contains(@class, 'TreSq')]/div").text[len("Written"):]
-            day, month, year = date.strip().split()
-
-            day = int(day.strip())
-            month = self.MONTH_MAP[month.lower()]
-            year = int(year.strip())
+            day, month, year = self.__parse_review_date_places(container.find_element(by=By.XPATH, value=xpaths['date']).text)
         except:
             day, month, year = None, None, None
 
@@ -537,163 +1131,266 @@ class TAapi(QObject):
             'year': year
         }
 
-    def __scrape_reviews_things(self, page=1):
-        if self.REVIEWS_SO_FAR >= self.REVIEWS_MAX:
-            self.logger.warning('reviews search exceeded max pages limit. aborting search.')
-            return []
+    def __normalize_review_things(self, raw):
+        try:
+            rating = self.__parse_review_rating_things(raw['rating'])
+        except:
+            rating = None
 
-        self.__scroll_to_end()
+        try:
+            month, year = self.__parse_review_date_things(raw['date'])
+        except:
+            month, year = None, None
 
-        # Checkpoint 8
-        if not self.running:
-            self.__halt_error()
-            return []
+        return {
+            'metadata': {
+                'rating': rating,
+                'title': raw['title'],
+                'text': raw['text'].replace("\n", " ") if raw['text'] is not None else None,
+                'month': month,
+                'year': year
+            },
+            'images': [self.__upgrade_image_url(src) for src in raw['images']]
+        }
 
+    def __normalize_review_places(self, raw):
         try:
-            reviewTab = WebDriverWait(self.driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
-                .until(EC.presence_of_element_located((By.XPATH, "//div[@class='FTCTN']")))
+            rating = self.__parse_review_rating_places(raw['rating'])
         except:
-            self.logger.warning("could not load reviews. aborting.", exc_info=True)
-            return []
-        else:
-            # Checkpoint 9
-            if not self.running:
-                self.__halt_error()
-                return []
+            rating = None
 
-            try:
-                WebDriverWait(reviewTab, self.__REVIEW_TAB_APPEAR_WAIT__) \
-                    .until(EC.presence_of_all_elements_located((By.XPATH, ".//div[contains(@class, 'lgfjP')]")))
-            except:
-                self.logger.warning("could not load reviews. aborting.", exc_info=True)
-                return []
-            else:
-                reviewContainers = reviewTab.find_elements(by=By.XPATH, value=".//div[contains(@class, 'lgfjP')]")
-
-                # expand all read more buttons
-                for reviewContainer in reviewContainers:
-                    read_more_btn = reviewContainer.find_element(by=By.XPATH, value="//span[contains(@class, 'Ignyf')]")
-                    if 'more' in read_more_btn.text and read_more_btn.is_enabled():
-                        self.driver.execute_script(
-                            "arguments[0].click();",
-                            read_more_btn
-                        )
-                
-                # scrape review title, body and date and images if any
-                place_reviews = [
-                    {
-                        'metadata': self.__scrape_review_for_text_things(reviewContainer),
-                        'images': self.__scrape_review_for_images_things(reviewContainer)
-                    }
-                    for reviewContainer in list(reviewContainers)
-                ]
-                self.REVIEWS_SO_FAR += len(place_reviews)
-
-                # Checkpoint 12
-                if not self.running:
-                    self.__halt_error()
-                    return []
+        try:
+            day, month, year = self.__parse_review_date_places(raw['date'])
+        except:
+            day, month, year = None, None, None
 
-                # go to next page
-                try:
-                    pagination = reviewTab.find_element(by=By.XPATH, value="//div[contains(@class, 'ui_pagination')]")
-                    next_button = WebDriverWait(pagination, self.__CLICKABLE_WAIT_TIME__) \
-                        .until(EC.element_to_be_clickable((By.XPATH, "//*[contains(@class, 'ui_button nav next')]")))
-
-                    if next_button.is_enabled():
-                        if next_button.tag_name == 'a':
-                            self.driver.execute_script(
-                                "arguments[0].click();",
-                                next_button
-                            )
-                            return place_reviews + self.__scrape_reviews_things(page=page+1)
-                        else:
-                            return place_reviews
-                    else:
-                        # self.logger.info("next page button not clickable")
-                        return place_reviews
-                except:
-                    # self.logger.info("no pagination available.", exc_info=True)
-                    return place_reviews
+        return {
+            'metadata': {
+                'rating': rating,
+                'title': raw['title'],
+                'text': raw['text'].replace("\n", " ") if raw['text'] is not None else None,
+                'day': day,
+                'month': month,
+                'year': year
+            },
+            'images': [self.__upgrade_image_url(src) for src in raw['images']]
+        }
 
-    def __scrape_reviews_places(self, page=1):
-        if self.REVIEWS_SO_FAR >= self.REVIEWS_MAX:
-            self.logger.warning('reviews search exceeded max pages limit. aborting search.')
-            return []
+    @timed('expand')
+    def __expand_reviews(self, driver, reviewTab, reviewContainers, mode):
+        '''
+            expands every truncated review of the page with one script call that
+            waits once for the dom to settle. falls back to clicking the buttons
+            one by one if the script fails.
+        '''
+        try:
+            driver.execute_async_script(
+                self.__EXPAND_REVIEWS_SCRIPT__,
+                reviewTab,
+                self.__REVIEW_XPATHS__[mode],
+                mode == 'place',
+                int(self.__SCROLL_SETTLE_TIME__ * 1000),
+                int(self.__SCROLL_MAX_TIME__ * 1000)
+            )
+            return
+        except:
+            self.logger.warning("batched read more expansion failed. expanding reviews one by one.", exc_info=True)
 
-        self.__scroll_to_end()
+        for reviewContainer in reviewContainers:
+            try:
+                read_more_btn = reviewContainer.find_element(by=By.XPATH, value=self.__REVIEW_XPATHS__[mode]['more'])
+                if 'more' in read_more_btn.text and read_more_btn.is_enabled():
+                    driver.execute_script(
+                        "arguments[0].click();",
+                        read_more_btn
+                    )
+            except:
+                continue
 
-        # Checkpoint 8
+    @timed('extract')
+    def __extract_reviews(self, driver, reviewTab, mode):
+        '''
+            pulls ratings, titles, texts, dates and image urls of every review on
+            the page with a single execute_script call, instead of one webdriver
+            round-trip per field per review. returns None if the script failed so
+            that the caller can fall back to element-wise scraping.
+
+            images are read without scrolling them into view: an image that has
+            not been swapped in yet is read from its lazy load attributes
+            (data-src, srcset) instead of its placeholder src.
+        '''
+        # Checkpoint 10
         if not self.running:
             self.__halt_error()
             return []
 
         try:
-            reviewTab = WebDriverWait(self.driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
-                .until(EC.presence_of_element_located((By.XPATH, "//div[@class='LbPSX']")))
+            raw_reviews = driver.execute_script(
+                self.__EXTRACT_REVIEWS_SCRIPT__,
+                reviewTab,
+                self.__REVIEW_XPATHS__[mode],
+                'class' if mode == 'todo' else 'aria-label',
+                mode == 'place'
+            )
         except:
-            self.logger.warning("could not load reviews. aborting.", exc_info=True)
-            return []
-        else:
+            self.logger.warning("script extraction of reviews failed. falling back to element scraping.", exc_info=True)
+            return None
+
+        normalize = self.__normalize_review_things if mode == 'todo' else self.__normalize_review_places
+        return [normalize(raw) for raw in raw_reviews or []]
+
+    def __scrape_reviews_things(self, driver):
+        '''
+            yields the reviews of each page as soon as it is parsed, then moves on
+            to the next page. stops at REVIEWS_MAX, on the last page or on halt.
+        '''
+        reviews_so_far = 0
+
+        while True:
+            if reviews_so_far >= self.REVIEWS_MAX:
+                self.logger.warning('reviews search exceeded max pages limit. aborting search.')
+                return
+
+            self.__scroll_to_end(driver)
+
+            # Checkpoint 8
+            if not self.running:
+                self.__halt_error()
+                return
+
             try:
-                reviewContainers = reviewTab.find_elements(by=By.XPATH, value="./div")
+                reviewTab = WebDriverWait(driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
+                    .until(EC.presence_of_element_located((By.XPATH, "//div[@class='FTCTN']")))
             except:
                 self.logger.warning("could not load reviews. aborting.", exc_info=True)
-                return []
-            else:
-                pagination = reviewContainers[-1]
-                reviewContainers = reviewContainers[:-1]
-
-                # expand all read more buttons
-                for reviewContainer in reviewContainers:
-                    read_more_btn = reviewContainer.find_element(by=By.XPATH, value="//div[contains(@class, 'lszDU')]/button/span")
-                    if 'more' in read_more_btn.text:
-                        self.driver.execute_script(
-                            "arguments[0].click();",
-                            read_more_btn
-                        )
-
-                # scrape review title, body and date and images if any
+                return
+
+            # Checkpoint 9
+            if not self.running:
+                self.__halt_error()
+                return
+
+            try:
+                WebDriverWait(reviewTab, self.__REVIEW_TAB_APPEAR_WAIT__) \
+                    .until(EC.presence_of_all_elements_located((By.XPATH, self.__REVIEW_XPATHS__['todo']['container'])))
+            except:
+                self.logger.warning("could not load reviews. aborting.", exc_info=True)
+                return
+
+            reviewContainers = reviewTab.find_elements(by=By.XPATH, value=self.__REVIEW_XPATHS__['todo']['container'])
+
+            # expand all read more buttons
+            self.__expand_reviews(driver, reviewTab, reviewContainers, 'todo')
+
+            # scrape review title, body and date and images if any
+            place_reviews = self.__extract_reviews(driver, reviewTab, 'todo') if self.scriptExtraction else None
+
+            if place_reviews is None:
+                place_reviews = [
+                    {
+                        'metadata': self.__scrape_review_for_text_things(reviewContainer),
+                        'images': self.__scrape_review_for_images_things(driver, reviewContainer)
+                    }
+                    for reviewContainer in list(reviewContainers)
+                ]
+            reviews_so_far += len(place_reviews)
+
+            # Checkpoint 12
+            if not self.running:
+                self.__halt_error()
+                return
+
+            yield place_reviews
+
+            # go to next page
+            try:
+                pagination = reviewTab.find_element(by=By.XPATH, value="//div[contains(@class, 'ui_pagination')]")
+                next_button = WebDriverWait(pagination, self.__CLICKABLE_WAIT_TIME__) \
+                    .until(EC.element_to_be_clickable((By.XPATH, "//*[contains(@class, 'ui_button nav next')]")))
+
+                if not next_button.is_enabled() or next_button.tag_name != 'a':
+                    # self.logger.info("next page button not clickable")
+                    return
+
+                driver.execute_script(
+                    "arguments[0].click();",
+                    next_button
+                )
+            except:
+                # self.logger.info("no pagination available.", exc_info=True)
+                return
+
+    def __scrape_reviews_places(self, driver):
+        '''
+            yields the reviews of each page as soon as it is parsed, then moves on
+            to the next page. stops at REVIEWS_MAX, on the last page or on halt.
+        '''
+        reviews_so_far = 0
+
+        while True:
+            if reviews_so_far >= self.REVIEWS_MAX:
+                self.logger.warning('reviews search exceeded max pages limit. aborting search.')
+                return
+
+            self.__scroll_to_end(driver)
+
+            # Checkpoint 8
+            if not self.running:
+                self.__halt_error()
+                return
+
+            try:
+                reviewTab = WebDriverWait(driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
+                    .until(EC.presence_of_element_located((By.XPATH, "//div[@class='LbPSX']")))
+                reviewContainers = reviewTab.find_elements(by=By.XPATH, value=self.__REVIEW_XPATHS__['place']['container'])
+            except:
+                self.logger.warning("could not load reviews. aborting.", exc_info=True)
+                return
+
+            if len(reviewContainers) == 0:
+                return
+
+            pagination = reviewContainers[-1]
+            reviewContainers = reviewContainers[:-1]
+
+            # expand all read more buttons
+            self.__expand_reviews(driver, reviewTab, reviewContainers, 'place')
+
+            # scrape review title, body and date and images if any
+            place_reviews = self.__extract_reviews(driver, reviewTab, 'place') if self.scriptExtraction else None
+
+            if place_reviews is None:
                 place_reviews = [
                     {
                         'metadata': self.__scrape_review_for_text_places(reviewContainer),
-                        'images': self.__scrape_review_for_images_places(reviewContainer)
+                        'images': self.__scrape_review_for_images_places(driver, reviewContainer)
                     }
                     for reviewContainer in list(reviewContainers)
                 ]
-                self.REVIEWS_SO_FAR += len(place_reviews)
+            reviews_so_far += len(place_reviews)
+
+            # Checkpoint 12
+            if not self.running:
+                self.__halt_error()
+                return
 
-                # Checkpoint 12
-                if not self.running:
-                    self.__halt_error()
-                    return []
+            yield place_reviews
 
-                # go to next page
-                try:
-                    next_button = WebDriverWait(pagination, self.__CLICKABLE_WAIT_TIME__) \
-                        .until(EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'UCacc')]/a[@aria-label='Next page']")))
-
-                    # if next_button.get_attribute('aria-label') == 'Next page':
-                    #     self.driver.execute_script(
-                    #         "arguments[0].click();",
-                    #         next_button
-                    #     )
-                    #     return place_reviews + self.__scrape_reviews_places(page=page+1)
-                    # else:
-                    #     self.logger.info(f"next page button not clickable {next_button.get_attribute('aria-label')}")
-                    #     return place_reviews
-
-                    if next_button:
-                        self.driver.execute_script(
-                            "arguments[0].click();",
-                            next_button
-                        )
-                        return place_reviews + self.__scrape_reviews_places(page=page+1)
-                    else:
-                        return place_reviews
-                except:
-                    # self.logger.info("no pagination available.", exc_info=True)
-                    return place_reviews
+            # go to next page
+            try:
+                next_button = WebDriverWait(pagination, self.__CLICKABLE_WAIT_TIME__) \
+                    .until(EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'UCacc')]/a[@aria-label='Next page']")))
+
+                if not next_button:
+                    return
+
+                driver.execute_script(
+                    "arguments[0].click();",
+                    next_button
+                )
+            except:
+                # self.logger.info("no pagination available.", exc_info=True)
+                return
 
     def __upgrade_image_url(self, url):
         try:
@@ -711,52 +1408,318 @@ class TAapi(QObject):
         except:
             return url 
 
+    def __record_snapshot(self, driver):
+        # rendered page the driver is on, for the fixture recorder
+        if self.recorder is None:
+            return None
+
+        try:
+            return self.recorder.record(driver.current_url, driver.page_source)
+        except:
+            self.logger.warning("could not record page", exc_info=True)
+            return None
+
+    def __record_search_page(self, driver, action=None):
+        '''
+            records the search page the driver is on. with an action, the page
+            is recorded as where that action (search, filter, next) on the
+            previously recorded search page led, so that it can be replayed
+            without the site scripts.
+        '''
+        if self.recorder is None:
+            return
+
+        if action is None or self.recordedKey is None:
+            self.recordedKey = self.__record_snapshot(driver)
+            return
+
+        try:
+            self.recordedKey = self.recorder.record_navigation(self.recordedKey, action, driver.current_url, driver.page_source)
+        except:
+            self.logger.warning("could not record page", exc_info=True)
+
+    def __paced_get(self, url):
+        '''
+            session get paced by the rate limiter, retried up to __HTTP_RETRIES__
+            times on throttling, server errors and timeouts. returns None if the
+            run was stopped while waiting for a slot.
+        '''
+        for attempt in range(self.__HTTP_RETRIES__ + 1):
+            with self.timer.span('ratelimit'):
+                if not self.rateLimiter.acquire(url, cancelled=lambda: not self.running):
+                    return None
+
+            start = time.perf_counter()
+            try:
+                with self.timer.span('http'):
+                    res = self.session.get(url, timeout=self.__HTTP_TIMEOUT__)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                self.rateLimiter.feedback(url, error=True)
+                if attempt == self.__HTTP_RETRIES__:
+                    raise
+                continue
+
+            retry = self.rateLimiter.feedback(url, status=res.status_code, elapsed=time.perf_counter() - start, retryAfter=res.headers.get('Retry-After'))
+            if not retry or attempt == self.__HTTP_RETRIES__:
+                if self.recorder is not None and res.status_code < 400:
+                    self.recorder.record(url, res.text, res.headers.get('Content-Type', 'text/html'))
+                return res
+
+    def __paced_browser_get(self, driver, url):
+        # the browser does not expose status codes, only load time and failures feed the limiter
+        with self.timer.span('ratelimit'):
+            if not self.rateLimiter.acquire(url, cancelled=lambda: not self.running):
+                return
+
+        start = time.perf_counter()
+        try:
+            with self.timer.span('browser.load'):
+                driver.get(url)
+        except:
+            self.rateLimiter.feedback(url, error=True)
+            raise
+
+        self.rateLimiter.feedback(url, elapsed=time.perf_counter() - start)
+
+    async def __paced_get_async(self, http, url):
+        # __paced_get on aiohttp, returns the body text or None
+        for attempt in range(self.__HTTP_RETRIES__ + 1):
+            with self.timer.span('ratelimit'):
+                if not await self.rateLimiter.acquire_async(url, cancelled=lambda: not self.running):
+                    return None
+
+            start = time.perf_counter()
+            try:
+                with self.timer.span('http'):
+                    async with http.get(url) as res:
+                        text = await res.text()
+                        status, retryAfter = res.status, res.headers.get('Retry-After')
+                        contentType = res.headers.get('Content-Type', 'text/html')
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.rateLimiter.feedback(url, error=True)
+                if attempt == self.__HTTP_RETRIES__:
+                    raise
+                continue
+
+            retry = self.rateLimiter.feedback(url, status=status, elapsed=time.perf_counter() - start, retryAfter=retryAfter)
+            if not retry or attempt == self.__HTTP_RETRIES__:
+                if status >= 400:
+                    raise aiohttp.ClientResponseError(res.request_info, res.history, status=status)
+                if self.recorder is not None:
+                    self.recorder.record(url, text, contentType)
+                return text
+
+    @timed('geocode')
     def __get_coords(self, place):
         # Checkpoint 13
         if not self.running:
             self.__halt_error()
             return None, None
 
-        queryFields = ['geometry', 'place_id']
-        pathParams = {
-            'input': place,
-            'inputtype': 'textquery',
-            'fields': ','.join(queryFields),
-            'locationbias': f"circle:{self.radius}@{self.lat},{self.lng}",
-            'key': self.apiKey
-        }
-        headers = {}
+        bias = self.__location_bias()
+        key = self.__geocode_key(place, bias)
+
+        # waits for the prefetched lookup if there is one
+        try:
+            return self.__or_offline(place, self.geocoder.get(key, self.__resolve_coords, place, key, bias))
+        except QuotaExceeded:
+            return self.__offline_or_raise(place)
+        except:
+            self.logger.warning("error fetching location info", exc_info=True)
+            return self.__or_offline(place, (None, None))
+
+    def __or_offline(self, place, coords):
+        # the gazetteer stands in when the places api found nothing or could not be reached
+        if coords[0] is not None or not self.running:
+            return coords
 
-        url = self.__MAPS_BASE_URL__ + '?' + urlencode(pathParams)
+        offline = self.__offline_coords(place)
+        return (offline, None) if offline is not None else coords
+
+    def __offline_or_raise(self, place):
+        # the budget is spent, without an offline match the place is deferred
+        offline = self.__offline_coords(place)
+        if offline is None:
+            raise QuotaExceeded(f"no places API budget left for {place}")
+
+        return offline, None
+
+    @timed('geocode.offline')
+    def __offline_coords(self, place):
+        if self.gazetteer is None:
+            return None
 
         try:
-            res = requests.get(url, headers=headers)
-            data = res.json()
+            coords = self.gazetteer.resolve(place, self.lat, self.lng, self.radius)
+        except:
+            self.logger.warning(f"gazetteer lookup of {place} failed", exc_info=True)
+            return None
 
-            # update usage
-            self.mapsApiUsage += 1
+        if coords is not None:
+            self.logger.info(f"located {place} in the gazetteer")
 
-            # check bill
-            bill = self.__PLACES_API_BILLING_RATE__ * self.mapsApiUsage / 1000
-            if bill > self.__PLACES_API_MONTHLY_ALLOWANCE__:
-                self.addError.emit("places API allowance exceeded")
+        return coords
 
-            self.localVars['MAPS_API_USAGE'] = self.mapsApiUsage
-            self.apiUsage.emit(self.mapsApiUsage, bill)
+    @timed('geocode.lookup')
+    def __resolve_coords(self, place, key, bias):
+        # geocode cache, then the places api. runs on the places client pool when prefetched
+        cached = self.__cached_coords(key)
+        if cached is not None:
+            return cached
 
+        self.__consume_quota()
 
-            if data['status'] == "OK":
-                candidate = data["candidates"][0]
-                geometry = candidate["geometry"]
-                place_id = candidate['place_id']
+        data = self.geocoder.find_place(place, bias, cancelled=lambda: not self.running)
+        if data is None:
+            return None, None
 
-                self.logger.info(f"fetching coordinates for {place}")
+        return self.__read_places_api_response(place, key, data)
 
-                return geometry["location"], place_id
-            else:
-                return None, None
+    def __prefetch_coords(self, place_result):
+        '''
+            called once the first review page of a place is in. most pages
+            carry the coordinates of the place, a place whose page did not
+            starts geocoding on the places client pool, so that the lookup
+            overlaps the remaining pages.
+        '''
+        # short of budget, lookups wait for __geocode_awaiting to pick the places
+        if not self.prefetchCoords or self.quotaShort or self.__page_coords(place_result['url']) is not None:
+            return
+
+        self.__start_lookup(place_result['name'])
+
+    def __start_lookup(self, place):
+        bias = self.__location_bias()
+        key = self.__geocode_key(place, bias)
+        # the lookup runs on the places client pool, its spans still belong to the place
+        self.geocoder.prefetch(key, self.timer.bound(self.__resolve_coords), place, key, bias)
+
+    def __note_page_coords(self, page_url, text):
+        # remembers the coordinates a review page carries for its place, once per place
+        url = re.sub(r'-Reviews-or[0-9]+-', '-Reviews-', page_url, count=1)
+
+        with self.lock:
+            if url in self.pageCoords:
+                return
+
+        try:
+            coords = coords_from_page(text, location_id(url))
         except:
-            self.logger.warning("error fetching location info", exc_info=True)
+            self.logger.warning(f"could not read coordinates from {page_url}", exc_info=True)
+            return
+
+        if coords is not None:
+            with self.lock:
+                self.pageCoords[url] = coords
+
+    def __page_coords(self, url):
+        with self.lock:
+            return self.pageCoords.get(url)
+
+    def __known_coords(self, url, cached):
+        '''
+            coordinates and place id that need no places api lookup: those of
+            the review page, then those stored with a refreshed place. None if
+            the place has to be geocoded.
+        '''
+        coords = self.__page_coords(url)
+        if coords is not None:
+            return coords, (cached or dict()).get('place_id')
+
+        if self.__is_refreshable(cached) and cached.get('coords') is not None:
+            return cached['coords'], cached.get('place_id')
+
+        return None
+
+    def __location_bias(self):
+        return f"circle:{self.radius}@{self.lat},{self.lng}"
+
+    def __geocode_key(self, place, bias):
+        # cache key of a places api query: normalized name and location bias
+        name = re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', place)).strip().casefold()
+        return f"{name}|{bias}"
+
+    def __cached_coords(self, key):
+        '''
+            coordinates and place id from the in-memory cache, then from the
+            geocode cache in mongodb. (None, None) is a cached "not found".
+            returns None on a miss.
+        '''
+        with self.lock:
+            if key in self.geocodeCache:
+                return self.geocodeCache[key]
+
+        with self.timer.span('mongo.query'):
+            cached = self.dbm.geocode_lookup(key)
+
+        if cached is None:
+            return None
+
+        coords = cached['geometry'], cached['place_id']
+        with self.lock:
+            self.geocodeCache[key] = coords
+
+        return coords
+
+    def __remember_coords(self, key, geometry, place_id, ttl):
+        with self.lock:
+            self.geocodeCache[key] = geometry, place_id
+
+        with self.timer.span('mongo.write'):
+            self.dbm.geocode_store(key, geometry, place_id, ttl)
+
+    def __consume_quota(self):
+        # counts a places api call before it is made, raises QuotaExceeded once the allowance is spent
+        try:
+            usage = self.quota.consume()
+        except QuotaExceeded:
+            with self.lock:
+                reported, self.quotaReported = self.quotaReported, True
+            if not reported:
+                self.addError.emit("places API allowance exceeded")
+            raise
+
+        self.apiUsage.emit(usage, self.quota.bill(usage))
+
+    def __reserve_quota(self, place_results):
+        '''
+            reserves a places api call for every place left to scrape, the most
+            the run can need. returns True if the budget cannot cover them all:
+            lookups then wait until every place is scraped, and go to the most
+            reviewed places first.
+        '''
+        demand = sum(1 for place_result in place_results if not self.checkpoint.is_completed(place_result['url']))
+
+        try:
+            granted = self.quota.reserve(demand)
+        except:
+            self.logger.warning("could not reserve places api budget", exc_info=True)
+            return False
+
+        if granted < demand:
+            self.addMessage.emit(f"places API budget covers {granted} of {demand} places, the most reviewed are geocoded first")
+
+        return granted < demand
+
+    def __read_places_api_response(self, place, key, data):
+        if data['status'] == "OVER_QUERY_LIMIT":
+            self.rateLimiter.feedback(self.mapsUrl, status=429)
+
+        if data['status'] == "OK":
+            candidate = data["candidates"][0]
+            geometry = candidate["geometry"]
+            place_id = candidate['place_id']
+
+            self.logger.info(f"fetching coordinates for {place}")
+
+            self.__remember_coords(key, geometry["location"], place_id, self.__GEOCODE_TTL__)
+
+            return geometry["location"], place_id
+        else:
+            # errors and quota answers are not cached, only a definite "not found"
+            if data['status'] == "ZERO_RESULTS":
+                self.__remember_coords(key, None, None, self.__GEOCODE_MISS_TTL__)
+
             return None, None
 
     def __clean_reviews(self, review):
@@ -764,18 +1727,27 @@ class TAapi(QObject):
         return all([val is not None for val in itemgetter('title', 'text', 'month', 'year')(review['metadata'])])
 
     def __filter_results_coords(self, result):
-        '''
-            using spherical cosines formula applied on a spherical geodesic as the approximate distance
-            could have used haversine's formula (a bit more numerically robust but theoretically equivalent)
-            does not give exact distance for long distances due to earth being an oblate spheroid
-        '''
         if 'coords' not in result:
             return True
 
         if result['coords'] is None:
             return True
 
-        lat, lng = itemgetter('lat', 'lng')(result['coords'])
+        spherical_distance = self.__distance(result['coords'])
+
+        self.logger.info(f"{result['name']} : {spherical_distance} metres")
+
+        # allow 10% tolerance while clipping radius
+        return spherical_distance <= (self.radius * 1.1)
+
+    def __distance(self, coords):
+        '''
+            metres from the center of the run.
+            using spherical cosines formula applied on a spherical geodesic as the approximate distance
+            could have used haversine's formula (a bit more numerically robust but theoretically equivalent)
+            does not give exact distance for long distances due to earth being an oblate spheroid
+        '''
+        lat, lng = itemgetter('lat', 'lng')(coords)
 
         lat1, lng1 = self.lat * math.pi / 180, self.lng * math.pi / 180
         lat2, lng2 = lat * math.pi / 180, lng * math.pi / 180
@@ -789,12 +1761,7 @@ class TAapi(QObject):
         real_angle = pos1.angle(pos2)
 
         # d = self.EARTH_RADIUS * real_angle (works pretty good as an approximation)
-        spherical_distance = self.EARTH_RADIUS * real_angle
-
-        self.logger.info(f"{result['name']} : {spherical_distance} metres")
-
-        # allow 10% tolerance while clipping radius
-        return spherical_distance <= (self.radius * 1.1)
+        return self.EARTH_RADIUS * real_angle
 
     def __clean_results(self, result):
         name, url, reviews = itemgetter('name', 'url', 'reviews')(result)
@@ -804,163 +1771,696 @@ class TAapi(QObject):
                 all([val is not None for val in (name, url)]) and \
                 all([len(val) != 0 for val in (name, url)])
 
-    def __scrape(self):
-        try:
-            self.driver.get(self.__BASE_URL__)
-        except:
-            self.__cleanup()
-            self.logger.error(f"chromedriver faced error while loading {self.__BASE_URL__}")
+    def __collect_reviews(self, url, known=None, startPage=0, limit=None, checkpoint=True, onFirstPage=None):
+        '''
+            drains the page generators of a place up to limit (REVIEWS_MAX)
+            reviews. stopping early closes the generator, so no further page is
+            loaded. progress is checkpointed after every page, and a place
+            interrupted in a previous run resumes from the page it stopped at.
 
-        # Checkpoint 1
-        if not self.running:
-            self.__halt_error()
-            return
+            with known review keys, only reviews newer than the stored ones are
+            collected: paging stops at the first page holding a known review.
 
-        # type the location in the search bar
-        try:
-            searchBar = WebDriverWait(self.driver, self.__SEARCH_BOX_APPEAR_WAIT__) \
-                .until(EC.presence_of_element_located((By.XPATH, "//input[contains(@class, 'qjfqs')][@placeholder='Where to?']"))) 
-        except:
-            self.logger.warning(f"/GET {self.__BASE_URL__} - Loading took too much time. Aborting.", exc_info=True)
-        else:
-            searchBar.send_keys(self.location)
-            searchBar.send_keys(Keys.ENTER)
+            onFirstPage is called once the first page is in.
 
-        # Checkpoint 2
-        if not self.running:
-            self.__halt_error()
-            return
+            returns None if no review could be collected at all.
+        '''
+        mode, reviews = None, []
+        limit = self.REVIEWS_MAX if limit is None else limit
+        reached = False
+        seen = set()
+
+        # offset urls are needed to jump back to the page an interrupted run stopped at
+        cursor = self.checkpoint.cursor(url) if checkpoint else None
+        if cursor is not None and re.search(r'-Reviews-', url) is not None:
+            mode, reviews, startPage = cursor['mode'], cursor['reviews'], cursor['pages']
+            seen = set(cursor['keys'])
+            self.logger.info(f"resuming {url} from review page {startPage + 1}")
+
+        startUrl = self.__review_page_url(url, startPage)
+
+        # cheap server-rendered fetch first, headless chrome only as a fallback
+        sources = [self.__scrape_reviews_http, self.__scrape_reviews_browser] if self.httpFetch else [self.__scrape_reviews_browser]
+        sources = [partial(source, startUrl) for source in sources]
+
+        # concurrent offset pages first, sequential next-button paging as a fallback
+        if self.offsetPaging:
+            pageCount = math.ceil((limit - len(reviews)) / self.__REVIEWS_PAGE_SIZE__)
+            window = self.__DELTA_PAGE_WINDOW__ if known is not None else None
+            sources = [partial(self.__scrape_reviews_offsets, url, startPage, pageCount, window)] + sources
+
+        resumed = len(reviews)
+
+        for source in sources:
+            if len(reviews) >= limit:
+                break
 
-        # switch to the things-to-do tab
-        try:
-            searchFilterList = WebDriverWait(self.driver, self.__SEARCH_FILTER_APPEAR_WAIT__) \
-                .until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'ui_tabs')][@id='search-filters']/ul[1]")))
-        except:
-            self.logger.warning(f"/GET {self.driver.current_url} - Loading took too much time. Aborting.", exc_info=True)
-        else:
-            filters = searchFilterList.find_elements(by=By.XPATH, value=".//li/a")
-            search_filter = list(filter(lambda a: a.text == 'Things to do', filters))[0]
-            self.driver.execute_script("arguments[0].click();", search_filter)
+            pages = source()
+            for page, (mode, page_reviews) in enumerate(pages, start=startPage + 1):
+                if onFirstPage is not None:
+                    onFirstPage()
+                    onFirstPage = None
+
+                if known is not None:
+                    fresh = [review for review in page_reviews if self.__review_key(review) not in known]
+                    reached = len(fresh) < len(page_reviews)
+                    page_reviews = fresh
+
+                # offsets shift as reviews are posted, a resumed place may be served some of its reviews again
+                page_keys, unseen = [], []
+                for review in page_reviews:
+                    key = self.__review_key(review)
+                    if key not in seen:
+                        seen.add(key)
+                        page_keys.append(key)
+                        unseen.append(review)
+
+                reviews += unseen
+                if checkpoint:
+                    self.checkpoint.save_cursor(url, mode, unseen, page_keys, page)
+                self.__renew_lease(url)
+
+                if len(reviews) >= limit or reached:
+                    pages.close()
+                    break
+
+            if len(reviews) > resumed or reached:
+                break
 
-        # Checkpoint 3
-        if not self.running:
-            self.__halt_error()
-            return
+        if len(reviews) == 0 and not reached:
+            return None
 
-        place_results = self.__scrape_places_content()
+        return mode, reviews[:limit]
 
-        # TODO: remove debug statements in prod
-        # place_results = [
-        #     {
-        #         'name': 'Darjeeling Tea Garden',
-        #         'url': 'https://www.tripadvisor.in/Attraction_Review-g304557-d3705683-Reviews-Tea_Garden-Darjeeling_Darjeeling_District_West_Bengal.html',
-        #         'page': 1
-        #     },
-        #     {
-        #         'name': 'Darjeeling Toy Train', 
-        #         'url': 'https://www.tripadvisor.in/Attraction_Review-g304557-d3171246-Reviews-Darjeeling_Toy_Train-Darjeeling_Darjeeling_District_West_Bengal.html', 
-        #         'page': 1
-        #     }
-        # ]
+    def __renew_lease(self, url):
+        # a queue worker keeps the lease on a place with many review pages from running out
+        entry = getattr(self.heldLease, 'entry', None)
+        if entry is None or entry['url'] != url:
+            return
 
-        
-        self.logger.info(f"{len(place_results)} results loaded")
-        self.total.emit(min(len(place_results), self.PLACES_MAX))
+        if not self.dbm.renew(url, entry['lease'], self.__LEASE_TIMEOUT__):
+            self.logger.warning(f"lease on {url} was lost to another worker")
+
+    def __review_key(self, review):
+        # identity of a review across scrapes, text is cut short since it may come truncated
+        metadata = review['metadata']
+        key = [metadata.get(field) for field in ('title', 'rating', 'day', 'month', 'year')]
+        key.append((metadata.get('text') or '')[:50])
+        return hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+
+    def __merge_reviews(self, *batches):
+        # concatenates review lists newest first, dropping repeated reviews
+        merged, seen = [], set()
+        for batch in batches:
+            for review in batch:
+                key = self.__review_key(review)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(review)
+        return merged
+
+    def __refresh_reviews(self, url, cached):
+        '''
+            incremental counterpart of __collect_reviews for a place already in
+            mongodb: only the reviews posted since it was stored are scraped and
+            put in front of the stored ones. a cached place short of REVIEWS_MAX
+            is then topped up from the page its stored reviews end on.
 
-        results = []
+            returns None if the newest reviews could not be fetched.
+        '''
+        known = set(map(self.__review_key, cached['reviews']))
+        mode, delta = cached.get('mode'), []
 
-        # Checkpoint 6
-        if not self.running:
-            self.__halt_error()
+        fetched = self.__collect_reviews(url, known=known, checkpoint=False)
+        if fetched is None:
+            # the place is left as stored, stale, so that the next refresh tries again
+            self.logger.warning(f"{url}: no review page could be fetched, keeping the stored reviews")
+            return None
+
+        mode, delta = fetched
+        reviews = self.__merge_reviews(delta, cached['reviews'])
+
+        if self.running and len(reviews) < self.REVIEWS_MAX and re.search(r'-Reviews-', url) is not None:
+            older = self.__collect_reviews(url, startPage=len(reviews) // self.__REVIEWS_PAGE_SIZE__, limit=self.REVIEWS_MAX - len(reviews), checkpoint=False)
+            if older is not None:
+                mode = mode or older[0]
+                reviews = self.__merge_reviews(reviews, older[1])
+
+        self.logger.info(f"{url}: {len(delta)} new reviews since last scrape")
+
+        if len(reviews) == 0:
+            return None
+
+        return mode, reviews
+
+    def __review_page_url(self, url, page):
+        # review page n of a place lives at the same url with an '-orN-' offset after '-Reviews-'
+        if page == 0:
+            return url
+
+        return re.sub(r'-Reviews-(or[0-9]+-)?', f'-Reviews-or{page * self.__REVIEWS_PAGE_SIZE__}-', url, count=1)
+
+    def __scrape_reviews_offsets(self, url, startPage=0, pageCount=None, window=None):
+        '''
+            computes the offset urls of the pageCount review pages from
+            startPage on (all pages needed for REVIEWS_MAX by default) and
+            fetches them concurrently, at most window pages ahead of the
+            consumer, then yields them in page order. a missing page, or one
+            repeating an earlier page (out of range offsets are served the first
+            page), ends the place. pages not started yet are cancelled at that
+            point.
+        '''
+        if re.search(r'-Reviews-', url) is None:
             return
 
-        for place_result in place_results[:self.PLACES_MAX]:
-            name = place_result['name']
-            url = place_result['url']
-            page = place_result['page']
+        if pageCount is None:
+            pageCount = math.ceil(self.REVIEWS_MAX / self.__REVIEWS_PAGE_SIZE__) - startPage
 
-            # Checkpoint 7
-            if not self.running:
-                self.__halt_error()
-                return
+        pages = iter(range(startPage, startPage + pageCount))
+        futures = deque()
 
-            # check cache for url (unique id)
-            result = self.dbm.query(url)
+        def submit():
+            page = next(pages, None)
+            if page is not None:
+                futures.append(self.pageExecutor.submit(self.timer.bound(self.__fetch_review_page, url), self.__review_page_url(url, page)))
 
-            # if data is in cache and we have enough reviews
-            if result is not None and 'reviews' in result and len(result['reviews']) >= self.REVIEWS_MAX:
-                mode = result['mode']
-                reviews = result['reviews']
-                place_id = result['place_id']
-                geometry = result['coords']
+        for _ in range(pageCount if window is None else window):
+            submit()
 
-                result.pop('_id', None)
-            else:
-                mode = 'place'
+        seen = set()
+        try:
+            while len(futures) > 0:
+                fetched = futures.popleft().result()
+                submit()
 
-                self.REVIEWS_SO_FAR = 0
+                if fetched is None:
+                    return
 
-                try:
-                    self.driver.get(url)
-                except:
-                    self.__cleanup()
-                    self.logger.error(f"chromedriver faced error while loading {url}")
+                mode, page_reviews = fetched
+
+                key = tuple(review['metadata'].get('title') for review in page_reviews)
+                if key in seen:
+                    return
+                seen.add(key)
+
+                yield mode, page_reviews
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def __fetch_review_page(self, page_url):
+        # first page of the http or browser generator, without following pagination
+        sources = [self.__scrape_reviews_http, self.__scrape_reviews_browser] if self.httpFetch else [self.__scrape_reviews_browser]
+
+        for source in sources:
+            pages = source(page_url)
+            fetched = next(pages, None)
+            pages.close()
+
+            if fetched is not None and len(fetched[1]) > 0:
+                return fetched
+
+        return None
+
+    def __scrape_reviews_browser(self, url):
+        # a stopped run must not launch chrome, nothing would quit it
+        if not self.running:
+            return
 
+        try:
+            driver = self.driverPool.acquire()
+        except:
+            self.logger.error("error loading chromedriver", exc_info=True)
+            return
+
+        try:
+            self.__paced_browser_get(driver, url)
+        except:
+            self.driverPool.discard(driver)
+            self.logger.error(f"chromedriver faced error while loading {url}")
+            return
+
+        try:
+            try:
+                WebDriverWait(driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
+                    .until(EC.presence_of_element_located((By.XPATH, "//div[@class='FTCTN']")))
+            except:
                 try:
-                    WebDriverWait(self.driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
-                        .until(EC.presence_of_element_located((By.XPATH, "//div[@class='FTCTN']")))
+                    WebDriverWait(driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
+                        .until(EC.presence_of_element_located((By.XPATH, "//div[@class='LbPSX']")))
                 except:
-                    try:
-                        WebDriverWait(self.driver, self.__REVIEW_TAB_APPEAR_WAIT__) \
-                            .until(EC.presence_of_element_located((By.XPATH, "//div[@class='LbPSX']")))
-                    except:
-                        self.logger.warning(f"/GET {self.__BASE_URL__} - Loading took too much time. Aborting.", exc_info=True)
-                        reviews = []
-                    else:
-                        reviews = self.__scrape_reviews_places()
+                    self.logger.warning(f"/GET {url} - Loading took too much time. Aborting.", exc_info=True)
                 else:
-                    reviews = self.__scrape_reviews_things()
-                    mode = 'todo'
+                    self.__record_snapshot(driver)
+                    self.__note_browser_coords(driver, url)
+                    for page_reviews in self.__scrape_reviews_places(driver):
+                        yield 'place', page_reviews
+            else:
+                self.__record_snapshot(driver)
+                self.__note_browser_coords(driver, url)
+                for page_reviews in self.__scrape_reviews_things(driver):
+                    yield 'todo', page_reviews
+        finally:
+            self.driverPool.release(driver)
+
+    def __note_browser_coords(self, driver, url):
+        # page_source is a large transfer from the driver, only taken while the place has no coordinates
+        if self.__page_coords(re.sub(r'-Reviews-or[0-9]+-', '-Reviews-', url, count=1)) is not None:
+            return
+
+        try:
+            source = driver.page_source
+        except:
+            return
+
+        self.__note_page_coords(url, source)
+
+    def __scrape_reviews_http(self, url):
+        '''
+            fetches review pages with plain http requests and parses the server
+            rendered html with lxml. yields the same records as the selenium
+            scrapers, one page at a time. yields nothing when the first page could
+            not be fetched or carries no review tab (e.g. rendered client side or
+            blocked), so that the caller falls back to the browser.
+        '''
+        if lxml_html is None:
+            return
+
+        page_url = url
+
+        while page_url is not None:
+            # Checkpoint 8
+            if not self.running:
+                return
+
+            try:
+                res = self.__paced_get(page_url)
+                if res is None:
+                    return
+
+                res.raise_for_status()
+                parsed = self.__parse_review_page(res.text)
+            except:
+                self.logger.warning(f"/GET {page_url} - http fetch failed.", exc_info=True)
+                return
 
-                geometry, place_id = self.__get_coords(name)
+            if parsed is None:
+                return
+
+            self.__note_page_coords(page_url, res.text)
+
+            mode, page_reviews, page_url = parsed
+
+            yield mode, page_reviews
 
-            place_result['reviews'] = reviews[:self.REVIEWS_MAX]
-            place_result['mode'] = mode
+    @timed('parse')
+    def __parse_review_page(self, text):
+        '''
+            parses a server rendered review page into its layout, its reviews and
+            the url of the next page (None on the last page). returns None if the
+            page has no review tab.
+        '''
+        document = lxml_html.fromstring(text)
 
+        for mode, tab_xpath in self.__REVIEW_TAB_XPATHS__.items():
+            review_tabs = document.xpath(tab_xpath)
+            if len(review_tabs) > 0:
+                break
+        else:
+            return None
+
+        next_links = document.xpath(self.__NEXT_PAGE_XPATHS__[mode])
+        next_url = self.baseUrl + next_links[0] if len(next_links) > 0 and next_links[0].startswith('/') else None
+
+        return mode, self.__parse_reviews_html(review_tabs[0], mode), next_url
+
+    def __parse_reviews_html(self, reviewTab, mode):
+        xpaths = self.__REVIEW_XPATHS__[mode]
+
+        def text(container, key):
+            elems = container.xpath(xpaths[key])
+            return elems[0].text_content() if len(elems) > 0 else None
+
+        containers = reviewTab.xpath(xpaths['container'])
+        if mode == 'place':
+            # the last child of the attraction review tab is the pagination bar
+            containers = containers[:-1]
+
+        raw_reviews = []
+        for container in containers:
+            ratings = container.xpath(xpaths['rating'])
+            image_containers = container.xpath(xpaths['images'])
+            images = [self.__image_source(img.get) for img in image_containers[0].xpath(".//img")] if len(image_containers) > 0 else []
+
+            raw_reviews.append({
+                'rating': ratings[0].get('class' if mode == 'todo' else 'aria-label') if len(ratings) > 0 else None,
+                'title': text(container, 'title'),
+                'text': text(container, 'text'),
+                'date': text(container, 'date'),
+                'images': [src for src in images if src is not None]
+            })
+
+        normalize = self.__normalize_review_things if mode == 'todo' else self.__normalize_review_places
+        return [normalize(raw) for raw in raw_reviews]
+
+    def __image_source(self, attr):
+        # url of an img element, from its lazy load attributes while src is a placeholder.
+        # attr reads an attribute, img.get for lxml or get_attribute for a webelement
+        src = attr('src')
+        if src and not src.startswith('data:'):
+            return src
+
+        lazy = attr('data-src') or attr('data-lazyurl') or attr('data-lazysrc')
+        if lazy:
+            return lazy
+
+        srcset = attr('srcset') or attr('data-srcset')
+        if srcset:
+            # the last candidate is the largest
+            return srcset.split(',')[-1].split()[0]
+
+        return None
+
+    def __query_cache(self, result):
+        # cached document if it already holds enough reviews, else None. it may still lack coordinates
+        if result is not None and 'reviews' in result and len(result['reviews']) >= self.REVIEWS_MAX:
+            result.pop('_id', None)
+            return result
+
+        return None
+
+    def __build_place_result(self, place_result, mode, reviews, place_id, geometry):
+        place_result['reviews'] = reviews[:self.REVIEWS_MAX]
+        place_result['mode'] = mode
+
+        # places located from their page have no places api id, and the schema takes no null
+        if place_id is not None:
             place_result['place_id'] = place_id
-            place_result['coords'] = geometry
+        else:
+            place_result.pop('place_id', None)
+        place_result['coords'] = geometry
 
-            self.logger.info(f"{name}: {len(reviews)} downloaded")
+        self.logger.info(f"{place_result['name']}: {len(reviews)} downloaded")
 
-            results.append(place_result)
+        return place_result
 
-            self.progress.emit(len(results))
+    def __is_refreshable(self, cached):
+        # a stored place can be brought up to date with its new reviews only
+        return self.incremental and cached is not None and len(cached.get('reviews') or []) > 0
 
-        # print(results)
+    def __reuse_scraped(self, place_result):
+        with self.lock:
+            scraped = self.scraped[place_result['url']]
 
-        # self.logger.info("dumping data to results.json")
-        # json.dump({'results': results}, open(os.path.join(os.path.dirname(__file__), "results.json"), 'w'), indent = 4)
-        
-        # filter results based on coordinates and radius
-        results = list(filter(self.__filter_results_coords, results))
+        if scraped is None:
+            return None
 
-        # cleanup results
-        results = list(filter(self.__clean_results, results))
+        kept = self.__filter_results([dict(scraped, page=place_result['page'])])
+        return kept[0] if len(kept) > 0 else None
+
+    def __resumed_place(self, place_result, result):
+        # a place finished by an interrupted run was flushed to mongodb, or dropped if it is not there
+        if result is None:
+            return None
+
+        result.pop('_id', None)
+        return self.__build_place_result(place_result, result['mode'], result['reviews'], result.get('place_id'), result['coords'])
+
+    def __serve_cached(self, place_result, cached):
+        # a stored place emitted as it is, neither stamped nor written back
+        cached.pop('_id', None)
+
+        if cached.get('coords') is None:
+            return self.__relocate_place(place_result, cached)
+
+        return self.__complete_place(self.__build_place_result(place_result, cached['mode'], cached['reviews'], cached.get('place_id'), cached['coords']), fresh=False)
+
+    def __relocate_place(self, place_result, cached):
+        '''
+            a place stored without coordinates, because the places api budget
+            was spent when it was scraped. its stored reviews are kept and only
+            the lookup is made again. it keeps its scrape stamps, so the
+            refresh scheduler still sees how stale its reviews are.
+        '''
+        place_result = dict(place_result, **{field: cached[field] for field in ('last_scraped', 'review_velocity') if field in cached})
+
+        if self.quotaShort:
+            return self.__await_coords(place_result, cached['mode'], cached['reviews'], scraped=False)
+
+        return self.__locate_place(place_result, cached['mode'], cached['reviews'], scraped=False)
+
+    def __complete_place(self, place_result, fresh, scraped=True):
+        '''
+            filters a finished place right away and flushes it to mongodb if it
+            was freshly scraped, refreshed or located, then marks it done in the
+            checkpoint. only scraped places are stamped. returns the place if it
+            is kept, else None.
+        '''
+        kept = self.__filter_results([place_result]) if place_result is not None else []
+
+        if fresh and len(kept) > 0:
+            if scraped:
+                self.__stamp_place(place_result)
+            with self.timer.span('mongo.write'):
+                self.dbm.upsert(kept)
+
+        return self.__checkpoint_place(place_result, kept)
+
+    def __checkpoint_place(self, place_result, kept):
+        if place_result is not None:
+            self.checkpoint.mark_completed(place_result['url'])
+
+            # before the radius filter, a later job may have a different center
+            with self.lock:
+                self.scraped[place_result['url']] = place_result if 'reviews' in place_result else None
+
+        return kept[0] if len(kept) > 0 else None
+
+    def __timed_place(self, place_result):
+        # __scrape_place with every span of this thread attributed to the place
+        with self.timer.place(place_result['url']), self.timer.span('place'):
+            return self.__scrape_place(place_result)
+
+    def __scrape_place(self, place_result):
+        url = place_result['url']
+
+        # Checkpoint 7
+        if not self.running:
+            return None
+
+        # scraped already by an earlier job of the batch
+        if url in self.scraped:
+            return self.__reuse_scraped(place_result)
+
+        with self.timer.span('mongo.query'):
+            cached = self.dbm.query(url)
+
+        if self.checkpoint.is_completed(url):
+            return self.__resumed_place(place_result, cached)
+
+        # check cache for url (unique id)
+        result = self.__query_cache(cached)
+
+        # if data is in cache and we have enough reviews
+        if result is not None and not self.incremental:
+            return self.__serve_cached(place_result, result)
+
+        refreshing = self.__is_refreshable(cached)
+
+        with self.timer.span('reviews'):
+            if refreshing:
+                fetched = self.__refresh_reviews(url, cached)
+            else:
+                fetched = self.__collect_reviews(url, onFirstPage=partial(self.__prefetch_coords, place_result))
+
+        # nothing to keep, places without reviews are dropped by __clean_results anyway
+        if fetched is None:
+            if not self.running:
+                return None
+            # a failed refresh serves the stored place without marking it fresh
+            if refreshing:
+                return self.__serve_cached(place_result, cached)
+            return self.__checkpoint_place(place_result, [])
+
+        mode, reviews = fetched
+
+        known = self.__known_coords(url, cached)
+
+        if known is None and self.quotaShort:
+            return self.__await_coords(place_result, mode, reviews)
+
+        return self.__locate_place(place_result, mode, reviews, known)
+
+    def __locate_place(self, place_result, mode, reviews, known=None, scraped=True):
+        '''
+            completes a place with its known coordinates, or with a places api
+            lookup. a place served from mongodb (not scraped) is only written
+            back if the lookup located it.
+        '''
+        try:
+            geometry, place_id = known if known is not None else self.__get_coords(place_result['name'])
+        except QuotaExceeded:
+            return self.__defer_place(place_result, mode, reviews, scraped)
 
         # Checkpoint 14
         if not self.running:
+            # keep the review cursor, the place is picked up again on resume
+            return None
+
+        return self.__complete_place(self.__build_place_result(place_result, mode, reviews, place_id, geometry), fresh=scraped or geometry is not None, scraped=scraped)
+
+    def __await_coords(self, place_result, mode, reviews, scraped=True):
+        # parks a place until __geocode_awaiting, the review cursor of a scraped place stays in the checkpoint
+        with self.lock:
+            self.awaitingCoords.append((place_result, mode, reviews, scraped))
+
+        return None
+
+    def __geocode_awaiting(self):
+        '''
+            places parked while the budget was short, geocoded once the reviews
+            of every place are in: the most reviewed first, until the budget is
+            spent. the lookups the budget covers run ahead on the places client
+            pool.
+        '''
+        with self.lock:
+            awaiting, self.awaitingCoords = self.awaitingCoords, []
+
+        awaiting.sort(key=lambda parked: len(parked[2]), reverse=True)
+
+        if self.prefetchCoords:
+            for place_result, *_ in awaiting[:self.quota.available()]:
+                with self.timer.place(place_result['url']):
+                    self.__start_lookup(place_result['name'])
+
+        results = []
+        for place_result, mode, reviews, scraped in awaiting:
+            if not self.running:
+                break
+
+            with self.timer.place(place_result['url']):
+                kept = self.__locate_place(place_result, mode, reviews, scraped=scraped)
+            if kept is not None:
+                results.append(kept)
+
+        return results
+
+    def __defer_place(self, place_result, mode, reviews, scraped=True):
+        '''
+            a place the budget has no lookup left for. with the 'stop' policy
+            the run halts, and resumes from its checkpoint once there is budget
+            again. with 'defer' the place is stored without coordinates, so that
+            a later run only has to geocode it. a place served from mongodb is
+            stored like that already.
+        '''
+        if self.quotaPolicy == 'stop':
+            self.running = False
             self.__halt_error()
-            return []
+            return None
 
-        self.logger.info("inserting data to mongodb...")
-        self.dbm.insert(results)
-        self.logger.info("finished inserting data to mongodb")
+        place_result = self.__build_place_result(place_result, mode, reviews, None, None)
+        self.logger.info(f"{place_result['name']}: geocoding deferred, places API budget is spent")
 
-        # Checkpoint 15
+        # places without clean reviews are not worth keeping for later
+        if scraped and len(self.__filter_results([place_result])) > 0:
+            self.__stamp_place(place_result)
+            with self.timer.span('mongo.write'):
+                self.dbm.upsert([place_result])
+
+        self.checkpoint.mark_completed(place_result['url'])
+
+        # later jobs of the batch must not emit it without coordinates either
+        with self.lock:
+            self.scraped[place_result['url']] = None
+
+        return None
+
+    @timed('search')
+    def __search(self):
+        '''
+            runs the keyword search on the site and returns up to PLACES_MAX
+            place results, or None if the run was halted or no driver could be
+            started.
+        '''
+        try:
+            self.driver = self.driverPool.acquire()
+        except:
+            self.__cleanup()
+            self.logger.error("error loading chromedriver", exc_info=True)
+            return None
+
+        try:
+            self.__paced_browser_get(self.driver, self.baseUrl)
+        except:
+            self.__cleanup()
+            self.logger.error(f"chromedriver faced error while loading {self.baseUrl}")
+
+        # Checkpoint 1
         if not self.running:
             self.__halt_error()
-            return []
+            return None
+
+        # type the location in the search bar
+        try:
+            searchBar = WebDriverWait(self.driver, self.__SEARCH_BOX_APPEAR_WAIT__) \
+                .until(EC.presence_of_element_located((By.XPATH, "//input[contains(@class, 'qjfqs')][@placeholder='Where to?']"))) 
+        except:
+            self.logger.warning(f"/GET {self.baseUrl} - Loading took too much time. Aborting.", exc_info=True)
+        else:
+            self.__record_search_page(self.driver)
+            searchBar.send_keys(self.location)
+            searchBar.send_keys(Keys.ENTER)
+
+        # Checkpoint 2
+        if not self.running:
+            self.__halt_error()
+            return None
+
+        # switch to the things-to-do tab
+        try:
+            searchFilterList = WebDriverWait(self.driver, self.__SEARCH_FILTER_APPEAR_WAIT__) \
+                .until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'ui_tabs')][@id='search-filters']/ul[1]")))
+        except:
+            self.logger.warning(f"/GET {self.driver.current_url} - Loading took too much time. Aborting.", exc_info=True)
+        else:
+            self.__record_search_page(self.driver, action='search')
+            filters = searchFilterList.find_elements(by=By.XPATH, value=".//li/a")
+            search_filter = list(filter(lambda a: a.text == 'Things to do', filters))[0]
+            self.driver.execute_script("arguments[0].click();", search_filter)
+
+        # Checkpoint 3
+        if not self.running:
+            self.__halt_error()
+            return None
+
+        # stop paging through search results once enough places are known
+        place_results = []
+        for page_results in self.__scrape_places_content():
+            place_results += page_results
+            if len(place_results) >= self.PLACES_MAX:
+                break
+
+        # hand the search driver back, it is reaped if no place needs the browser
+        if hasattr(self, 'driver'):
+            self.driverPool.release(self.driver)
+            del self.driver
+
+        # Checkpoint 6
+        if not self.running:
+            self.__halt_error()
+            return None
+
+        return place_results[:self.PLACES_MAX]
+
+    def __filter_results(self, results):
+        # filter results based on coordinates and radius
+        results = list(filter(self.__filter_results_coords, results))
+
+        # cleanup results
+        return list(filter(self.__clean_results, results))
 
+    @timed('csv')
+    def __write_csv(self, results):
         self.logger.info("inserting data to csv file...")
         try:
             with open(self.csvFilePath, 'w', newline='', encoding='utf-8') as f:
@@ -984,8 +2484,9 @@ class TAapi(QObject):
                 writer.writeheader()
 
                 for result in results:
-                    result['lat'] = result['coords']['lat']
-                    result['lng'] = result['coords']['lng']
+                    coords = result['coords'] or dict()
+                    result['lat'] = coords.get('lat')
+                    result['lng'] = coords.get('lng')
 
                     if '_id' in result:
                         del result['_id']
@@ -996,33 +2497,694 @@ class TAapi(QObject):
                         del result_copy['reviews']
 
                         result_copy.update(review['metadata']) 
-                        result_copy['date'] = f"{result_copy['day']}-{result_copy['month']}-{result_copy['year']}"
+                        result_copy['date'] = f"{result_copy.get('day')}-{result_copy['month']}-{result_copy['year']}"
                         writer.writerow({key : value for key, value in result_copy.items() if key in fieldnames})
         except:
-            self.logging.error("error inserting data into csv file", exc_info=True)
+            self.logger.error("error inserting data into csv file", exc_info=True)
         else:
             self.logger.info("finished inserting data to csv file...")
 
+    def __job_checkpoint(self, *kind, persistent=True):
+        return CheckpointStore(
+            os.path.join(os.path.dirname(__file__), ".checkpoints") if persistent else None,
+            [self.location, self.lat, self.lng, self.radius, self.dbName, self.tableName, *kind],
+            logging=self.logger,
+            maxAge=self.__CHECKPOINT_MAX_AGE__
+        )
+
+    def __use_job(self, job):
+        # point the worker at the next job of a batch, unset fields keep their current value
+        self.location = job.get('location', self.location)
+        self.lat = job.get('lat', self.lat)
+        self.lng = job.get('lng', self.lng)
+        self.radius = job.get('radius', self.radius)
+        self.PLACES_MAX = job.get('maxPlaces', self.PLACES_MAX)
+        self.REVIEWS_MAX = job.get('maxReviews', self.REVIEWS_MAX)
+
+        self.PLACES_SO_FAR = 0
+        self.checkpoint = self.__job_checkpoint()
+
+    def __frontier(self, plan=None):
+        # search results of an interrupted run of the same job, or a fresh search (or plan)
+        if self.resume and self.checkpoint.load():
+            place_results = self.checkpoint.places()
+            self.logger.info(f"resuming previous run: {self.checkpoint.completed_count()} of {len(place_results)} places already done")
+            return place_results
+
+        self.checkpoint.clear()
+
+        place_results = plan() if plan is not None else self.__search()
+
+        if place_results is not None:
+            self.checkpoint.save_places(place_results)
+
+        return place_results
+
+    def __scrape(self):
+        results = self.__scrape_job()
+
+        if results is None:
+            return
+
+        # Checkpoint 15
+        if not self.running:
+            self.__halt_error()
+            return []
+
+        self.__write_csv(results)
+
         self.__cleanup()
 
         return results
 
-    def __halt_error(self):
-        self.__cleanup()
-        self.addMessage.emit("worker halted forcefully")
-        self.finished.emit([])
+    def __scrape_batch(self):
+        '''
+            runs the jobs one after the other on this worker, so they share the
+            driver pool, the http session and the geocode cache. a place found
+            by several overlapping jobs is scraped once and reused, filtered
+            against the radius of each job. progress and total are reported per
+            job, between jobStarted and jobFinished. the csv holds the places
+            of all jobs.
+        '''
+        results, urls = [], set()
 
-    def stop(self):
-        self.running = False
+        for index, job in enumerate(self.jobs):
+            self.__use_job(job)
 
-    def run(self):
-        self.running = True
+            self.logger.info(f"job {index + 1} of {len(self.jobs)}: {self.location}")
+            self.jobStarted.emit(index, self.location)
 
-        self.logger.info("starting run...")
+            job_results = self.__scrape_job()
 
-        results = self.__scrape()
+            if self.halted:
+                return None
+
+            if job_results is None:
+                job_results = []
+
+            self.jobFinished.emit(index, job_results)
+
+            for result in job_results:
+                if result['url'] not in urls:
+                    urls.add(result['url'])
+                    results.append(result)
+
+        # Checkpoint 15
+        if not self.running:
+            self.__halt_error()
+            return []
+
+        self.__write_csv(results)
+
+        self.__cleanup()
+
+        return results
+
+    def __scrape_refresh(self):
+        '''
+            re-scrapes the refreshBudget stored places within the radius that
+            are most stale relative to how fast they gather reviews, instead of
+            running a search. refreshed places only fetch their new reviews.
+        '''
+        self.incremental = True
+        self.checkpoint = self.__job_checkpoint('refresh')
+
+        results = self.__scrape_places(self.__frontier(plan=self.__plan_refresh))
+
+        if results is None:
+            return
+
+        # Checkpoint 15
+        if not self.running:
+            self.__halt_error()
+            return []
+
+        self.__write_csv(results)
+
+        self.__cleanup()
+
+        return results
+
+    def __scrape_enqueue(self):
+        # runs the search and hands the places to the work queue instead of scraping them
+        place_results = self.__search()
+
+        if place_results is None:
+            return
+
+        queued = self.dbm.enqueue(place_results)
+        self.logger.info(f"{queued} of {len(place_results)} places added to the work queue")
+
+        self.__cleanup()
+
+        return place_results
+
+    def __scrape_worker(self):
+        '''
+            leases places from the work queue of the table and scrapes them on
+            poolSize threads until the queue runs dry. any number of workers,
+            on any machine pointed at the same mongodb, can drain one queue.
+            each place is written with a single upsert before its queue entry
+            is marked done, so a worker dying in between only costs a re-scrape
+            once the lease runs out. the lease is renewed after every review
+            page, so only a stalled worker loses a place with many pages.
+        '''
+        # the queue is the record of progress here, review cursors stay in memory
+        self.checkpoint = self.__job_checkpoint('worker', persistent=False)
+
+        counts = self.dbm.queue_counts()
+        self.logger.info(f"work queue: {counts.get('pending', 0)} pending, {counts.get('leased', 0)} leased, {counts.get('done', 0)} done")
+        self.total.emit(counts.get('pending', 0))
+
+        self.workedOn = 0
+
+        with ThreadPoolExecutor(max_workers=self.poolSize) as executor:
+            futures = [executor.submit(self.__work_queue) for _ in range(self.poolSize)]
+
+        results = []
+        for future in futures:
+            try:
+                results += future.result()
+            except:
+                self.logger.warning("work queue thread failed", exc_info=True)
+
+        # Checkpoint 15
+        if not self.running:
+            self.__halt_error()
+            return []
+
+        self.__write_csv(results)
+
+        self.checkpoint.clear()
+
+        self.__cleanup()
+
+        return results
+
+    def __work_queue(self):
+        # one pool thread: leases places until the queue runs dry or the run is stopped
+        results = []
+
+        while self.running:
+            entry = self.dbm.lease(self.workerId, self.__LEASE_TIMEOUT__)
+            if entry is None:
+                break
+
+            place_result = {'name': entry['name'], 'url': entry['url'], 'page': entry.get('page')}
+
+            self.heldLease.entry = entry
+            try:
+                result = self.__timed_place(place_result)
+            except Exception as ex:
+                self.logger.warning(f"error scraping {entry['url']}", exc_info=True)
+                self.dbm.fail(entry['url'], entry['lease'], str(ex))
+                continue
+            finally:
+                self.heldLease.entry = None
+
+            if not self.running:
+                self.dbm.fail(entry['url'], entry['lease'], "worker stopped")
+                break
+
+            if not self.dbm.complete(entry['url'], entry['lease']):
+                self.logger.warning(f"lease on {entry['url']} expired before it was finished")
+
+            if result is not None:
+                results.append(result)
+
+            with self.lock:
+                self.workedOn += 1
+                workedOn = self.workedOn
+            self.progress.emit(workedOn)
+
+        return results
+
+    def __plan_refresh(self):
+        scheduler = RefreshScheduler(self.dbm, logging=self.logger)
+
+        # the same 10% tolerance as __filter_results_coords, without a log line per candidate
+        radius = self.radius * 1.1
+        within = lambda doc: doc.get('coords') is None or self.__distance(doc['coords']) <= radius
+
+        return scheduler.plan(self.refreshBudget, area=(self.lat, self.lng, radius), keep=within)
+
+    def __stamp_place(self, place_result):
+        # lets the refresh scheduler tell how stale and how busy a stored place is
+        place_result['last_scraped'] = datetime.now(timezone.utc)
+        place_result['review_velocity'] = review_velocity(place_result['reviews'])
+
+    def __scrape_job(self):
+        return self.__scrape_places(self.__frontier())
+
+    def __scrape_places(self, place_results):
+        if place_results is None:
+            return
+
+        # TODO: remove debug statements in prod
+        # place_results = [
+        #     {
+        #         'name': 'Darjeeling Tea Garden',
+        #         'url': 'https://www.tripadvisor.in/Attraction_Review-g304557-d3705683-Reviews-Tea_Garden-Darjeeling_Darjeeling_District_West_Bengal.html',
+        #         'page': 1
+        #     },
+        #     {
+        #         'name': 'Darjeeling Toy Train', 
+        #         'url': 'https://www.tripadvisor.in/Attraction_Review-g304557-d3171246-Reviews-Darjeeling_Toy_Train-Darjeeling_Darjeeling_District_West_Bengal.html', 
+        #         'page': 1
+        #     }
+        # ]
+
+        
+        self.logger.info(f"{len(place_results)} results loaded")
+        self.total.emit(len(place_results))
+
+        self.quotaShort = self.__reserve_quota(place_results)
+
+        results = []
+
+        # scrape places concurrently over the driver pool, keeping the search order
+        completed = 0
+        with ThreadPoolExecutor(max_workers=self.poolSize) as executor:
+            futures = [executor.submit(self.__timed_place, place_result) for place_result in place_results]
+
+            for future in as_completed(futures):
+                completed += 1
+                self.progress.emit(completed)
+
+        # Checkpoint 7
+        if not self.running:
+            self.__halt_error()
+            return
+
+        for future in futures:
+            try:
+                place_result = future.result()
+            except:
+                self.logger.warning("error scraping place", exc_info=True)
+            else:
+                if place_result is not None:
+                    results.append(place_result)
+
+        results += self.__geocode_awaiting()
+
+        # Checkpoint 14
+        if not self.running:
+            self.__halt_error()
+            return
+
+        # print(results)
+
+        # self.logger.info("dumping data to results.json")
+        # json.dump({'results': results}, open(os.path.join(os.path.dirname(__file__), "results.json"), 'w'), indent = 4)
+
+        # places were filtered and flushed to mongodb as they completed
+
+        self.checkpoint.clear()
+
+        return results
+
+    async def __scrape_async(self):
+        '''
+            asyncio counterpart of __scrape. review pages and places api calls go
+            through aiohttp and mongodb through motor, so the i/o waits of all
+            places overlap on one event loop. selenium has no asyncio binding, so
+            the search and any browser fallback run on executor threads over the
+            same driver pool. without aiohttp or motor the corresponding stage
+            runs the blocking code on executor threads instead.
+        '''
+        loop = asyncio.get_running_loop()
+
+        place_results = await loop.run_in_executor(None, self.__frontier)
+
+        if place_results is None:
+            return
+
+        self.logger.info(f"{len(place_results)} results loaded")
+        self.total.emit(len(place_results))
+
+        self.quotaShort = await loop.run_in_executor(None, self.__reserve_quota, place_results)
+
+        http = aiohttp.ClientSession(headers=self.__HTTP_HEADERS__, timeout=aiohttp.ClientTimeout(total=self.__HTTP_TIMEOUT__)) if aiohttp is not None else None
+        useMotor = self.dbm.open_async()
+
+        try:
+            semaphore = asyncio.Semaphore(self.poolSize)
+            tasks = [asyncio.ensure_future(self.__timed_place_async(place_result, http, useMotor, semaphore)) for place_result in place_results]
+
+            completed = 0
+            for task in asyncio.as_completed(tasks):
+                try:
+                    await task
+                except:
+                    pass
+                completed += 1
+                self.progress.emit(completed)
+
+            # Checkpoint 7
+            if not self.running:
+                self.__halt_error()
+                return
+
+            results = []
+            for task in tasks:
+                if task.exception() is not None:
+                    self.logger.warning("error scraping place", exc_info=task.exception())
+                elif task.result() is not None:
+                    results.append(task.result())
+
+            results += await loop.run_in_executor(None, self.__geocode_awaiting)
+
+            # places were filtered and flushed to mongodb as they completed
+
+            # Checkpoint 15
+            if not self.running:
+                self.__halt_error()
+                return []
+
+            await loop.run_in_executor(None, self.__write_csv, results)
+
+            self.checkpoint.clear()
+        finally:
+            if http is not None:
+                await http.close()
+            self.dbm.close_async()
+
+        self.__cleanup()
+
+        return results
+
+    async def __timed_place_async(self, place_result, http, useMotor, semaphore):
+        # __scrape_place_async with every span of its task, and of the executor calls it makes, attributed to the place
+        async with semaphore:
+            with self.timer.place(place_result['url']), self.timer.span('place'):
+                return await self.__scrape_place_async(place_result, http, useMotor)
+
+    async def __scrape_place_async(self, place_result, http, useMotor):
+        loop = asyncio.get_running_loop()
+        bound = self.timer.bound
+
+        # Checkpoint 7
+        if not self.running:
+            return None
+
+        url = place_result['url']
+
+        # scraped already by an earlier job of the batch
+        if url in self.scraped:
+            return self.__reuse_scraped(place_result)
+
+        # check cache for url (unique id)
+        with self.timer.span('mongo.query'):
+            if useMotor:
+                result = await self.dbm.query_async(url)
+            else:
+                result = await loop.run_in_executor(None, self.dbm.query, url)
+
+        if self.checkpoint.is_completed(url):
+            return self.__resumed_place(place_result, result)
+
+        cached, result = result, self.__query_cache(result)
+
+        if result is not None and not self.incremental:
+            return await self.__serve_cached_async(place_result, result)
+
+        refreshing = self.__is_refreshable(cached)
+
+        with self.timer.span('reviews'):
+            if refreshing:
+                # a refresh is a page or two per place, it stays on the blocking path
+                fetched = await loop.run_in_executor(None, bound(self.__refresh_reviews), url, cached)
+            else:
+                fetched = await self.__collect_reviews_async(http, url) if http is not None and self.httpFetch else None
+
+                if fetched is None:
+                    fetched = await loop.run_in_executor(None, bound(self.__collect_reviews), url)
+
+        if fetched is None:
+            if not self.running:
+                return None
+            if refreshing:
+                return await self.__serve_cached_async(place_result, cached)
+            return self.__checkpoint_place(place_result, [])
+
+        mode, reviews = fetched
+
+        known = self.__known_coords(url, cached)
+
+        if known is None and self.quotaShort:
+            return self.__await_coords(place_result, mode, reviews)
+
+        try:
+            if known is not None:
+                geometry, place_id = known
+            elif http is not None:
+                with self.timer.span('geocode'):
+                    geometry, place_id = await self.__get_coords_async(http, place_result['name'])
+            else:
+                geometry, place_id = await loop.run_in_executor(None, bound(self.__get_coords), place_result['name'])
+        except QuotaExceeded:
+            return await loop.run_in_executor(None, bound(self.__defer_place), place_result, mode, reviews)
+
+        # Checkpoint 14
+        if not self.running:
+            return None
+
+        kept = self.__filter_results([self.__build_place_result(place_result, mode, reviews, place_id, geometry)])
+
+        if len(kept) > 0:
+            self.__stamp_place(kept[0])
+            with self.timer.span('mongo.write'):
+                if useMotor:
+                    await self.dbm.upsert_async(kept)
+                else:
+                    await loop.run_in_executor(None, self.dbm.upsert, kept)
+
+        return self.__checkpoint_place(place_result, kept)
+
+    async def __serve_cached_async(self, place_result, cached):
+        # a stored place without coordinates is located on the blocking path
+        if cached.get('coords') is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.timer.bound(self.__serve_cached), place_result, cached)
+
+        return self.__serve_cached(place_result, cached)
+
+    async def __collect_reviews_async(self, http, url):
+        # offset pages are requested all at once, otherwise next links are followed one by one
+        reviews, seen = [], set()
+        mode = None
+
+        if self.offsetPaging and re.search(r'-Reviews-', url) is not None:
+            page_count = math.ceil(self.REVIEWS_MAX / self.__REVIEWS_PAGE_SIZE__)
+            pages = await asyncio.gather(*[self.__fetch_review_page_async(http, self.__review_page_url(url, page)) for page in range(page_count)])
+
+            for parsed in pages:
+                if parsed is None:
+                    break
+
+                mode, page_reviews, _ = parsed
+
+                key = tuple(review['metadata'].get('title') for review in page_reviews)
+                if key in seen:
+                    break
+                seen.add(key)
+
+                reviews += page_reviews
+        else:
+            page_url = url
+            while page_url is not None and len(reviews) < self.REVIEWS_MAX:
+                parsed = await self.__fetch_review_page_async(http, page_url)
+                if parsed is None:
+                    break
+
+                mode, page_reviews, page_url = parsed
+                reviews += page_reviews
+
+        if len(reviews) == 0:
+            return None
+
+        return mode, reviews[:self.REVIEWS_MAX]
+
+    async def __fetch_review_page_async(self, http, page_url):
+        # Checkpoint 8
+        if not self.running or lxml_html is None:
+            return None
+
+        try:
+            text = await self.__paced_get_async(http, page_url)
+            if text is None:
+                return None
+
+            parsed = self.__parse_review_page(text)
+            if parsed is not None:
+                self.__note_page_coords(page_url, text)
+            return parsed
+        except:
+            self.logger.warning(f"/GET {page_url} - http fetch failed.", exc_info=True)
+            return None
+
+    async def __get_coords_async(self, http, place):
+        # Checkpoint 13
+        if not self.running:
+            self.__halt_error()
+            return None, None
+
+        bias = self.__location_bias()
+        key = self.__geocode_key(place, bias)
+
+        try:
+            return self.__or_offline(place, await self.__lookup_coords_async(http, place, key, bias))
+        except QuotaExceeded:
+            return self.__offline_or_raise(place)
+        except:
+            self.logger.warning("error fetching location info", exc_info=True)
+            return self.__or_offline(place, (None, None))
+
+    async def __lookup_coords_async(self, http, place, key, bias):
+        future = self.geocoder.pending(key)
+        if future is not None and not future.cancelled():
+            return await asyncio.wrap_future(future)
+
+        cached = await asyncio.get_running_loop().run_in_executor(None, self.__cached_coords, key)
+        if cached is not None:
+            return cached
+
+        await asyncio.get_running_loop().run_in_executor(None, self.__consume_quota)
+
+        text = await self.__paced_get_async(http, self.geocoder.query_url(place, bias))
+        if text is None:
+            return None, None
+
+        return self.__read_places_api_response(place, key, json.loads(text))
+
+    def __halt_error(self):
+        # checkpoints are hit from every pool thread, halt only once
+        with self.lock:
+            if self.halted:
+                return
+            self.halted = True
+
+        self.__cleanup()
+        self.addMessage.emit("worker halted forcefully")
+        self.finished.emit([])
+
+    def __report_timings(self):
+        # logs where the run spent its time and hands the figures to the ui
+        self.logger.info("time per stage:")
+        for line in self.timer.report():
+            self.logger.info(line)
+
+        for url, stages in self.timer.slowest_places():
+            self.logger.info(f"slow place {stages.get('place', 0.0):.2f} s: {url}")
+
+        self.timings.emit({'stages': self.timer.summary(), 'places': self.timer.place_summary()})
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        self.running = True
+
+        self.logger.info("starting run...")
+        start = time.perf_counter()
+
+        results = self.__scrape()
+
+        self.running = False
+
+        self.logger.info(f"finished in {time.perf_counter() - start:.2f} s (threaded engine).")
+        self.__report_timings()
+        self.finished.emit(results if results is not None else [])
+
+    def run_batch(self):
+        '''
+            runs every job in self.jobs in one session. emits the same signals as
+            run, plus jobStarted and jobFinished around each job.
+        '''
+        self.running = True
+
+        self.logger.info(f"starting batch run of {len(self.jobs)} jobs...")
+        start = time.perf_counter()
+
+        results = self.__scrape_batch()
+
+        self.running = False
+
+        self.logger.info(f"finished in {time.perf_counter() - start:.2f} s (batch).")
+        self.__report_timings()
+        self.finished.emit(results if results is not None else [])
+
+    def run_enqueue(self):
+        '''
+            searches like run, but only adds the places to the work queue for
+            run_worker processes to scrape.
+        '''
+        self.running = True
+
+        self.logger.info("starting search for the work queue...")
+        start = time.perf_counter()
+
+        results = self.__scrape_enqueue()
+
+        self.running = False
+
+        self.logger.info(f"finished in {time.perf_counter() - start:.2f} s (enqueue).")
+        self.__report_timings()
+        self.finished.emit(results if results is not None else [])
+
+    def run_worker(self):
+        # drains the work queue of the table, see __scrape_worker
+        self.running = True
+
+        self.logger.info(f"starting queue worker {self.workerId}...")
+        start = time.perf_counter()
+
+        results = self.__scrape_worker()
+
+        self.running = False
+
+        self.logger.info(f"finished in {time.perf_counter() - start:.2f} s (worker).")
+        self.__report_timings()
+        self.finished.emit(results if results is not None else [])
+
+    def run_refresh(self):
+        '''
+            refreshes the stalest stored places of the table around the center,
+            up to refreshBudget of them. meant for periodic runs over areas that
+            were scraped before. emits the same signals as run.
+        '''
+        self.running = True
+
+        self.logger.info("starting refresh run...")
+        start = time.perf_counter()
+
+        results = self.__scrape_refresh()
+
+        self.running = False
+
+        self.logger.info(f"finished in {time.perf_counter() - start:.2f} s (refresh).")
+        self.__report_timings()
+        self.finished.emit(results if results is not None else [])
+
+    def run_async(self):
+        '''
+            same pipeline as run on an asyncio event loop. emits the same signals,
+            so it can be connected to QThread.started in place of run.
+        '''
+        self.running = True
+
+        self.logger.info("starting async run...")
+        start = time.perf_counter()
+
+        results = asyncio.run(self.__scrape_async())
+
+        self.running = False
+
+        self.logger.info(f"finished in {time.perf_counter() - start:.2f} s (asyncio engine).")
+        self.__report_timings()
+        self.finished.emit(results if results is not None else [])
 
-        self.running = False
 
-        self.logger.info("finished.")
-        self.finished.emit(results)
+if __name__ == '__main__':
+    from cli import main
+    sys.exit(main())
@@ -0,0 +1,385 @@
+# coding=utf-8
+"""Stand-in site the replay fixture is recorded from.
+
+Serves a search and three attractions in the markup the scraper's xpaths
+target (the 2022 things-to-do and attraction layouts), plus places api
+answers, on localhost. Running this module records test/replay through the
+real pipeline: TAapi.run with a FixtureRecorder, against this site.
+
+    python test/replay_site.py test/replay
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import re
+import sys
+import json
+import html
+import logging
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+# the job the fixture is recorded for, a replay must run the same one
+JOB = {
+    'keyword': 'eiffel tower',
+    'lat': 48.8566,
+    'lng': 2.3522,
+    'radius': 5000,
+    'maxPlaces': 3,
+    'maxReviews': 15
+}
+
+MAPS_PATH = '/maps/api/place/findplacefromtext/json'
+
+PAGE_SIZE = 10
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+
+# a lazy loaded review image: a placeholder in src until it is scrolled into view
+PLACEHOLDER = 'data:image/gif;base64,R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=='
+
+PLACES = [
+    {
+        'name': 'Eiffel Tower',
+        'path': '/Attraction_Review-g187147-d188151-Reviews-Eiffel_Tower-Paris_Ile_de_France.html',
+        'layout': 'todo',
+        'geo': {'lat': 48.858353, 'lng': 2.294464},
+        'reviews': 15,
+        'topic': 'the view from the top'
+    },
+    {
+        'name': 'Louvre Museum',
+        'path': '/Attraction_Review-g187147-d188757-Reviews-Louvre_Museum-Paris_Ile_de_France.html',
+        'layout': 'place',
+        # no json-ld block, the places api locates it
+        'geo': None,
+        'reviews': 10,
+        'topic': 'the collections'
+    },
+    {
+        'name': 'Palace of Versailles',
+        'path': '/Attraction_Review-g187148-d188679-Reviews-Palace_of_Versailles-Versailles_Yvelines_Ile_de_France.html',
+        'layout': 'todo',
+        # outside the radius of the job
+        'geo': {'lat': 48.804865, 'lng': 2.120355},
+        'reviews': 3,
+        'topic': 'the gardens'
+    }
+]
+
+PLACES_API = {
+    'Louvre Museum': {'lat': 48.8606111, 'lng': 2.337644, 'place_id': 'ChIJD3uTd9hx5kcR1IQvGfr8dbk'}
+}
+
+
+def reviews_of(place):
+    # the reviews of a place, newest first
+    reviews = []
+    for index in range(place['reviews']):
+        month = 11 - index // 2
+        reviews.append({
+            'id': f"{place['path'].split('-')[2][1:]}{index:03d}",
+            'title': f"{place['name']} review {index + 1}",
+            'text': f"Visit {index + 1} to {place['name']}, mostly for {place['topic']}.",
+            'rating': 5 - index % 3,
+            'day': 28 - index,
+            'month': month + 1,
+            'year': 2024,
+            'image': f"https://dynamic-media-cdn.tripadvisor.com/media/photo-o/{index:02d}/{place['path'].split('-')[2][1:]}.jpg?w=300&h=-1&s=1" if index % 4 == 0 else None
+        })
+    return reviews
+
+
+def review_page_url(place, page):
+    return place['path'] if page == 0 else place['path'].replace('-Reviews-', f"-Reviews-or{page * PAGE_SIZE}-", 1)
+
+
+def review_offset(place, path):
+    # review offset of a page path of place, None if it is not one of its review pages
+    head, tail = place['path'].split('-Reviews-', 1)
+    match = re.fullmatch(re.escape(head) + r'-Reviews-(?:or([0-9]+)-)?' + re.escape(tail), path)
+    return int(match.group(1) or 0) if match is not None else None
+
+
+def todo_review(review):
+    image = f'<div class="pDrIj"><img src="{PLACEHOLDER}" data-src="{html.escape(review["image"])}" alt=""></div>' if review['image'] is not None else ''
+    return f'''<div class="_c lgfjP" data-reviewid="{review['id']}">
+    <span class="ui_bubble_rating bubble_{review['rating']}0"></span>
+    <div class="KgQgP MC _S b S6 H5 _a"><a href="#"><span><span>{html.escape(review['title'])}</span></span></a></div>
+    <span class="teHYY _R Me S4 H3">Date of experience: {MONTHS[review['month'] - 1]} {review['year']}</span>
+    <div class="_T FKffI"><div class="fIrGe _T"><q class="QewHA H4 _a"><span>{html.escape(review['text'])}</span></q></div></div>
+    {image}
+</div>'''
+
+
+def place_review(review):
+    image = f'<div class="LblVz"><img src="{PLACEHOLDER}" srcset="{html.escape(review["image"])} 1x, {html.escape(review["image"].replace("w=300", "w=600"))} 2x" alt=""></div>' if review['image'] is not None else ''
+    return f'''<div>
+    <svg class="UctUV d H0" viewBox="0 0 88 16" width="88" height="16" aria-label="{review['rating']}.0 of 5 bubbles"></svg>
+    <div class="biGQs _P fiohW qWPrE ncFvv fOtGX"><a href="#"><span>{html.escape(review['title'])}</span></a></div>
+    <div class="_T FKffI"><div class="biGQs _P pZUbB KxBGd"><span>{html.escape(review['text'])}</span></div></div>
+    <div class="TreSq"><div>Written {review['day']} {MONTHS[review['month'] - 1]} {review['year']}</div></div>
+    {image}
+</div>'''
+
+
+def review_page(place, page):
+    reviews = reviews_of(place)
+    pages = max(1, -(-len(reviews) // PAGE_SIZE))
+
+    # offsets past the last page are served the first page, like the site does
+    page = page if page < pages else 0
+    shown = reviews[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+    nextPath = review_page_url(place, page + 1) if page + 1 < pages else None
+
+    geo = ''
+    if place['geo'] is not None:
+        geo = '<script type="application/ld+json">' + json.dumps({
+            '@context': 'https://schema.org',
+            '@type': 'LandmarksOrHistoricalBuildings',
+            'name': place['name'],
+            'geo': {'@type': 'GeoCoordinates', 'latitude': place['geo']['lat'], 'longitude': place['geo']['lng']}
+        }) + '</script>'
+
+    if place['layout'] == 'todo':
+        pagination = f'<div class="ui_pagination is-centered"><a class="ui_button nav next primary " href="{nextPath}">Next</a></div>' if nextPath is not None else '<div class="ui_pagination is-centered"><span class="ui_button nav next primary disabled">Next</span></div>'
+        tab = '<div class="FTCTN">' + '\n'.join(map(todo_review, shown)) + pagination + '</div>'
+    else:
+        link = f'<a aria-label="Next page" href="{nextPath}">Next</a>' if nextPath is not None else ''
+        tab = '<div class="LbPSX">' + '\n'.join(map(place_review, shown)) + f'<div class="UCacc">{link}</div></div>'
+
+    return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(place['name'])} - Tripadvisor</title>
+{geo}
+<script>window.__WEB_CONTEXT__ = {{"pageManifest": {{"locationId": 187147, "latitude": 48.856697, "longitude": 2.351462}}}};</script>
+</head>
+<body>
+<h1 id="HEADING">{html.escape(place['name'])}</h1>
+{tab}
+</body></html>'''
+
+
+def home_page():
+    return '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Tripadvisor</title></head>
+<body>
+<form onsubmit="return false;"><input class="qjfqs _G B- z _J Cj R0" type="search" placeholder="Where to?" title="Search"></form>
+<script>
+    document.querySelector('input').addEventListener('keydown', function (e) {
+        if (e.key === 'Enter') {
+            e.preventDefault();
+            window.location.href = '/Search?q=' + encodeURIComponent(e.target.value);
+        }
+    });
+</script>
+</body></html>'''
+
+
+def result_card(place, index):
+    locationId = place['path'].split('-')[2][1:]
+    onclick = f"widgetEvCall('handlers.openResult', event, this, '{place['path']}', {{&quot;type&quot;:&quot;ATTRACTIONS&quot;,&quot;index&quot;:{index},&quot;locationId&quot;:&quot;{locationId}&quot;}});"
+    return f'''<div class="result-card">
+    <div class="result-content-columns" onclick="{onclick}">
+        <div class="result-title"><span>{html.escape(place['name'])}</span><span class="location"> Paris</span></div>
+    </div>
+</div>'''
+
+
+def search_page(query, filtered):
+    filters = '''<div class="ui_tabs" id="search-filters"><ul>
+    <li><a href="#" data-ssrc="a">All results</a></li>
+    <li><a href="#" data-ssrc="A">Things to do</a></li>
+    <li><a href="#" data-ssrc="h">Hotels</a></li>
+</ul></div>'''
+
+    filterScript = '''<script>
+    document.querySelectorAll('#search-filters a').forEach(function (a) {
+        a.addEventListener('click', function (e) {
+            e.preventDefault();
+            var params = new URLSearchParams(window.location.search);
+            params.set('ssrc', a.getAttribute('data-ssrc'));
+            window.location.href = '/Search?' + params.toString();
+        });
+    });
+</script>'''
+
+    if not filtered:
+        return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Search results - Tripadvisor</title></head>
+<body>
+{filters}
+<div class="search-results-list">Choose a category for {html.escape(query)}</div>
+{filterScript}
+</body></html>'''
+
+    # the second page of results is swapped in client side, the url stays the same
+    first = '\n'.join(result_card(place, index) for index, place in enumerate(PLACES[:2]))
+    second = '\n'.join(result_card(place, index) for index, place in enumerate(PLACES[2:], start=2))
+
+    return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Search results - Tripadvisor</title></head>
+<body>
+{filters}
+<div id="results">
+{first}
+<div class="ui_pagination"><a class="ui_button nav next primary" data-page="2" data-offset="30" href="#">Next</a></div>
+</div>
+<template id="page-2">
+{second}
+<div class="ui_pagination"><a class="ui_button nav next primary disabled" href="#">Next</a></div>
+</template>
+{filterScript}
+<script>
+    document.getElementById('results').addEventListener('click', function (e) {{
+        var next = e.target.closest('.ui_pagination a');
+        if (next && next.getAttribute('data-page')) {{
+            e.preventDefault();
+            document.getElementById('results').innerHTML = document.getElementById('page-2').innerHTML;
+            window.scrollTo(0, 0);
+        }}
+    }});
+</script>
+</body></html>'''
+
+
+def places_api_answer(query):
+    found = PLACES_API.get(query.get('input', [''])[0])
+    if found is None:
+        return {'candidates': [], 'status': 'ZERO_RESULTS'}
+
+    return {
+        'candidates': [{'geometry': {'location': {'lat': found['lat'], 'lng': found['lng']}}, 'place_id': found['place_id']}],
+        'status': 'OK'
+    }
+
+
+class StandInSite:
+    """Serves the pages above on localhost."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = ThreadingHTTPServer((host, port), self.__handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def maps_url(self):
+        return self.url + MAPS_PATH
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def render(self, path):
+        # body and content type of a request path, None if there is no such page
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+
+        if parts.path == '/':
+            return home_page(), 'text/html; charset=utf-8'
+
+        if parts.path == '/Search':
+            return search_page(query.get('q', [''])[0], query.get('ssrc', [''])[0] == 'A'), 'text/html; charset=utf-8'
+
+        if parts.path == MAPS_PATH:
+            return json.dumps(places_api_answer(query)), 'application/json; charset=UTF-8'
+
+        for place in PLACES:
+            offset = review_offset(place, parts.path)
+            if offset is not None:
+                return review_page(place, offset // PAGE_SIZE), 'text/html; charset=utf-8'
+
+        return None
+
+    def __handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                rendered = site.render(self.path)
+                if rendered is None:
+                    self.send_error(404)
+                    return
+
+                body, contentType = rendered
+                body = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', contentType)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def record(directory):
+    '''
+        runs the job against the stand-in site through TAapi.run, recording
+        every page and places api answer into directory. needs chrome, the
+        chromedriver in exe/ and mongodb, like any run.
+    '''
+    from cli import build_worker
+    from fixtures import FixtureRecorder
+    from quota import QuotaManager
+
+    if os.path.isdir(directory) and len(os.listdir(directory)) > 0:
+        raise ValueError(f"{directory} is not empty")
+
+    site = StandInSite().start()
+    recorder = FixtureRecorder(directory, LOGGER)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        config = dict(
+            JOB,
+            apiKey='RECORDING',
+            dbName='ta_fixture_recording',
+            tableName='places',
+            csvFilePath=os.path.join(scratch, 'places.csv'),
+            resume=False
+        )
+
+        try:
+            worker = build_worker(config, recorder=recorder, baseUrl=site.url, mapsUrl=site.maps_url)
+            # the usage of the machine is not touched by the recording
+            worker.quota = QuotaManager(os.path.join(scratch, 'usage.json'), logging=LOGGER)
+
+            results = []
+            worker.finished.connect(results.append)
+            worker.run()
+            worker.dbm.db.client.drop_database(config['dbName'])
+        finally:
+            site.stop()
+
+    return results[0] if len(results) > 0 else []
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    logging.basicConfig(level=logging.INFO)
+
+    recorded = record(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), 'replay'))
+    print(f"recorded {len(recorded)} places: {', '.join(place['name'] for place in recorded)}")
@@ -0,0 +1,180 @@
+# coding=utf-8
+"""Checkpoint test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import json
+import logging
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from checkpoint import CheckpointStore
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+JOB = ['eiffel tower', 48.8566, 2.3522, 5000, 'tripadvisor', 'places']
+PLACES = [{'name': 'Eiffel Tower', 'url': 'https://www.tripadvisor.com/Attraction_Review-g187147-d188151-Reviews.html'}]
+
+
+def reviews(*titles):
+    return [{'metadata': {'title': title, 'rating': 5, 'text': f"{title}!"}, 'images': []} for title in titles]
+
+
+class CheckpointStoreTest(unittest.TestCase):
+    """Test an interrupted job can be resumed."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.directory.cleanup()
+
+    def store(self, job=JOB, maxAge=None):
+        return CheckpointStore(self.directory.name, job, LOGGER, maxAge=maxAge)
+
+    def test_nothing_to_resume(self):
+        """Test a fresh job has no checkpoint."""
+        self.assertFalse(self.store().load())
+
+    def test_resume(self):
+        """Test places, completed places and cursors survive a restart."""
+        store = self.store()
+        store.save_places(PLACES)
+        store.mark_completed('a')
+        store.save_cursor('b', 'pages', reviews('one', 'two'), ['k1', 'k2'], 1)
+        store.save_cursor('b', 'pages', reviews('three'), ['k3'], 2)
+
+        resumed = self.store()
+        self.assertTrue(resumed.load())
+        self.assertEqual(resumed.places(), PLACES)
+        self.assertTrue(resumed.is_completed('a'))
+        self.assertFalse(resumed.is_completed('b'))
+        self.assertEqual(resumed.completed_count(), 1)
+        self.assertEqual(resumed.cursor('b'), {'mode': 'pages', 'pages': 2, 'keys': ['k1', 'k2', 'k3'], 'reviews': reviews('one', 'two', 'three')})
+
+    def test_stamped_places(self):
+        """Test places stamped with their scrape time are still written."""
+        store = self.store()
+        store.save_places([dict(PLACES[0], last_scraped=datetime(2026, 10, 18, tzinfo=timezone.utc))])
+
+        resumed = self.store()
+        self.assertTrue(resumed.load())
+        self.assertEqual(resumed.places()[0]['last_scraped'], '2026-10-18T00:00:00+00:00')
+
+    def test_cursor_holds_keys_only(self):
+        """Test reviews are journaled per page instead of rewritten with the checkpoint."""
+        store = self.store()
+        store.save_places(PLACES)
+        store.save_cursor('b', 'offsets', reviews('one'), ['k1'], 1)
+
+        with open(store.path, 'r', encoding='utf-8') as f:
+            self.assertNotIn('one!', f.read())
+        self.assertEqual(len(os.listdir(self.directory.name)), 2)
+
+    def test_stale_checkpoint(self):
+        """Test a checkpoint older than the max age is not resumed."""
+        store = self.store(maxAge=3600)
+        store.save_places(PLACES)
+        self.assertTrue(self.store(maxAge=3600).load())
+
+        with open(store.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        state['saved'] -= 7200
+        with open(store.path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+        with self.assertLogs(LOGGER, 'INFO'):
+            self.assertFalse(self.store(maxAge=3600).load())
+        self.assertTrue(self.store().load())
+
+    def test_torn_journal(self):
+        """Test a page written past the cursor, or torn, is ignored and a page fetched again replaces its line."""
+        store = self.store()
+        store.save_cursor('b', 'pages', reviews('one'), ['k1'], 1)
+        store.save_cursor('b', 'pages', reviews('two'), ['k2'], 2)
+
+        journal = [name for name in os.listdir(self.directory.name) if name.endswith('.jsonl')][0]
+        with open(os.path.join(self.directory.name, journal), 'a', encoding='utf-8') as f:
+            f.write('{"page": 3, "reviews": [{"metadata": {"title": "thr\n')
+        # page 2 fetched again after the crash
+        store.save_cursor('b', 'pages', reviews('two'), [], 2)
+
+        resumed = self.store()
+        resumed.load()
+        self.assertEqual(resumed.cursor('b')['reviews'], reviews('one', 'two'))
+
+    def test_lost_journal(self):
+        """Test a cursor whose reviews are gone is dropped so the place is collected again."""
+        store = self.store()
+        store.save_cursor('b', 'pages', reviews('one'), ['k1'], 1)
+        for name in os.listdir(self.directory.name):
+            if name.endswith('.jsonl'):
+                os.remove(os.path.join(self.directory.name, name))
+
+        with self.assertLogs(LOGGER, 'WARNING'):
+            self.assertIsNone(store.cursor('b'))
+
+    def test_jobs_are_kept_apart(self):
+        """Test another job does not pick up the checkpoint."""
+        self.store().save_places(PLACES)
+        self.assertFalse(self.store(JOB + ['refresh']).load())
+
+    def test_completed_drops_cursor(self):
+        """Test a finished place forgets its review cursor."""
+        store = self.store()
+        store.save_cursor('a', 'offsets', reviews('one'), ['k1'], 1)
+        store.mark_completed('a')
+        store.mark_completed('a')
+
+        self.assertIsNone(store.cursor('a'))
+        self.assertEqual(store.completed_count(), 1)
+        self.assertEqual(os.listdir(self.directory.name), [os.path.basename(store.path)])
+
+    def test_clear(self):
+        """Test a cleared checkpoint is gone from disk."""
+        store = self.store()
+        store.save_places(PLACES)
+        store.save_cursor('a', 'offsets', reviews('one'), ['k1'], 1)
+        self.assertTrue(os.path.isfile(store.path))
+
+        store.clear()
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertIsNone(store.places())
+        self.assertFalse(self.store().load())
+
+    def test_corrupt_checkpoint(self):
+        """Test a broken checkpoint file starts the job over."""
+        store = self.store()
+        with open(store.path, 'w', encoding='utf-8') as f:
+            f.write('{"places": [')
+
+        with self.assertLogs(LOGGER, 'WARNING'):
+            self.assertFalse(store.load())
+
+    def test_in_memory(self):
+        """Test a checkpoint without a directory never touches the disk."""
+        store = CheckpointStore(None, JOB, LOGGER)
+        store.save_places(PLACES)
+        store.save_cursor('a', 'pages', reviews('one'), ['k1'], 1)
+
+        self.assertEqual(store.cursor('a'), {'mode': 'pages', 'pages': 1, 'keys': ['k1'], 'reviews': reviews('one')})
+        self.assertFalse(store.load())
+        self.assertEqual(os.listdir(self.directory.name), [])
+        store.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
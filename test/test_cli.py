@@ -0,0 +1,107 @@
+# coding=utf-8
+"""Command line config test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import json
+import logging
+import tempfile
+import unittest
+from unittest import mock
+
+from cli import parse_args, load_config, API_KEY_ENV
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+FLAGS = [
+    '--keyword', 'Darjeeling', '--lat', '27.04', '--lng', '88.26', '--radius', '5000',
+    '--api-key', 'KEY', '--db', 'tripadvisor', '--table', 'darjeeling',
+    '--max-places', '10', '--max-reviews', '50', '--csv', 'darjeeling.csv'
+]
+
+
+class LoadConfigTest(unittest.TestCase):
+    """Test flags and config files are merged into one config."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.directory.cleanup()
+
+    def config_file(self, config):
+        path = os.path.join(self.directory.name, 'config.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        return path
+
+    def test_flags(self):
+        """Test flags are typed and keyed by their long name."""
+        config = load_config(parse_args(FLAGS + ['--engine', 'async']))
+
+        self.assertEqual(config['keyword'], 'Darjeeling')
+        self.assertEqual(config['lat'], 27.04)
+        self.assertEqual(config['radius'], 5000)
+        self.assertEqual(config['dbName'], 'tripadvisor')
+        self.assertEqual(config['maxReviews'], 50)
+        self.assertEqual(config['engine'], 'async')
+        self.assertNotIn('config', config)
+        # unset flags do not shadow the defaults of the worker
+        self.assertNotIn('poolSize', config)
+        self.assertNotIn('resume', config)
+
+    def test_flags_override_file(self):
+        """Test the config file fills in what the flags leave out."""
+        path = self.config_file({'keyword': 'Kalimpong', 'maxReviews': 20, 'poolSize': 2})
+        config = load_config(parse_args(FLAGS + ['--config', path, '--no-resume']))
+
+        self.assertEqual(config['keyword'], 'Darjeeling')
+        self.assertEqual(config['maxReviews'], 50)
+        self.assertEqual(config['poolSize'], 2)
+        self.assertFalse(config['resume'])
+
+    def test_api_key_from_environment(self):
+        """Test the api key is read from the environment when not given."""
+        flags = FLAGS[:FLAGS.index('--api-key')] + FLAGS[FLAGS.index('--api-key') + 2:]
+
+        with mock.patch.dict(os.environ, {API_KEY_ENV: 'FROM_ENV'}):
+            self.assertEqual(load_config(parse_args(flags))['apiKey'], 'FROM_ENV')
+            self.assertEqual(load_config(parse_args(FLAGS))['apiKey'], 'KEY')
+
+    def test_jobs_keyword(self):
+        """Test a batch takes its keyword from its first job."""
+        path = self.config_file({'jobs': [
+            {'location': 'Gangtok', 'lat': 27.33, 'lng': 88.61, 'radius': 3000},
+            {'location': 'Pelling', 'lat': 27.3, 'lng': 88.24, 'radius': 3000}
+        ]})
+        flags = FLAGS[:FLAGS.index('--keyword')] + FLAGS[FLAGS.index('--keyword') + 2:]
+
+        config = load_config(parse_args(flags + ['--config', path]))
+        self.assertEqual(config['keyword'], 'Gangtok')
+        self.assertEqual(len(config['jobs']), 2)
+
+    def test_missing(self):
+        """Test missing parameters are named."""
+        with mock.patch.dict(os.environ, clear=True):
+            with self.assertRaises(ValueError) as raised:
+                load_config(parse_args(['--keyword', 'Darjeeling', '--lat', '27.04']))
+
+        self.assertIn('apiKey', str(raised.exception))
+        self.assertIn('csvFilePath', str(raised.exception))
+        self.assertNotIn('keyword', str(raised.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
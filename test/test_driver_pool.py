@@ -0,0 +1,145 @@
+# coding=utf-8
+"""Driver pool test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import time
+import logging
+import threading
+import unittest
+
+from driver_pool import DriverPool
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+
+class FakeDriver:
+    # stands in for a chromedriver session
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        pass
+
+    def quit(self):
+        self.closed = True
+
+
+class DriverPoolTest(unittest.TestCase):
+    """Test drivers are launched lazily, shared and closed."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.launched = []
+
+    def factory(self):
+        driver = FakeDriver()
+        self.launched.append(driver)
+        return driver
+
+    def test_lazy_launch_and_reuse(self):
+        """Test a released driver is reused before a new one is launched."""
+        pool = DriverPool(self.factory, 2, LOGGER)
+        self.assertEqual(len(pool), 0)
+
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+
+        second = pool.acquire()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(pool), 2)
+
+        pool.close()
+
+    def test_blocks_when_all_leased(self):
+        """Test a thread waits for a driver once the pool is full."""
+        pool = DriverPool(self.factory, 1, LOGGER)
+        driver = pool.acquire()
+
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+
+        time.sleep(0.1)
+        self.assertEqual(acquired, [])
+
+        pool.release(driver)
+        waiter.join(timeout=5)
+        self.assertEqual(acquired, [driver])
+        self.assertEqual(len(self.launched), 1)
+
+        pool.close()
+
+    def test_failed_launch_frees_slot(self):
+        """Test a driver that failed to launch does not take up the pool."""
+        failures = [RuntimeError("chrome not found")]
+
+        def factory():
+            if len(failures) > 0:
+                raise failures.pop()
+            return self.factory()
+
+        pool = DriverPool(factory, 1, LOGGER)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+        self.assertEqual(len(pool), 0)
+        self.assertIsNotNone(pool.acquire())
+
+        pool.close()
+
+    def test_discard(self):
+        """Test a discarded driver is quit and its slot launched again."""
+        pool = DriverPool(self.factory, 1, LOGGER)
+        driver = pool.acquire()
+        pool.discard(driver)
+
+        self.assertTrue(driver.closed)
+        self.assertIsNot(pool.acquire(), driver)
+
+        pool.close()
+
+    def test_reap(self):
+        """Test idle drivers are quit once the idle timeout is over."""
+        pool = DriverPool(self.factory, 2, LOGGER, idleTimeout=0.05)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+
+        time.sleep(0.1)
+        with self.assertLogs(LOGGER, 'INFO'):
+            pool.reap()
+
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+        self.assertEqual(len(pool), 1)
+
+        pool.close()
+
+    def test_close(self):
+        """Test close quits leased drivers too and the pool refuses to hand out more."""
+        pool = DriverPool(self.factory, 2, LOGGER)
+        leased, idle = pool.acquire(), pool.acquire()
+        pool.release(idle)
+
+        pool.close()
+        self.assertTrue(leased.closed and idle.closed)
+
+        pool.release(leased)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+        self.assertEqual(len(self.launched), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
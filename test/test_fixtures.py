@@ -0,0 +1,166 @@
+# coding=utf-8
+"""Fixture recording and replay test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import json
+import logging
+import tempfile
+import unittest
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from fixtures import FixtureRecorder, ReplayServer, fixture_key, replay_base, replay_step
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+# a run of replay_site.JOB, recorded through TAapi.run against the stand-in site
+REPLAY_DIR = os.path.join(os.path.dirname(__file__), 'replay')
+
+PLACE_PATH = '/Attraction_Review-g187147-d188151-Reviews-Eiffel_Tower-Paris_Ile_de_France.html'
+
+
+def fetch(url):
+    with urlopen(url, timeout=5) as response:
+        return response.read().decode('utf-8'), response.headers['Content-Type']
+
+
+class FixtureKeyTest(unittest.TestCase):
+    """Test recorded requests are keyed independently of the host."""
+
+    def test_fixture_key(self):
+        """Test the host and api keys are dropped and the query sorted."""
+        self.assertEqual(fixture_key('https://www.tripadvisor.com/Search?q=eiffel+tower'), '/Search?q=eiffel+tower')
+        self.assertEqual(
+            fixture_key('https://maps.googleapis.com/maps/api/place/findplacefromtext/json?key=SECRET&input=Eiffel&fields=geometry'),
+            '/maps/api/place/findplacefromtext/json?fields=geometry&input=Eiffel'
+        )
+        self.assertEqual(fixture_key('http://127.0.0.1:8000/Search?q=eiffel%20tower'), fixture_key('https://www.tripadvisor.com/Search?q=eiffel+tower'))
+        self.assertEqual(fixture_key('https://www.tripadvisor.com/'), '/')
+
+    def test_replay_step(self):
+        """Test client side page changes are counted and stripped."""
+        self.assertEqual(replay_step('/Search?q=eiffel'), 0)
+        self.assertEqual(replay_step('/Search?q=eiffel&replay=2'), 2)
+        self.assertEqual(replay_base('/Search?q=eiffel&replay=2'), '/Search?q=eiffel')
+        self.assertEqual(replay_base(PLACE_PATH + '?replay=1'), PLACE_PATH)
+
+
+class FixtureRecorderTest(unittest.TestCase):
+    """Test pages and navigations are recorded."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.directory.cleanup()
+
+    def test_record(self):
+        """Test pages are written to files listed in the index."""
+        recorder = FixtureRecorder(self.directory.name, LOGGER)
+        key = recorder.record('https://www.tripadvisor.com/Search?q=eiffel', '<html></html>')
+        mapsKey = recorder.record('https://maps.googleapis.com/maps/api/place/findplacefromtext/json?input=Eiffel&key=SECRET', '{}', 'application/json')
+
+        with open(os.path.join(self.directory.name, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+        self.assertEqual(index['pages'][key], {'file': '00000.html', 'type': 'text/html'})
+        self.assertEqual(index['pages'][mapsKey], {'file': '00001.json', 'type': 'application/json'})
+        self.assertNotIn('SECRET', json.dumps(index))
+
+        # a page recorded again keeps its file
+        recorder.record('https://www.tripadvisor.com/Search?q=eiffel', '<html>again</html>')
+        self.assertEqual(len(os.listdir(self.directory.name)), 3)
+
+    def test_client_side_paging(self):
+        """Test pages behind an unchanged url are kept apart."""
+        recorder = FixtureRecorder(self.directory.name, LOGGER)
+        first = recorder.record('https://www.tripadvisor.com' + PLACE_PATH, '<html>1</html>')
+
+        second = recorder.record_navigation(first, 'next', 'https://www.tripadvisor.com' + PLACE_PATH, '<html>2</html>')
+        third = recorder.record_navigation(second, 'next', 'https://www.tripadvisor.com' + PLACE_PATH, '<html>3</html>')
+        self.assertEqual(second, PLACE_PATH + '?replay=1')
+        self.assertEqual(third, PLACE_PATH + '?replay=2')
+
+        reopened = FixtureRecorder(self.directory.name, LOGGER)
+        self.assertEqual(reopened.index['navigation'][first], {'next': second})
+        self.assertEqual(len(reopened.index['pages']), 3)
+
+    def test_record_then_replay(self):
+        """Test a recording is served back under the same keys."""
+        recorder = FixtureRecorder(self.directory.name, LOGGER)
+        recorder.record('https://www.tripadvisor.com/Search?q=louvre', '<html><head></head><body>louvre</body></html>')
+
+        with ReplayServer(self.directory.name, LOGGER) as server:
+            body, contentType = fetch(server.url + '/Search?q=louvre')
+
+        self.assertIn('louvre', body)
+        self.assertEqual(contentType, 'text/html')
+
+
+class ReplayServerTest(unittest.TestCase):
+    """Test the committed fixture is served back offline."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Runs before the tests."""
+        cls.server = ReplayServer(REPLAY_DIR, LOGGER).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Runs after the tests."""
+        cls.server.stop()
+
+    def test_search_page(self):
+        """Test page scripts are replaced by the recorded navigation."""
+        body, contentType = fetch(self.server.url + '/Search?q=eiffel+tower')
+
+        self.assertEqual(contentType, 'text/html')
+        self.assertNotIn('bundle.js', body)
+        self.assertIn('Content-Security-Policy', body)
+        self.assertIn('"filter": "/Search?q=eiffel+tower&ssrc=A"', body)
+
+        body, _ = fetch(self.server.url + '/Search?ssrc=A&q=eiffel%20tower')
+        self.assertIn(PLACE_PATH, body)
+
+    def test_place_page(self):
+        """Test json-ld survives and the page state script does not."""
+        body, _ = fetch(self.server.url + PLACE_PATH)
+
+        self.assertIn('application/ld+json', body)
+        self.assertIn('48.858353', body)
+        self.assertNotIn('__WEB_CONTEXT__', body)
+
+    def test_places_api(self):
+        """Test the places api answer is served whatever the api key."""
+        url = self.server.maps_url + '?input=Louvre%20Museum&inputtype=textquery&fields=geometry,place_id&locationbias=circle:5000@48.8566,2.3522&key=SECRET'
+        body, contentType = fetch(url)
+
+        self.assertTrue(contentType.startswith('application/json'))
+        candidate = json.loads(body)['candidates'][0]
+        self.assertEqual(candidate['geometry']['location'], {'lat': 48.8606111, 'lng': 2.337644})
+        self.assertEqual(candidate['place_id'], 'ChIJD3uTd9hx5kcR1IQvGfr8dbk')
+
+    def test_not_recorded(self):
+        """Test an unrecorded page is a 404."""
+        with self.assertLogs(LOGGER, 'WARNING'):
+            with self.assertRaises(HTTPError) as raised:
+                fetch(self.server.url + '/Search?q=louvre')
+
+        self.assertEqual(raised.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
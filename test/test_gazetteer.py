@@ -0,0 +1,95 @@
+# coding=utf-8
+"""Offline gazetteer test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import logging
+import tempfile
+import unittest
+
+from gazetteer import Gazetteer, build_index, normalize, distance, grid_cell, INDEX_SUFFIX
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+# geonames columns: id, name, ascii name, alternate names, latitude, longitude, ...
+DUMP = [
+    ['6254976', 'Tour Eiffel', 'Tour Eiffel', 'Eiffel Tower,Eiffelturm', '48.85826', '2.29450', 'S', 'TOWR'],
+    ['2988507', 'Paris', 'Paris', 'Lutetia,Parigi', '48.85341', '2.34880', 'P', 'PPLC'],
+    ['6618607', 'Musée du Louvre', 'Musee du Louvre', 'Louvre Museum', '48.86091', '2.33614', 'S', 'MUS'],
+    ['4717560', 'Paris', 'Paris', '', '33.66094', '-95.55551', 'P', 'PPLA2'],
+    ['bad', 'Nowhere', 'Nowhere', '', 'north', 'east', 'P', 'PPL'],
+]
+
+PARIS = (48.8566, 2.3522)
+
+
+class GazetteerTest(unittest.TestCase):
+    """Test place names resolve offline."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.dumpPath = os.path.join(self.directory.name, 'FR.txt')
+
+        with open(self.dumpPath, 'w', encoding='utf-8') as f:
+            f.write('\n'.join('\t'.join(fields) for fields in DUMP) + '\n')
+
+        self.gazetteer = Gazetteer.open(self.dumpPath, LOGGER)
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.gazetteer.close()
+        self.directory.cleanup()
+
+    def test_helpers(self):
+        """Test name folding, distances and grid cells."""
+        self.assertEqual(normalize('  Musée  du Louvre!'), 'musée du louvre')
+        self.assertAlmostEqual(distance(*PARIS, 48.85826, 2.29450), 4200, delta=100)
+        self.assertEqual(grid_cell(-90, -180, 0.25), (0, 0))
+        self.assertEqual(grid_cell(90, 180, 0.25), (719, 1439))
+
+    def test_index_is_built_next_to_dump(self):
+        """Test the index is built once and skips bad rows."""
+        self.assertTrue(os.path.isfile(self.dumpPath + INDEX_SUFFIX))
+        self.assertEqual(self.gazetteer.recordCount, 4)
+        self.assertEqual(build_index(self.dumpPath, os.path.join(self.directory.name, 'copy' + INDEX_SUFFIX)), 4)
+
+    def test_exact_name(self):
+        """Test a name or an alternate name resolves to its place."""
+        self.assertEqual(self.gazetteer.resolve('Tour Eiffel', *PARIS, 10000), {'lat': 48.85826, 'lng': 2.2945})
+        self.assertEqual(self.gazetteer.resolve('eiffel tower', *PARIS, 10000), {'lat': 48.85826, 'lng': 2.2945})
+
+    def test_nearest_of_same_name(self):
+        """Test only places within the radius are considered."""
+        self.assertEqual(self.gazetteer.resolve('Paris', *PARIS, 10000), {'lat': 48.85341, 'lng': 2.3488})
+        self.assertEqual(self.gazetteer.resolve('Paris', 33.6, -95.5, 20000), {'lat': 33.66094, 'lng': -95.55551})
+        self.assertIsNone(self.gazetteer.resolve('Tour Eiffel', *PARIS, 1000))
+
+    def test_similar_name(self):
+        """Test a name sharing most words with a nearby place resolves to it."""
+        self.assertEqual(self.gazetteer.resolve('Musée du Louvre Paris', *PARIS, 10000), {'lat': 48.86091, 'lng': 2.33614})
+        self.assertIsNone(self.gazetteer.resolve('Louvre', *PARIS, 10000))
+        self.assertIsNone(self.gazetteer.resolve('!!', *PARIS, 10000))
+
+    def test_not_an_index(self):
+        """Test a file that is not an index is refused."""
+        path = os.path.join(self.directory.name, 'bad' + INDEX_SUFFIX)
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 64)
+
+        with self.assertRaises(ValueError):
+            Gazetteer.open(path, LOGGER)
+
+
+if __name__ == "__main__":
+    unittest.main()
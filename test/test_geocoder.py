@@ -0,0 +1,153 @@
+# coding=utf-8
+"""Places client and page coordinates test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import re
+import json
+import logging
+import tempfile
+import threading
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from geocoder import PlacesClient, coords_from_page, location_id
+except ImportError:
+    # the places client needs requests
+    coords_from_page = None
+
+from fixtures import FixtureRecorder, ReplayServer, fixture_key
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+MAPS_URL = 'https://maps.googleapis.com/maps/api/place/findplacefromtext/json'
+BIAS = 'circle:5000@48.8566,2.3522'
+
+ANSWER = {
+    'candidates': [{'geometry': {'location': {'lat': 48.858353, 'lng': 2.294464}}, 'place_id': 'ChIJLU7jZClu5kcR4PcOOO6p3I0'}],
+    'status': 'OK'
+}
+
+# a review page with the place in its json-ld block and the city in its page state
+PLACE_PAGE = '''<html><head><title>Eiffel Tower (Paris)</title>
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "LandmarksOrHistoricalBuildings", "name": "Eiffel Tower", "geo": {"@type": "GeoCoordinates", "latitude": 48.858353, "longitude": 2.294464}}</script>
+<script>window.__WEB_CONTEXT__ = {"pageManifest": {"locationId": 187147, "latitude": 48.856697, "longitude": 2.351462}};</script>
+</head>
+<body><h1 id="HEADING">Eiffel Tower</h1></body></html>'''
+
+PLACE_URL = 'https://www.tripadvisor.com/Attraction_Review-g187147-d188151-Reviews-Eiffel_Tower-Paris_Ile_de_France.html'
+
+META = '''<meta property="place:location:latitude" content="48.86091">
+<meta property="place:location:longitude" content="2.33614">'''
+
+
+@unittest.skipIf(coords_from_page is None, 'requests is not installed')
+class PlacesClientTest(unittest.TestCase):
+    """Test places api lookups are made, recorded and deduplicated."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+
+        # the answer as a live run records it, without the api key
+        recorder = FixtureRecorder(self.directory.name, LOGGER)
+        recorder.record(PlacesClient(MAPS_URL, 'SECRET', LOGGER).query_url('Eiffel Tower', BIAS), json.dumps(ANSWER), 'application/json')
+
+        self.server = ReplayServer(self.directory.name, LOGGER).start()
+        self.client = PlacesClient(self.server.maps_url, 'OTHER', LOGGER, workers=2)
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.client.close()
+        self.server.stop()
+        self.directory.cleanup()
+
+    def test_query_url(self):
+        """Test the lookup asks for the geometry and the place id only."""
+        query = parse_qs(urlsplit(self.client.query_url('Eiffel Tower', BIAS)).query)
+
+        self.assertEqual(query['fields'], ['geometry,place_id'])
+        self.assertEqual(query['input'], ['Eiffel Tower'])
+        self.assertEqual(query['locationbias'], [BIAS])
+        self.assertEqual(query['key'], ['OTHER'])
+
+    def test_find_place(self):
+        """Test the json answer is returned and recorded without the api key."""
+        with tempfile.TemporaryDirectory() as directory:
+            self.client.recorder = FixtureRecorder(directory, LOGGER)
+            self.assertEqual(self.client.find_place('Eiffel Tower', BIAS), ANSWER)
+
+            key = fixture_key(self.client.query_url('Eiffel Tower', BIAS))
+            self.assertEqual(list(self.client.recorder.index['pages']), [key])
+            self.assertNotIn('OTHER', key)
+
+    def test_prefetch(self):
+        """Test a prefetched lookup runs once and get waits for it."""
+        calls, release = [], threading.Event()
+
+        def resolve(name):
+            calls.append(name)
+            release.wait(5)
+            return self.client.find_place(name, BIAS)
+
+        first = self.client.prefetch('eiffel', resolve, 'Eiffel Tower')
+        self.assertIs(self.client.prefetch('eiffel', resolve, 'Eiffel Tower'), first)
+        self.assertIs(self.client.pending('eiffel'), first)
+
+        release.set()
+        self.assertEqual(self.client.get('eiffel', resolve, 'Eiffel Tower'), ANSWER)
+        self.assertEqual(calls, ['Eiffel Tower'])
+
+        # never prefetched, resolved in the calling thread
+        self.assertEqual(self.client.get('louvre', lambda name: name, 'Louvre'), 'Louvre')
+
+
+@unittest.skipIf(coords_from_page is None, 'requests is not installed')
+class CoordsFromPageTest(unittest.TestCase):
+    """Test a page's own coordinates are found and others are not."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.page = PLACE_PAGE
+
+        # the page without its json-ld block, only the page state of the city is left
+        self.statePage = re.sub(r'<script type="application/ld\+json">.*?</script>', '', self.page, flags=re.S)
+
+    def test_location_id(self):
+        """Test the location id is read from the place url."""
+        self.assertEqual(location_id(PLACE_URL), '188151')
+        self.assertIsNone(location_id('https://www.tripadvisor.com/Search?q=eiffel'))
+
+    def test_json_ld(self):
+        """Test the json-ld geo block wins."""
+        self.assertEqual(coords_from_page(self.page, location_id(PLACE_URL)), {'lat': 48.858353, 'lng': 2.294464})
+
+    def test_meta_tags(self):
+        """Test the place meta tags are read."""
+        self.assertEqual(coords_from_page(META + self.statePage), {'lat': 48.86091, 'lng': 2.33614})
+
+    def test_page_state(self):
+        """Test the page state is only trusted for the location of the page."""
+        self.assertIsNone(coords_from_page(self.statePage))
+        self.assertIsNone(coords_from_page(self.statePage, location_id(PLACE_URL)))
+        self.assertEqual(coords_from_page(self.statePage, '187147'), {'lat': 48.856697, 'lng': 2.351462})
+
+    def test_null_island(self):
+        """Test 0,0 and out of range coordinates are dropped."""
+        page = '<script type="application/ld+json">{"geo": {"latitude": 0, "longitude": 0}}</script>'
+        self.assertIsNone(coords_from_page(page))
+        self.assertIsNone(coords_from_page(META.replace('48.86091', '148.86091')))
+
+
+if __name__ == "__main__":
+    unittest.main()
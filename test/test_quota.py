@@ -0,0 +1,124 @@
+# coding=utf-8
+"""Places api quota test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import json
+import logging
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from quota import QuotaManager, QuotaExceeded, USAGE_FILE
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+
+class QuotaManagerTest(unittest.TestCase):
+    """Test the places api budget is shared and enforced."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, USAGE_FILE)
+        self.now = datetime.now()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.directory.cleanup()
+
+    def quota(self):
+        # 3 dollars at 1 dollar per 1000 calls pays for 3 calls
+        return QuotaManager(self.path, LOGGER, allowance=0.003, billingRate=1)
+
+    def test_limit_and_bill(self):
+        """Test the limit is what the allowance pays for."""
+        quota = QuotaManager(self.path, LOGGER, allowance=200, billingRate=17)
+        self.assertEqual(quota.limit, 11764)
+        self.assertAlmostEqual(quota.bill(1000), 17)
+
+    def test_consume_until_spent(self):
+        """Test calls are refused once the allowance is spent."""
+        quota = self.quota()
+        self.assertEqual([quota.consume(self.now) for _ in range(3)], [1, 2, 3])
+
+        with self.assertRaises(QuotaExceeded):
+            quota.consume(self.now)
+
+        self.assertEqual(quota.usage(self.now), 3)
+        self.assertEqual(quota.available(self.now), 0)
+
+    def test_usage_is_shared_on_disk(self):
+        """Test a second run sees the calls of the first."""
+        self.quota().consume(self.now)
+        self.assertEqual(self.quota().usage(self.now), 1)
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['days'], {self.now.strftime('%Y-%m-%d'): 1})
+
+    def test_reservation_holds_calls_back(self):
+        """Test calls reserved by one run are not available to another."""
+        first, second = self.quota(), self.quota()
+
+        self.assertEqual(first.reserve(2, self.now), 2)
+        self.assertEqual(second.available(self.now), 1)
+        self.assertEqual(second.reserve(5, self.now), 1)
+
+        second.consume(self.now)
+        with self.assertRaises(QuotaExceeded):
+            second.consume(self.now)
+
+        # the first run draws on its own reservation
+        first.consume(self.now)
+        first.consume(self.now)
+
+    def test_release(self):
+        """Test a released reservation is available again."""
+        first, second = self.quota(), self.quota()
+        first.reserve(3, self.now)
+        self.assertEqual(second.available(self.now), 0)
+
+        first.release()
+        self.assertEqual(second.available(self.now), 3)
+
+    def test_months_are_counted_apart(self):
+        """Test the usage of last month does not count against this one."""
+        lastMonth = self.now.replace(day=1) - timedelta(days=1)
+        quota = self.quota()
+        quota.consume(lastMonth)
+
+        self.assertEqual(quota.usage(lastMonth), 1)
+        self.assertEqual(quota.usage(self.now), 0)
+
+    def test_seed(self):
+        """Test a usage count is only carried over into an empty month."""
+        quota = self.quota()
+        quota.seed(2, self.now)
+        self.assertEqual(quota.usage(self.now), 2)
+
+        quota.seed(1, self.now)
+        self.assertEqual(quota.usage(self.now), 2)
+
+    def test_stale_lock_is_broken(self):
+        """Test a lock file left over by a crashed run does not block forever."""
+        lockPath = self.path + '.lock'
+        open(lockPath, 'w').close()
+        old = datetime.now().timestamp() - 60
+        os.utime(lockPath, (old, old))
+
+        self.assertEqual(self.quota().consume(self.now), 1)
+        self.assertFalse(os.path.exists(lockPath))
+
+
+if __name__ == "__main__":
+    unittest.main()
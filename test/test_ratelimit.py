@@ -0,0 +1,112 @@
+# coding=utf-8
+"""Rate limiter test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import time
+import asyncio
+import logging
+import unittest
+
+from ratelimit import RateLimiter, TokenBucket
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+SITE = 'https://www.tripadvisor.com/Search?q=eiffel'
+MAPS = 'https://maps.googleapis.com/maps/api/place/findplacefromtext/json?input=eiffel'
+REPLAY_SITE = 'http://127.0.0.1:8000/Search?q=eiffel'
+REPLAY_MAPS = 'http://127.0.0.1:8000/maps/api/place/findplacefromtext/json?input=eiffel'
+
+
+class TokenBucketTest(unittest.TestCase):
+    """Test requests are spaced out by the bucket."""
+
+    def test_burst_then_wait(self):
+        """Test a burst goes out at once and the next request waits."""
+        bucket = TokenBucket(2.0, 2)
+        now = bucket.updated
+
+        self.assertEqual(bucket.reserve(now), 0)
+        self.assertEqual(bucket.reserve(now), 0)
+        self.assertAlmostEqual(bucket.reserve(now), 0.5)
+        self.assertAlmostEqual(bucket.reserve(now), 1.0)
+
+    def test_refill(self):
+        """Test tokens come back at the rate."""
+        bucket = TokenBucket(2.0, 2)
+        now = bucket.updated
+        bucket.reserve(now)
+        bucket.reserve(now)
+
+        self.assertEqual(bucket.reserve(now + 0.5), 0)
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Test the rate of a host adapts to how its requests go."""
+
+    def limiter(self, budgets=None):
+        return RateLimiter(LOGGER, budgets=budgets or {'maps.googleapis.com': 10.0}, defaultRate=2.0)
+
+    def test_budgets(self):
+        """Test hosts get their budget, others the default rate."""
+        limiter = self.limiter()
+        self.assertEqual(limiter.rate(MAPS), 10.0)
+        self.assertEqual(limiter.rate(SITE), 2.0)
+
+    def test_path_budget(self):
+        """Test an endpoint sharing a host gets a bucket of its own."""
+        limiter = self.limiter({'127.0.0.1:8000/maps/api/place/findplacefromtext/json': 10.0})
+        self.assertEqual(limiter.rate(REPLAY_MAPS), 10.0)
+        self.assertEqual(limiter.rate(REPLAY_SITE), 2.0)
+
+    def test_backoff(self):
+        """Test a throttled request halves the rate and blocks the host."""
+        limiter = self.limiter()
+
+        with self.assertLogs(LOGGER, 'WARNING'):
+            self.assertTrue(limiter.feedback(SITE, status=429, retryAfter='30'))
+            self.assertTrue(limiter.feedback(SITE, status=503))
+            self.assertTrue(limiter.feedback(SITE, error=True))
+
+        self.assertEqual(limiter.rate(SITE), 0.25)
+        # other hosts are not held up
+        self.assertEqual(limiter.rate(MAPS), 10.0)
+
+        start = time.monotonic()
+        self.assertFalse(limiter.acquire(SITE, cancelled=lambda: time.monotonic() - start > 0.1))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_slow_and_recovery(self):
+        """Test slow requests cut the rate and fast ones win it back up to the budget."""
+        limiter = self.limiter()
+
+        self.assertFalse(limiter.feedback(SITE, status=200, elapsed=30))
+        self.assertEqual(limiter.rate(SITE), 1.5)
+
+        for _ in range(10):
+            limiter.feedback(SITE, status=200, elapsed=0.1)
+        self.assertEqual(limiter.rate(SITE), 2.0)
+
+    def test_acquire(self):
+        """Test requests within the burst go out at once."""
+        limiter = self.limiter()
+        start = time.monotonic()
+
+        self.assertTrue(limiter.acquire(SITE))
+        self.assertTrue(asyncio.run(limiter.acquire_async(SITE)))
+        self.assertLess(time.monotonic() - start, 0.1)
+
+        self.assertFalse(limiter.acquire(SITE, cancelled=lambda: True))
+
+
+if __name__ == "__main__":
+    unittest.main()
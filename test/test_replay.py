@@ -0,0 +1,156 @@
+# coding=utf-8
+"""End to end replay test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import sys
+import csv
+import glob
+import shutil
+import logging
+import tempfile
+import unittest
+
+try:
+    from ta_scraper import TAapi
+    from cli import build_worker
+except ImportError:
+    # the scraper needs selenium, lxml, pyjsparser, requests and pymongo
+    TAapi = None
+
+from fixtures import ReplayServer
+from quota import QuotaManager
+from replay_site import JOB
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPLAY_DIR = os.path.join(os.path.dirname(__file__), 'replay')
+
+DB_NAME = 'ta_replay_test'
+
+
+def chrome_found():
+    # the scraper reads the chrome version from one of these before launching a driver
+    binaries = TAapi.__CHROME_BINARIES__
+    for binary in binaries.get(sys.platform, binaries['linux']):
+        binary = os.path.expandvars(binary)
+        if os.path.isfile(binary) or shutil.which(binary) is not None:
+            return True
+    return False
+
+
+def mongo_found():
+    try:
+        from pymongo import MongoClient
+        MongoClient(serverSelectionTimeoutMS=2000).admin.command('ping')
+        return True
+    except:
+        return False
+
+
+def runnable():
+    if TAapi is None:
+        return 'the scraper dependencies are not installed'
+    if len(glob.glob(os.path.join(PACKAGE_DIR, 'exe', 'chromedriver_v*'))) == 0:
+        return 'no chromedriver in exe/'
+    if not chrome_found():
+        return 'chrome is not installed'
+    if not mongo_found():
+        return 'mongodb is not reachable'
+    return None
+
+
+SKIP = runnable()
+
+
+@unittest.skipIf(SKIP is not None, SKIP)
+class ReplayRunTest(unittest.TestCase):
+    """Test TAapi.run against the recorded fixture emits the recorded places."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = ReplayServer(REPLAY_DIR, LOGGER).start()
+        self.csvPath = os.path.join(self.directory.name, 'places.csv')
+
+        config = dict(
+            JOB,
+            apiKey='REPLAY',
+            dbName=DB_NAME,
+            tableName='places',
+            csvFilePath=self.csvPath,
+            resume=False
+        )
+        self.worker = build_worker(config, baseUrl=self.server.url, mapsUrl=self.server.maps_url)
+        # a replay must not count against the usage of the machine
+        self.worker.quota = QuotaManager(os.path.join(self.directory.name, 'usage.json'), logging=LOGGER)
+
+        self.results = []
+        self.worker.finished.connect(self.results.append)
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.worker.dbm.db.client.drop_database(DB_NAME)
+        self.server.stop()
+        self.directory.cleanup()
+
+    def check_results(self):
+        self.assertEqual(len(self.results), 1)
+        places = {place['name']: place for place in self.results[0]}
+
+        # versailles is outside the radius of the job
+        self.assertEqual(sorted(places), ['Eiffel Tower', 'Louvre Museum'])
+
+        # located from its json-ld block, reviews read over two offset pages up to maxReviews
+        eiffel = places['Eiffel Tower']
+        self.assertEqual(eiffel['mode'], 'todo')
+        self.assertEqual(eiffel['coords'], {'lat': 48.858353, 'lng': 2.294464})
+        self.assertNotIn('place_id', eiffel)
+        self.assertEqual([review['metadata']['title'] for review in eiffel['reviews']], [f"Eiffel Tower review {n}" for n in range(1, 16)])
+        self.assertEqual(eiffel['reviews'][0]['metadata']['rating'], 50)
+        self.assertEqual(eiffel['reviews'][0]['images'], ['https://dynamic-media-cdn.tripadvisor.com/media/photo-o/00/188151.jpg?w=2400&h=-1&s=1'])
+        self.assertEqual(eiffel['reviews'][1]['images'], [])
+
+        # located through the places api, the repeated first page stops the paging
+        louvre = places['Louvre Museum']
+        self.assertEqual(louvre['mode'], 'place')
+        self.assertEqual(louvre['coords'], {'lat': 48.8606111, 'lng': 2.337644})
+        self.assertEqual(louvre['place_id'], 'ChIJD3uTd9hx5kcR1IQvGfr8dbk')
+        self.assertEqual([review['metadata']['title'] for review in louvre['reviews']], [f"Louvre Museum review {n}" for n in range(1, 11)])
+        self.assertEqual(louvre['reviews'][0]['metadata']['day'], 28)
+        self.assertEqual(louvre['reviews'][0]['images'], ['https://dynamic-media-cdn.tripadvisor.com/media/photo-o/00/188757.jpg?w=2400&h=-1&s=1'])
+
+        # one row per review, and both places stored
+        with open(self.csvPath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual({row['name'] for row in rows}, {'Eiffel Tower', 'Louvre Museum'})
+
+        stored = self.worker.dbm.db['places'].find({}, {'name': 1})
+        self.assertEqual(sorted(doc['name'] for doc in stored), ['Eiffel Tower', 'Louvre Museum'])
+
+    def test_run(self):
+        """Test the threaded engine."""
+        self.worker.run()
+        self.check_results()
+
+    def test_run_async(self):
+        """Test the asyncio engine."""
+        self.worker.run_async()
+        self.check_results()
+
+
+if __name__ == "__main__":
+    unittest.main()
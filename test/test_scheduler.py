@@ -0,0 +1,129 @@
+# coding=utf-8
+"""Refresh scheduler test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import logging
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from scheduler import RefreshScheduler, as_utc, review_date, review_velocity
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+NOW = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+
+
+def review(year, month, day=None):
+    return {'metadata': {'year': str(year), 'month': str(month), 'day': str(day) if day is not None else None}}
+
+
+def place(name, daysAgo=None, velocity=None, coords=None):
+    return {
+        'name': name,
+        'url': f"/{name}",
+        'page': 'attraction',
+        'coords': coords,
+        'last_scraped': NOW - timedelta(days=daysAgo) if daysAgo is not None else None,
+        'review_velocity': velocity
+    }
+
+
+class FakeDBManager:
+    # stands in for DBManager.stale_places, records the query it was given
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def stale_places(self, fields=None, staleBefore=None, bounds=None, limit=0):
+        self.queries.append({'fields': fields, 'staleBefore': staleBefore, 'bounds': bounds, 'limit': limit})
+        return list(self.docs)
+
+
+class ReviewVelocityTest(unittest.TestCase):
+    """Test how busy a place is taken to be."""
+
+    def test_review_date(self):
+        """Test reviews without a day are taken as the 1st."""
+        self.assertEqual(review_date(review(2024, 5, 17)), datetime(2024, 5, 17))
+        self.assertEqual(review_date(review(2024, 5)), datetime(2024, 5, 1))
+        self.assertIsNone(review_date({'metadata': {'year': '', 'month': '5'}}))
+
+    def test_velocity(self):
+        """Test reviews per day over the span of the reviews."""
+        reviews = [review(2024, 1, 1), review(2024, 2, 10), review(2024, 3, 1)]
+        self.assertAlmostEqual(review_velocity(reviews), 3 / 60)
+
+    def test_short_span_is_stretched(self):
+        """Test a burst of reviews does not make a place busy."""
+        reviews = [review(2024, 1, 1), review(2024, 1, 2)]
+        self.assertAlmostEqual(review_velocity(reviews), 2 / 30)
+        self.assertEqual(review_velocity([]), 0.0)
+
+
+class RefreshSchedulerTest(unittest.TestCase):
+    """Test stale and busy places are refreshed first."""
+
+    def test_priority(self):
+        """Test priority is staleness times velocity."""
+        scheduler = RefreshScheduler(FakeDBManager([]), LOGGER)
+
+        self.assertAlmostEqual(scheduler.priority(place('a', 10, 2.0), NOW), 20)
+        # quiet places still age, unstamped places are taken as a year old
+        self.assertAlmostEqual(scheduler.priority(place('b', 10, 0.0), NOW), 0.1)
+        self.assertAlmostEqual(scheduler.priority(place('c', None, 1.0), NOW), 365)
+
+    def test_naive_timestamps(self):
+        """Test timestamps read back from mongodb without a timezone are taken as utc."""
+        scheduler = RefreshScheduler(FakeDBManager([]), LOGGER)
+        stored = place('a', 10, 2.0)
+        stored['last_scraped'] = stored['last_scraped'].replace(tzinfo=None)
+
+        self.assertEqual(as_utc(stored['last_scraped']), NOW - timedelta(days=10))
+        self.assertAlmostEqual(scheduler.priority(stored, NOW), 20)
+
+    def test_plan(self):
+        """Test the budget goes to the places with the highest priority."""
+        dbm = FakeDBManager([place('quiet', 100, 0.01), place('busy', 10, 5.0), place('stale', 200, 1.0)])
+        planned = RefreshScheduler(dbm, LOGGER).plan(2, now=NOW)
+
+        self.assertEqual([result['name'] for result in planned], ['stale', 'busy'])
+        self.assertEqual(planned[0], {'name': 'stale', 'url': '/stale', 'page': 'attraction'})
+
+        query = dbm.queries[0]
+        self.assertEqual(query['limit'], 40)
+        self.assertEqual(query['staleBefore'], NOW - timedelta(days=1))
+        self.assertEqual(query['staleBefore'].tzinfo, timezone.utc)
+        self.assertIsNone(query['bounds'])
+
+    def test_plan_area_and_keep(self):
+        """Test the area narrows the query and keep filters the candidates."""
+        dbm = FakeDBManager([place('in', 10, 1.0, {'lat': 48.85, 'lng': 2.35}), place('out', 20, 1.0, {'lat': 45.0, 'lng': 2.35})])
+        keep = lambda doc: doc['coords']['lat'] > 48
+        planned = RefreshScheduler(dbm, LOGGER).plan(5, area=(48.8566, 2.3522, 5000), keep=keep, now=NOW)
+
+        self.assertEqual([result['name'] for result in planned], ['in'])
+
+        south, west, north, east = dbm.queries[0]['bounds']
+        self.assertTrue(south < 48.8566 < north and west < 2.3522 < east)
+        self.assertAlmostEqual(north - 48.8566, 0.045, places=3)
+
+    def test_no_budget(self):
+        """Test a spent budget does not query the database."""
+        dbm = FakeDBManager([place('a', 10, 1.0)])
+        self.assertEqual(RefreshScheduler(dbm, LOGGER).plan(0, now=NOW), [])
+        self.assertEqual(dbm.queries, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,365 @@
+# coding=utf-8
+"""Review paging and parsing test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import os
+import copy
+import json
+import asyncio
+import logging
+import threading
+import unittest
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import requests
+    import ta_scraper
+    from ta_scraper import TAapi
+except ImportError:
+    # the scraper needs selenium, lxml, pyjsparser, requests and pymongo
+    TAapi = None
+
+from checkpoint import CheckpointStore
+from driver_pool import DriverPool
+from fixtures import ReplayServer
+from ratelimit import RateLimiter
+from timing import Timings
+
+LOGGER = logging.getLogger('TripAdvisor')
+
+REPLAY_DIR = os.path.join(os.path.dirname(__file__), 'replay')
+
+EIFFEL = '/Attraction_Review-g187147-d188151-Reviews-Eiffel_Tower-Paris_Ile_de_France.html'
+LOUVRE = '/Attraction_Review-g187147-d188757-Reviews-Louvre_Museum-Paris_Ile_de_France.html'
+VERSAILLES = '/Attraction_Review-g187148-d188679-Reviews-Palace_of_Versailles-Versailles_Yvelines_Ile_de_France.html'
+
+
+def recorded(key):
+    # body of a page of the replay fixture
+    with open(os.path.join(REPLAY_DIR, 'index.json'), 'r', encoding='utf-8') as f:
+        page = json.load(f)['pages'][key]
+
+    with open(os.path.join(REPLAY_DIR, page['file']), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def no_driver():
+    raise RuntimeError('no chrome in this test')
+
+
+def bare_worker(baseUrl='https://www.tripadvisor.in', maxReviews=15):
+    # a worker without a qt object, mongodb or chrome, holding what review paging needs
+    worker = TAapi.__new__(TAapi)
+    worker.logger = LOGGER
+    worker.running = True
+    worker.REVIEWS_MAX = maxReviews
+    worker.baseUrl = baseUrl
+    worker.recorder = None
+    worker.httpFetch = True
+    worker.offsetPaging = True
+    worker.lock = threading.Lock()
+    worker.heldLease = threading.local()
+    worker.pageCoords = dict()
+    worker.timer = Timings()
+    worker.rateLimiter = RateLimiter(logging=LOGGER, defaultRate=100.0, burst=10)
+    worker.session = requests.Session()
+    worker.pageExecutor = ThreadPoolExecutor(max_workers=4)
+    worker.checkpoint = CheckpointStore(None, 'test', LOGGER)
+    # every page is in the fixture, a browser fallback means a page was missed
+    worker.driverPool = DriverPool(no_driver, 1, LOGGER)
+    return worker
+
+
+class FakeDBManager:
+    # stands in for mongodb, holding the stored places by url
+
+    def __init__(self, *docs):
+        self.docs = {doc['url']: copy.deepcopy(doc) for doc in docs}
+        self.upserted = []
+
+    def query(self, url):
+        return copy.deepcopy(self.docs.get(url))
+
+    def upsert(self, docs):
+        self.upserted += copy.deepcopy(docs)
+
+
+def review(title, rating=50, text='great', day=None, month=5, year=2024):
+    return {'metadata': {'title': title, 'rating': rating, 'text': text, 'day': day, 'month': month, 'year': year}, 'images': []}
+
+
+@unittest.skipIf(TAapi is None, 'the scraper dependencies are not installed')
+class ReviewPagesTest(unittest.TestCase):
+    """Test review page urls and review identity."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.worker = bare_worker()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.worker.pageExecutor.shutdown()
+
+    def test_review_page_url(self):
+        """Test pages are addressed by an offset after -Reviews-."""
+        page_url = self.worker._TAapi__review_page_url
+
+        self.assertEqual(page_url(EIFFEL, 0), EIFFEL)
+        self.assertEqual(page_url(EIFFEL, 1), EIFFEL.replace('-Reviews-', '-Reviews-or10-'))
+        self.assertEqual(page_url(EIFFEL, 3), EIFFEL.replace('-Reviews-', '-Reviews-or30-'))
+        # an offset url is moved, not given a second offset
+        self.assertEqual(page_url(page_url(EIFFEL, 3), 2), EIFFEL.replace('-Reviews-', '-Reviews-or20-'))
+
+    def test_review_key(self):
+        """Test a review is the same whatever is cut from its text."""
+        key = self.worker._TAapi__review_key
+
+        full = review('Stunning', text='x' * 80)
+        self.assertEqual(key(full), key(review('Stunning', text='x' * 50 + '...')))
+        self.assertNotEqual(key(full), key(review('Stunning', rating=40, text='x' * 80)))
+        self.assertNotEqual(key(full), key(review('Stunning', text='x' * 80, month=6)))
+
+    def test_merge_reviews(self):
+        """Test merged batches keep their order and drop repeats."""
+        merged = self.worker._TAapi__merge_reviews(
+            [review('new'), review('newer')],
+            [review('newer'), review('old')],
+            [review('old'), review('oldest')]
+        )
+
+        self.assertEqual([r['metadata']['title'] for r in merged], ['new', 'newer', 'old', 'oldest'])
+
+
+@unittest.skipIf(TAapi is None, 'the scraper dependencies are not installed')
+class ParseReviewPageTest(unittest.TestCase):
+    """Test server rendered review pages of the fixture are parsed with lxml."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.worker = bare_worker()
+        self.parse = self.worker._TAapi__parse_review_page
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.worker.pageExecutor.shutdown()
+
+    def test_things_to_do_layout(self):
+        """Test the things to do layout and its lazy loaded images."""
+        mode, reviews, next_url = self.parse(recorded(EIFFEL))
+
+        self.assertEqual(mode, 'todo')
+        self.assertEqual(len(reviews), 10)
+        self.assertEqual(next_url, self.worker.baseUrl + EIFFEL.replace('-Reviews-', '-Reviews-or10-'))
+        self.assertEqual(reviews[0]['metadata'], {'rating': 50, 'title': 'Eiffel Tower review 1', 'text': 'Visit 1 to Eiffel Tower, mostly for the view from the top.', 'month': 12, 'year': 2024})
+        # the placeholder in src is skipped for data-src
+        self.assertEqual(reviews[0]['images'], ['https://dynamic-media-cdn.tripadvisor.com/media/photo-o/00/188151.jpg?w=2400&h=-1&s=1'])
+        self.assertEqual(reviews[1]['images'], [])
+
+    def test_attraction_layout(self):
+        """Test the attraction layout and its srcset images."""
+        mode, reviews, next_url = self.parse(recorded(LOUVRE))
+
+        self.assertEqual(mode, 'place')
+        self.assertEqual(len(reviews), 10)
+        self.assertIsNone(next_url)
+        self.assertEqual(reviews[3]['metadata'], {'rating': 50, 'title': 'Louvre Museum review 4', 'text': 'Visit 4 to Louvre Museum, mostly for the collections.', 'day': 25, 'month': 11, 'year': 2024})
+        self.assertEqual(reviews[4]['images'], ['https://dynamic-media-cdn.tripadvisor.com/media/photo-o/04/188757.jpg?w=2400&h=-1&s=1'])
+
+    def test_last_page(self):
+        """Test the disabled next button ends the paging."""
+        mode, reviews, next_url = self.parse(recorded(VERSAILLES))
+
+        self.assertEqual(mode, 'todo')
+        self.assertEqual(len(reviews), 3)
+        self.assertIsNone(next_url)
+
+    def test_no_review_tab(self):
+        """Test a page without a review tab is not parsed."""
+        self.assertIsNone(self.parse(recorded('/')))
+
+
+@unittest.skipIf(TAapi is None, 'the scraper dependencies are not installed')
+class CollectReviewsTest(unittest.TestCase):
+    """Test offset paging against the replayed review pages."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Runs before the tests."""
+        cls.server = ReplayServer(REPLAY_DIR, LOGGER).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Runs after the tests."""
+        cls.server.stop()
+
+    def setUp(self):
+        """Runs before each test."""
+        self.worker = bare_worker(baseUrl=self.server.url)
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.worker.pageExecutor.shutdown()
+
+    def titles(self, reviews):
+        return [review['metadata']['title'] for review in reviews]
+
+    def test_offset_pages(self):
+        """Test reviews are read over offset pages up to the limit, and checkpointed."""
+        url = self.server.url + EIFFEL
+        mode, reviews = self.worker._TAapi__collect_reviews(url)
+
+        self.assertEqual(mode, 'todo')
+        self.assertEqual(self.titles(reviews), [f"Eiffel Tower review {n}" for n in range(1, 16)])
+
+        cursor = self.worker.checkpoint.cursor(url)
+        self.assertEqual(cursor['pages'], 2)
+        self.assertEqual(len(cursor['keys']), 15)
+
+    def test_repeated_page_stops(self):
+        """Test an offset past the last page, served the first page again, ends the place."""
+        self.worker.REVIEWS_MAX = 20
+        url = self.server.url + LOUVRE
+
+        mode, reviews = self.worker._TAapi__collect_reviews(url)
+
+        self.assertEqual(mode, 'place')
+        self.assertEqual(self.titles(reviews), [f"Louvre Museum review {n}" for n in range(1, 11)])
+
+    def test_known_reviews(self):
+        """Test paging stops at the first stored review."""
+        url = self.server.url + EIFFEL
+        _, stored = self.worker._TAapi__collect_reviews(url, checkpoint=False)
+        known = set(map(self.worker._TAapi__review_key, stored[3:]))
+
+        mode, reviews = self.worker._TAapi__collect_reviews(url, known=known, checkpoint=False)
+        self.assertEqual(self.titles(reviews), ['Eiffel Tower review 1', 'Eiffel Tower review 2', 'Eiffel Tower review 3'])
+
+    @unittest.skipIf(TAapi is not None and ta_scraper.aiohttp is None, 'aiohttp is not installed')
+    def test_async_engine(self):
+        """Test the asyncio engine pages the same way."""
+        self.worker.REVIEWS_MAX = 20
+
+        async def collect(path):
+            async with ta_scraper.aiohttp.ClientSession() as http:
+                return await self.worker._TAapi__collect_reviews_async(http, self.server.url + path)
+
+        mode, reviews = asyncio.run(collect(EIFFEL))
+        self.assertEqual(mode, 'todo')
+        self.assertEqual(self.titles(reviews), [f"Eiffel Tower review {n}" for n in range(1, 16)])
+
+        mode, reviews = asyncio.run(collect(LOUVRE))
+        self.assertEqual(mode, 'place')
+        self.assertEqual(self.titles(reviews), [f"Louvre Museum review {n}" for n in range(1, 11)])
+
+
+@unittest.skipIf(TAapi is None, 'the scraper dependencies are not installed')
+class CachedPlaceTest(unittest.TestCase):
+    """Test places served from mongodb are only fetched or written when needed."""
+
+    URL = 'https://www.tripadvisor.in' + LOUVRE
+    COORDS = {'lat': 48.8606111, 'lng': 2.337644}
+    STAMP = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+    def setUp(self):
+        """Runs before each test."""
+        self.worker = bare_worker(maxReviews=2)
+        self.worker.lat, self.worker.lng, self.worker.radius = 48.8566, 2.3522, 5000
+        self.worker.incremental = False
+        self.worker.quotaShort = False
+        self.worker.quotaPolicy = 'defer'
+        self.worker.prefetchCoords = False
+        self.worker.awaitingCoords = []
+        self.worker.scraped = dict()
+        self.lookups = []
+
+        # a cached place must not fetch a review page
+        self.worker._TAapi__collect_reviews = self.unexpected_fetch
+        self.worker._TAapi__get_coords = self.lookup
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.worker.pageExecutor.shutdown()
+
+    def unexpected_fetch(self, *args, **kwargs):
+        self.fail('a review page was fetched')
+
+    def lookup(self, name):
+        self.lookups.append(name)
+        return self.COORDS, 'ChIJD3uTd9hx5kcR1IQvGfr8dbk'
+
+    def store(self, coords):
+        doc = {
+            'name': 'Louvre Museum', 'url': self.URL, 'page': 1, 'mode': 'place',
+            'reviews': [review('one'), review('two')], 'coords': coords,
+            'last_scraped': self.STAMP, 'review_velocity': 0.5
+        }
+        self.worker.dbm = FakeDBManager(doc)
+        return {'name': 'Louvre Museum', 'url': self.URL, 'page': 1}
+
+    def test_served_as_stored(self):
+        """Test a located place is neither fetched, geocoded nor written."""
+        place = self.worker._TAapi__scrape_place(self.store(self.COORDS))
+
+        self.assertEqual(place['coords'], self.COORDS)
+        self.assertEqual(len(place['reviews']), 2)
+        self.assertEqual(self.lookups, [])
+        self.assertEqual(self.worker.dbm.upserted, [])
+
+    def test_relocated(self):
+        """Test a place stored without coordinates is only geocoded, and keeps its stamps."""
+        place = self.worker._TAapi__scrape_place(self.store(None))
+
+        self.assertEqual(self.lookups, ['Louvre Museum'])
+        self.assertEqual(place['coords'], self.COORDS)
+
+        written, = self.worker.dbm.upserted
+        self.assertEqual(written['coords'], self.COORDS)
+        self.assertEqual(written['place_id'], 'ChIJD3uTd9hx5kcR1IQvGfr8dbk')
+        self.assertEqual(written['last_scraped'], self.STAMP)
+        self.assertEqual(written['review_velocity'], 0.5)
+
+    def test_relocated_once_budget_is_known(self):
+        """Test a short budget parks the place until the scraped places are in."""
+        self.worker.quotaShort = True
+        self.assertIsNone(self.worker._TAapi__scrape_place(self.store(None)))
+        self.assertEqual(self.lookups, [])
+
+        place, = self.worker._TAapi__geocode_awaiting()
+        self.assertEqual(place['coords'], self.COORDS)
+
+        written, = self.worker.dbm.upserted
+        self.assertEqual(written['last_scraped'], self.STAMP)
+
+    def test_not_located_again(self):
+        """Test a lookup that finds nothing leaves the stored place alone."""
+        self.worker._TAapi__get_coords = lambda name: (None, None)
+        self.worker._TAapi__scrape_place(self.store(None))
+
+        self.assertEqual(self.worker.dbm.upserted, [])
+
+    def test_failed_refresh(self):
+        """Test a refresh that fetched nothing serves the stored place, unstamped."""
+        self.worker.incremental = True
+        self.worker._TAapi__collect_reviews = lambda *args, **kwargs: None
+
+        with self.assertLogs(LOGGER, 'WARNING'):
+            place = self.worker._TAapi__scrape_place(self.store(self.COORDS))
+
+        self.assertEqual([r['metadata']['title'] for r in place['reviews']], ['one', 'two'])
+        self.assertNotIn('last_scraped', place)
+        self.assertEqual(self.worker.dbm.upserted, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# coding=utf-8
+"""Timing test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'arkaprava.mail@gmail.com'
+__date__ = '2026-10-18'
+__copyright__ = 'Copyright 2022, Arka'
+
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from timing import Timings, timed
+
+
+class Stage:
+    # a class timed the way TAapi is
+
+    def __init__(self, timer):
+        self.timer = timer
+
+    @timed('fetch')
+    def fetch(self, value):
+        return value * 2
+
+
+class TimingsTest(unittest.TestCase):
+    """Test time is accounted per stage and per place."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.timer = Timings()
+
+    def test_stages(self):
+        """Test count, total, mean and max of a stage."""
+        self.timer.add('fetch', 1.0)
+        self.timer.add('fetch', 3.0)
+        self.timer.add('parse', 0.5)
+
+        summary = self.timer.summary()
+        self.assertEqual(summary['fetch'], {'count': 2, 'total': 4.0, 'mean': 2.0, 'max': 3.0})
+        self.assertEqual(summary['parse']['count'], 1)
+
+        report = self.timer.report()
+        self.assertEqual(len(report), 2)
+        self.assertTrue(report[0].startswith('fetch'))
+
+    def test_timed(self):
+        """Test a decorated method is timed as its stage."""
+        self.assertEqual(Stage(self.timer).fetch(2), 4)
+        self.assertEqual(self.timer.summary()['fetch']['count'], 1)
+
+    def test_place(self):
+        """Test spans inside a place are also added to it."""
+        self.timer.add('fetch', 1.0)
+        with self.timer.place('a'):
+            self.timer.add('fetch', 2.0)
+            with self.timer.place('b'):
+                self.timer.add('fetch', 4.0)
+            self.timer.add('geocode', 1.0)
+
+        self.assertEqual(self.timer.place_summary(), {'a': {'fetch': 2.0, 'geocode': 1.0}, 'b': {'fetch': 4.0}})
+        self.assertEqual(self.timer.summary()['fetch']['total'], 7.0)
+
+    def test_bound(self):
+        """Test work handed to a pool thread keeps its place."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with self.timer.place('a'):
+                executor.submit(self.timer.bound(self.timer.add), 'fetch', 1.0).result()
+                # unbound work runs outside of the place
+                executor.submit(self.timer.add, 'fetch', 1.0).result()
+
+            executor.submit(self.timer.bound(self.timer.add, place='b'), 'fetch', 2.0).result()
+
+        self.assertEqual(self.timer.place_summary(), {'a': {'fetch': 1.0}, 'b': {'fetch': 2.0}})
+        self.assertIs(self.timer.bound(len), len)
+
+    def test_tasks(self):
+        """Test concurrent asyncio tasks keep their places apart."""
+        async def scrape(url, seconds):
+            with self.timer.place(url):
+                await asyncio.sleep(0)
+                self.timer.add('place', seconds)
+
+        async def run():
+            await asyncio.gather(scrape('a', 1.0), scrape('b', 5.0), scrape('c', 3.0))
+
+        asyncio.run(run())
+
+        self.assertEqual([url for url, _ in self.timer.slowest_places(2)], ['b', 'c'])
+
+    def test_reset(self):
+        """Test reset forgets everything."""
+        with self.timer.place('a'):
+            self.timer.add('fetch', 1.0)
+        self.timer.reset()
+
+        self.assertEqual(self.timer.summary(), {})
+        self.assertEqual(self.timer.place_summary(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+'''
+    lightweight per-stage and per-place timers for the scrape pipeline
+'''
+
+__author__ = 'arka'
+
+__license__ = "MIT"
+__version__ = "1.1.0"
+__maintainer__ = "Arkaprava Ghosh"
+__email__ = "arkaprava.mail@gmail.com"
+__status__ = "Development"
+
+import threading
+import time
+import functools
+import contextvars
+from contextlib import contextmanager
+
+
+def timed(stage):
+    '''
+        times every call of a method as stage, on the Timings in self.timer.
+        not for generators, which would only be timed until they are created.
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.timer.span(stage):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Timings:
+    '''
+        accumulates count, total and max duration per stage name. spans opened
+        inside place(url), on the same thread or asyncio task, are also added
+        to that place, so a slow place can be broken down by stage. work handed
+        to pool threads keeps its place through bound(). stages nest (a place
+        span holds its review and geocode spans), so their totals overlap.
+
+        safe to use from any number of threads.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        # context variables are per thread and per asyncio task
+        self.current = contextvars.ContextVar('place', default=None)
+
+        self.stages = dict()
+        self.places = dict()
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def place(self, url):
+        # attributes the spans of this thread or task to url until the block ends
+        token = self.current.set(url)
+        try:
+            yield
+        finally:
+            self.current.reset(token)
+
+    def bound(self, fn, place=None):
+        # fn with its spans attributed to place (by default the current one) on whatever thread it runs
+        place = place if place is not None else self.current.get()
+        if place is None:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.place(place):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def add(self, stage, seconds):
+        place = self.current.get()
+
+        with self.lock:
+            stats = self.stages.setdefault(stage, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+            if place is not None:
+                placeStats = self.places.setdefault(place, dict())
+                placeStats[stage] = placeStats.get(stage, 0.0) + seconds
+
+    def summary(self):
+        # stage -> count, total, mean and max seconds
+        with self.lock:
+            return {
+                stage: {'count': count, 'total': total, 'mean': total / count, 'max': peak}
+                for stage, (count, total, peak) in self.stages.items()
+            }
+
+    def place_summary(self):
+        # place url -> seconds spent per stage
+        with self.lock:
+            return {place: dict(stats) for place, stats in self.places.items()}
+
+    def slowest_places(self, n=5, stage='place'):
+        places = self.place_summary()
+        return sorted(places.items(), key=lambda item: item[1].get(stage, 0.0), reverse=True)[:n]
+
+    def report(self):
+        # one line per stage, most expensive first
+        summary = self.summary()
+        return [
+            f"{stage:<16} {stats['count']:>6} x  total {stats['total']:9.2f} s  mean {stats['mean']:7.3f} s  max {stats['max']:7.3f} s"
+            for stage, stats in sorted(summary.items(), key=lambda item: item[1]['total'], reverse=True)
+        ]
+
+    def reset(self):
+        with self.lock:
+            self.stages = dict()
+            self.places = dict()